@@ -3,6 +3,24 @@ __all__ = [
     "pine_calc",
     "trade_manager",
     "simulator",
+    "fast_simulator",
     "screener",
     "signals",
+    "stream_signals",
+    "events",
+    "portfolio",
+    "sweep",
+    "bench",
+    "datastore",
+    "walkforward",
+    "montecarlo",
+    "metrics",
+    "batch_simulator",
+    "profiling",
+    "kernels",
+    "timeframes",
+    "pine_scan",
+    "parity",
+    "cli",
+    "run_cache",
 ]
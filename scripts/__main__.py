@@ -0,0 +1,6 @@
+"""`python -m scripts <command>`: see `scripts.cli`."""
+import sys
+
+from scripts.cli import main
+
+sys.exit(main())
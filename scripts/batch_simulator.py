@@ -0,0 +1,182 @@
+"""Many parameter sets simulated together, one bar at a time.
+
+`simulate_batch` runs K independent accounts in lockstep: balances, counters and the one
+position each account may hold (a `trade_manager.PositionBatch` slot) are length-K
+arrays, every setting may be a scalar or a length-K array, and each bar updates all K
+accounts with array operations. Prices and signals are either shared by all accounts
+(1-D) or given per account (K x bars). The rules and the floating point operations are
+those of `Simulator.step`, so account k ends exactly where `run_simulation` with the
+k-th settings does.
+
+`sweep.run_batch_sweep` uses it for grids whose sets share their signal parameters, for
+example over `slPercent` / `tpPercent` / `avgDistancePercent`.
+"""
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from scripts import pine_calc
+from scripts.trade_manager import PositionBatch
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+@dataclass
+class BatchResult:
+    """Per-account counterparts of the `SimulationResult` fields, plus risk figures."""
+    final_balance: np.ndarray
+    total_profit: np.ndarray
+    total_commission: np.ndarray
+    wins: np.ndarray
+    losses: np.ndarray
+    trades: np.ndarray
+    liquidations: np.ndarray  # closes with reason 'LIQ'
+    max_drawdown: np.ndarray  # largest fall of the realized balance from its peak (fraction)
+
+    def __len__(self) -> int:
+        return len(self.final_balance)
+
+
+def _per_account(value, k: int, dtype) -> np.ndarray:
+    arr = np.asarray(value, dtype=dtype)
+    if arr.ndim == 0:
+        return np.full(k, arr, dtype=dtype)
+    if arr.shape != (k,):
+        raise ValueError(f'expected a scalar or {k} values, got shape {arr.shape}')
+    return arr
+
+
+def simulate_batch(
+    prices: np.ndarray,
+    signals: np.ndarray,
+    n: Optional[int] = None,
+    initial_balance: ArrayLike = 1000.0,
+    risk_per_trade: ArrayLike = 1.0,
+    leverage: ArrayLike = 10.0,
+    commission_rate: ArrayLike = 0.1,
+    margin_type: Union[str, Sequence[str]] = 'Cross',
+    useSL: ArrayLike = False,
+    useTP: ArrayLike = False,
+    slPercent: ArrayLike = 1.0,
+    tpPercent: ArrayLike = 2.0,
+    useAveraging: ArrayLike = True,
+    avgDistancePercent: ArrayLike = 5.0,
+    martingaleMultiplier: ArrayLike = 2.0,
+    maxAvgCount: ArrayLike = 3,
+    min_notional: ArrayLike = 1.0,
+) -> BatchResult:
+    """Simulate `n` accounts; settings are scalars or one value per account.
+
+    `prices` and `signals` (codes 1 / -1 / 0, see `fast_simulator.encode_signals`) are
+    1-D and shared, or (n x bars) with a row per account. `n` defaults to the number of
+    rows, or to the length of the array settings.
+    """
+    closes = np.asarray(prices, dtype=np.float64)
+    codes = np.asarray(signals, dtype=np.int8)
+    if n is None:
+        sizes = {np.size(v) for v in (initial_balance, risk_per_trade, leverage, commission_rate, useSL, useTP, slPercent, tpPercent, useAveraging, avgDistancePercent, martingaleMultiplier, maxAvgCount, min_notional) if np.ndim(v)}
+        if closes.ndim == 2:
+            sizes.add(closes.shape[0])
+        if codes.ndim == 2:
+            sizes.add(codes.shape[0])
+        if len(sizes) > 1:
+            raise ValueError(f'inconsistent batch sizes: {sorted(sizes)}')
+        n = sizes.pop() if sizes else 1
+    n_bars = closes.shape[-1]
+    assert codes.shape[-1] == n_bars and closes.ndim in (1, 2) and codes.ndim in (1, 2)
+
+    balance = _per_account(initial_balance, n, np.float64).copy()
+    risk = _per_account(risk_per_trade, n, np.float64)
+    lev = _per_account(leverage, n, np.float64)
+    commission_rate = _per_account(commission_rate, n, np.float64)
+    useSL = _per_account(useSL, n, bool)
+    useTP = _per_account(useTP, n, bool)
+    slPercent = _per_account(slPercent, n, np.float64)
+    tpPercent = _per_account(tpPercent, n, np.float64)
+    useAveraging = _per_account(useAveraging, n, bool)
+    avgDistancePercent = _per_account(avgDistancePercent, n, np.float64)
+    martingaleMultiplier = _per_account(martingaleMultiplier, n, np.float64)
+    maxAvgCount = _per_account(maxAvgCount, n, np.int64)
+    min_notional = _per_account(min_notional, n, np.float64)
+    margin_types = [margin_type] * n if isinstance(margin_type, str) else list(margin_type)
+    # liquidation price is linear in the average price
+    liq_long = np.array([pine_calc.calculate_liquidation_price(1.0, True, l, m) for l, m in zip(lev.tolist(), margin_types)])
+    liq_short = np.array([pine_calc.calculate_liquidation_price(1.0, False, l, m) for l, m in zip(lev.tolist(), margin_types)])
+
+    book = PositionBatch(n)
+    total_profit = np.zeros(n)
+    total_commission = np.zeros(n)
+    wins = np.zeros(n, dtype=np.int64)
+    losses = np.zeros(n, dtype=np.int64)
+    trades = np.zeros(n, dtype=np.int64)
+    liquidations = np.zeros(n, dtype=np.int64)
+    peak = balance.copy()
+    max_dd = np.zeros(n)
+    has_signal = (codes != 0) if codes.ndim == 1 else (codes != 0).any(axis=0)
+    shared_close = np.empty(n)
+
+    def funds_ok(idx: np.ndarray, trade_vol: np.ndarray, price: np.ndarray) -> np.ndarray:
+        # `check_sufficient_funds` with the account's one position as the used margin
+        used = np.where(book.active[idx], book.total_volume[idx] * book.entry_price[idx], 0.0) / lev[idx]
+        return (trade_vol * price) / lev[idx] <= balance[idx] - used
+
+    for t in range(n_bars):
+        if not has_signal[t] and not book.active.any():
+            continue
+        if closes.ndim == 1:
+            shared_close.fill(closes[t])
+            close = shared_close
+        else:
+            close = closes[:, t]
+        code = codes[t] if codes.ndim == 1 else codes[:, t]
+
+        # Opens: accounts with a signal and no position
+        idx = np.flatnonzero((code != 0) & ~book.active & (balance >= 0))
+        if idx.size:
+            price = close[idx]
+            pos_vol = np.minimum((balance[idx] * (risk[idx] / 100.0)) / price, (balance[idx] * lev[idx]) / price)
+            ok = (pos_vol > 0) & (pos_vol * price >= min_notional[idx]) & funds_ok(idx, pos_vol, price)
+            idx, price, pos_vol = idx[ok], price[ok], pos_vol[ok]
+            if idx.size:
+                book.is_long[idx] = (code[idx] if codes.ndim == 2 else code) > 0
+                book.open(idx, price, pos_vol, useSL, useTP, slPercent, tpPercent)
+                trades[idx] += 1
+
+        # Averaging
+        reached = book.active & useAveraging & (book.avg_count < maxAvgCount) & book.should_average(close, avgDistancePercent)
+        idx = np.flatnonzero(reached)
+        if idx.size:
+            idx = idx[funds_ok(idx, book.total_volume[idx] * martingaleMultiplier[idx], close[idx])]
+            if idx.size:
+                book.add_average(idx, close[idx], martingaleMultiplier)
+                book.update_targets(idx, useSL, useTP, slPercent, tpPercent)
+
+        # Closes: TP, then SL, then liquidation when no stop is used
+        is_long = book.is_long
+        tp_hit = useTP & np.where(is_long, close >= book.take_profit_price, close <= book.take_profit_price)
+        sl_hit = useSL & np.where(is_long, close <= book.stop_loss_price, close >= book.stop_loss_price)
+        ap = book.avg_price()
+        liq_hit = ~useSL & np.where(is_long, close <= ap * liq_long, close >= ap * liq_short)
+        idx = np.flatnonzero(book.active & (tp_hit | sl_hit | liq_hit))
+        if idx.size:
+            liquidations[idx] += liq_hit[idx] & ~tp_hit[idx]
+            profit, commission = book.close(idx, close[idx], commission_rate)
+            balance[idx] += profit
+            total_profit[idx] += profit
+            total_commission[idx] += commission
+            wins[idx] += profit >= 0
+            losses[idx] += profit < 0
+            np.maximum(peak, balance, out=peak)
+            np.maximum(max_dd, 1.0 - balance / peak, out=max_dd)
+
+    return BatchResult(
+        final_balance=balance,
+        total_profit=total_profit,
+        total_commission=total_commission,
+        wins=wins,
+        losses=losses,
+        trades=trades,
+        liquidations=liquidations,
+        max_drawdown=max_dd,
+    )
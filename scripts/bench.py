@@ -0,0 +1,231 @@
+"""Benchmarks for the simulator, signal and exporter hot paths.
+
+Prices are synthetic geometric Brownian motion and signals are drawn at a fixed density,
+so runs are reproducible for a given seed. Each case reports throughput (bars/s), events/s
+and peak traced memory. Results can be saved as a JSON baseline and later compared
+against it; a case whose throughput drops by more than the threshold is a regression.
+
+    python -m scripts.bench --sizes 10k,1m --save bench_baseline.json
+    python -m scripts.bench --sizes 10k,1m --compare bench_baseline.json --threshold 0.2
+"""
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+DENSITIES = (0.001, 0.01, 0.05)
+ENGINES = ('loop', 'fast')
+# modules a `scripts.cli` call or a sweep worker starts with, and their import budget (s)
+STARTUP_BUDGETS = {'scripts.cli': 0.2, 'scripts.simulator': 0.5, 'scripts.fast_simulator': 0.5, 'scripts.sweep': 0.5}
+# imports that must stay out of those start-ups
+HEAVY_MODULES = ('pandas', 'yfinance')
+_STARTUP_CODE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+print(json.dumps([time.perf_counter() - started, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+
+def gbm_prices(n: int, seed: int = 0, s0: float = 100.0, mu: float = 0.0, sigma: float = 0.001) -> np.ndarray:
+    """Geometric Brownian motion closes with per-bar drift `mu` and volatility `sigma`."""
+    rng = np.random.default_rng(seed)
+    steps = (mu - 0.5 * sigma ** 2) + sigma * rng.standard_normal(n)
+    return s0 * np.exp(np.cumsum(steps))
+
+
+def random_signals(n: int, density: float, seed: int = 0) -> List[Optional[str]]:
+    """'long'/'short' on about `density` of the bars each, None elsewhere."""
+    draw = np.random.default_rng(seed + 1).random(n)
+    out = np.full(n, None, dtype=object)
+    out[draw < density] = 'long'
+    out[draw > 1.0 - density] = 'short'
+    return out.tolist()
+
+
+def measure(fn: Callable[[], int], bars: int, repeat: int = 1) -> Dict[str, float]:
+    """Run `fn` (returning its event count) and report the best wall time of `repeat` runs.
+
+    Peak memory comes from one extra run under tracemalloc, kept out of the timings.
+    """
+    best = float('inf')
+    events = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        events = fn()
+        best = min(best, time.perf_counter() - started)
+    best = max(best, 1e-9)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'seconds': best,
+        'bars_per_s': bars / best,
+        'events': events,
+        'events_per_s': events / best,
+        'peak_mb': peak / 1e6,
+    }
+
+
+def _cases(size_label: str, n: int, densities: Sequence[float], engines: Sequence[str], seed: int, workdir: Path):
+    from scripts.export_events_to_tv_like import convert_events_to_trades
+    from scripts.signals import generate_signal_codes, generate_signals_from_series
+    from scripts.simulator import run_simulation
+
+    prices = gbm_prices(n, seed)
+    price_list = prices.tolist()
+
+    yield f'signals/{size_label}', n, lambda: sum(s is not None for s in generate_signals_from_series(price_list))
+    yield f'signal-codes/{size_label}', n, lambda: int(np.count_nonzero(generate_signal_codes(prices)))
+
+    for density in densities:
+        signals = random_signals(n, density, seed)
+        for engine in engines:
+            if engine == 'loop':
+                def run(signals=signals):
+                    return len(run_simulation(price_list, signals, useTP=True, useSL=True, record_events=True).events)
+            else:
+                from scripts.fast_simulator import encode_signals, run_simulation_fast
+                codes = encode_signals(signals)
+
+                def run(codes=codes):
+                    return len(run_simulation_fast(prices, codes, useTP=True, useSL=True, record_events=True).events)
+            yield f'simulate-{engine}/{size_label}/d={density:g}', n, run
+
+    density = densities[-1]
+    res = run_simulation(price_list, random_signals(n, density, seed), useTP=True, useSL=True, record_events=True)
+    events_csv = workdir / f'events-{size_label}.csv'
+    price_csv = workdir / f'prices-{size_label}.csv'
+    res.events.to_csv(events_csv)
+    pd.DataFrame({'Close': prices}, index=pd.date_range('2000-01-01', periods=n, freq='min')).to_csv(price_csv)
+    out_csv = workdir / f'trades-{size_label}.csv'
+
+    def export():
+        convert_events_to_trades(str(events_csv), str(price_csv), str(out_csv))
+        return len(res.events)
+    yield f'export/{size_label}/d={density:g}', n, export
+
+
+def run_benchmarks(
+    sizes: Sequence[str] = ('10k',),
+    densities: Sequence[float] = DENSITIES,
+    engines: Sequence[str] = ENGINES,
+    seed: int = 0,
+    repeat: int = 1,
+    verbose: bool = False,
+) -> Dict:
+    """Run every case for the given sizes (labels from `SIZES` or bar counts) and return a results document."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in sizes:
+            n = SIZES[label] if label in SIZES else int(label)
+            for name, bars, fn in _cases(label, n, densities, engines, seed, Path(tmp)):
+                results[name] = measure(fn, bars, repeat=repeat)
+                if verbose:
+                    r = results[name]
+                    print(f"{name:40s} {r['bars_per_s']:>14,.0f} bars/s {r['events_per_s']:>12,.0f} ev/s {r['peak_mb']:>9.1f} MB")
+    return {
+        'meta': {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__, 'seed': seed},
+        'results': results,
+    }
+
+
+def measure_startup(module: str, repeat: int = 3) -> Dict:
+    """Best time to import `module` in a fresh interpreter, and the `HEAVY_MODULES` it loaded."""
+    root = Path(__file__).resolve().parents[1]
+    best = float('inf')
+    heavy: List[str] = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', _STARTUP_CODE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=root, capture_output=True, text=True, check=True,
+        ).stdout
+        seconds, heavy = json.loads(out)
+        best = min(best, seconds)
+    return {'seconds': best, 'heavy': heavy}
+
+
+def check_startup(budgets: Optional[Dict[str, float]] = None, repeat: int = 3) -> Tuple[Dict[str, Dict], List[str]]:
+    """`measure_startup` of every module of `budgets`, and the problems found: over
+    budget or loading heavy modules."""
+    results = {}
+    problems = []
+    for module, budget in (budgets or STARTUP_BUDGETS).items():
+        r = results[module] = measure_startup(module, repeat)
+        if r['heavy']:
+            problems.append(f"{module} imports {', '.join(r['heavy'])}")
+        if r['seconds'] > budget:
+            problems.append(f"{module} takes {r['seconds']:.3f}s to import (budget {budget}s)")
+    return results, problems
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.2) -> List[Tuple[str, float]]:
+    """Cases present in both whose bars/s fell by more than `threshold` (as a fraction).
+
+    Returns `(case, relative change)` pairs, e.g. -0.35 for a 35% slowdown.
+    """
+    regressions = []
+    for name, base in baseline['results'].items():
+        cur = current['results'].get(name)
+        if cur is None:
+            continue
+        change = cur['bars_per_s'] / base['bars_per_s'] - 1.0
+        if change < -threshold:
+            regressions.append((name, change))
+    return regressions
+
+
+if __name__ == '__main__':
+    import argparse
+
+    p = argparse.ArgumentParser(description='Benchmark simulator, signal and exporter hot paths')
+    p.add_argument('--sizes', default='10k,100k', help=f"comma-separated labels ({','.join(SIZES)}) or bar counts")
+    p.add_argument('--densities', default=','.join(str(d) for d in DENSITIES))
+    p.add_argument('--engines', default=','.join(ENGINES))
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--repeat', type=int, default=1)
+    p.add_argument('--save', default=None, help='Write results as a JSON baseline')
+    p.add_argument('--compare', default=None, help='Baseline JSON to compare against')
+    p.add_argument('--threshold', type=float, default=0.2, help='Allowed throughput drop (fraction)')
+    p.add_argument('--startup', action='store_true', help='Only check module import times against STARTUP_BUDGETS')
+    args = p.parse_args()
+
+    if args.startup:
+        results, problems = check_startup(repeat=max(args.repeat, 3))
+        for module, r in results.items():
+            print(f"{module:30s} {r['seconds'] * 1e3:8.1f} ms (budget {STARTUP_BUDGETS[module] * 1e3:.0f} ms)")
+        for problem in problems:
+            print('STARTUP', problem)
+        raise SystemExit(1 if problems else 0)
+
+    doc = run_benchmarks(
+        sizes=args.sizes.split(','),
+        densities=[float(d) for d in args.densities.split(',')],
+        engines=args.engines.split(','),
+        seed=args.seed,
+        repeat=args.repeat,
+        verbose=True,
+    )
+    if args.save:
+        Path(args.save).write_text(json.dumps(doc, indent=2))
+        print('Saved', args.save)
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(doc, baseline, args.threshold)
+        for name, change in regressions:
+            print(f'REGRESSION {name}: {change:+.1%} bars/s')
+        if regressions:
+            raise SystemExit(1)
+        print('No regressions above', f'{args.threshold:.0%}')
@@ -0,0 +1,117 @@
+"""`backtest`: one entry point for the project's command-line tools.
+
+    python -m scripts run --prices pine/data/AAPL.csv --set useSL=false --set leverage=20
+    python -m scripts sweep --prices pine/data/AAPL.csv --grid rsiLength=10,14 --batch
+    python -m scripts export --events events.csv --prices pine/data/AAPL.csv
+    python -m scripts fetch AAPL --period 1y
+
+`run` simulates one price CSV; the other subcommands hand their arguments to the CLI of
+the module they name (`python -m scripts <command> --help` shows its options). Modules
+are imported only when their command runs, so starting the CLI costs no more than
+argparse, and only `fetch` loads yfinance (see `bench.STARTUP_BUDGETS`).
+"""
+import argparse
+import runpy
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# subcommands served by the `__main__` block of a module
+MODULE_COMMANDS = {
+    'sweep': ('scripts.sweep', 'Parallel or batched parameter sweep'),
+    'walkforward': ('scripts.walkforward', 'Walk-forward optimization'),
+    'export': ('scripts.export_events_to_tv_like', 'Events CSV to a TradingView-like trade list'),
+    'fetch': ('scripts.screener', 'Download OHLCV data with yfinance'),
+    'parity': ('scripts.parity', 'Compare TradingView trade exports with the simulator'),
+    'bench': ('scripts.bench', 'Benchmarks and start-up budgets'),
+}
+
+
+def parse_setting(item: str, reserved: Sequence[str] = ()) -> Tuple[str, Any]:
+    """`name=value` for a `run_simulation_from_prices` parameter, typed like its default.
+
+    `reserved` are the parameters the calling command sets itself.
+    """
+    from scripts.simulator import FROM_PRICES_DEFAULTS
+
+    key, _, text = item.partition('=')
+    if key not in FROM_PRICES_DEFAULTS or not text:
+        raise ValueError(f'expected name=value with a run_simulation_from_prices parameter, got {item!r}')
+    if key in reserved:
+        raise ValueError(f'{key} is set by this command, not with --set')
+    default = FROM_PRICES_DEFAULTS[key]
+    if isinstance(default, bool):
+        return key, text.lower() in ('1', 'true', 'yes', 'on')
+    if isinstance(default, int):
+        value = float(text)
+        if not value.is_integer():
+            raise ValueError(f'{key} must be an integer, got {text!r}')
+        return key, int(value)
+    if isinstance(default, (float, str)):
+        return key, type(default)(text)
+    raise ValueError(f'{key} cannot be set from the command line')
+
+
+def parse_settings(items: Sequence[str], reserved: Sequence[str] = ()) -> Dict[str, Any]:
+    return dict(parse_setting(item, reserved) for item in items)
+
+
+def _run(args: argparse.Namespace) -> int:
+    import numpy as np
+    import pandas as pd
+
+    from scripts.simulator import run_simulation_from_prices
+
+    params = parse_settings(args.set, reserved=('engine', 'record_events'))
+    closes = pd.read_csv(args.prices, index_col=0)[args.column].to_numpy(dtype=np.float64)
+    res = run_simulation_from_prices(closes, engine=args.engine, record_events=bool(args.events), **params)
+    print(f'final_balance={res.final_balance:.6g} total_profit={res.total_profit:.6g} '
+          f'total_commission={res.total_commission:.6g} trades={res.trades} wins={res.wins} losses={res.losses}')
+    if args.events:
+        res.events.to_csv(args.events)
+        print('Wrote', args.events)
+    return 0
+
+
+def _run_module(module: str, argv: List[str]) -> int:
+    saved = sys.argv
+    sys.argv = [module, *argv]
+    try:
+        # alter_sys makes the module `__main__` while it runs, so pool workers can
+        # unpickle the functions it defines
+        runpy.run_module(module, run_name='__main__', alter_sys=True)
+    except SystemExit as exc:
+        return exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+    finally:
+        sys.argv = saved
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog='backtest', description='Backtest tools for the Pine strategy')
+    sub = p.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help='Simulate one price CSV')
+    run.add_argument('--prices', required=True, help='Price CSV (pine/data/<TICKER>.csv)')
+    run.add_argument('--column', default='Close')
+    run.add_argument('--engine', default='fast', choices=('loop', 'fast'))
+    run.add_argument('--set', action='append', default=[], help='name=value strategy input (repeatable)')
+    run.add_argument('--events', default=None, help='Write the event log to this CSV')
+    for name, (_, help_text) in MODULE_COMMANDS.items():
+        # everything after the command name goes to the module's own parser
+        sub.add_parser(name, help=help_text, add_help=False)
+    return p
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] in MODULE_COMMANDS:
+        return _run_module(MODULE_COMMANDS[argv[0]][0], argv[1:])
+    args = build_parser().parse_args(argv)
+    try:
+        return _run(args)
+    except ValueError as exc:
+        print(f'backtest {args.command}: {exc}', file=sys.stderr)
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
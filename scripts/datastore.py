@@ -0,0 +1,262 @@
+"""Local columnar market-data store.
+
+Bars are kept as one `.npy` file per column under
+
+    <root>/<ticker>/<interval>/<partition>/<column>.npy
+
+where the partition is the year (or month/day, chosen per ticker and interval) of the
+bars it holds and `timestamp.npy` holds int64 nanoseconds since the epoch (UTC). Files
+are opened memory-mapped, so a read only touches the partitions that overlap the
+requested date range and only the requested columns inside them.
+
+    store = MarketDataStore('pine/store')
+    store.import_csv('pine/data/AAPL.csv', interval='1d')
+    closes = store.read('AAPL', '1d', columns=['Close'], start='2020-01-01')['Close']
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = Path('pine/store')
+TIMESTAMP = 'timestamp'
+# partition granularity -> numpy datetime unit of the partition key
+PARTITIONS = {'year': 'Y', 'month': 'M', 'day': 'D'}
+
+DateLike = Union[str, pd.Timestamp, np.datetime64, None]
+
+
+def _safe_name(ticker: str) -> str:
+    return ticker.replace('/', '_')
+
+
+def _to_ns(value: DateLike, tz: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None and tz is not None:
+        ts = ts.tz_localize(tz)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return int(ts.as_unit('ns').value)
+
+
+class MarketDataStore:
+    """Reader/writer for the partitioned column layout described in the module docstring."""
+
+    def __init__(self, root: Union[str, Path] = STORE_DIR):
+        self.root = Path(root)
+
+    def _dir(self, ticker: str, interval: str) -> Path:
+        return self.root / _safe_name(ticker) / interval
+
+    def _meta(self, ticker: str, interval: str) -> Optional[Dict]:
+        path = self._dir(ticker, interval) / 'meta.json'
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def tickers(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def intervals(self, ticker: str) -> List[str]:
+        base = self.root / _safe_name(ticker)
+        return sorted(p.name for p in base.iterdir() if (p / 'meta.json').exists()) if base.exists() else []
+
+    def partitions(self, ticker: str, interval: str) -> List[str]:
+        base = self._dir(ticker, interval)
+        return sorted(p.name for p in base.iterdir() if p.is_dir()) if base.exists() else []
+
+    def columns(self, ticker: str, interval: str) -> List[str]:
+        meta = self._meta(ticker, interval)
+        return list(meta['columns']) if meta else []
+
+    def last_timestamp(self, ticker: str, interval: str) -> Optional[pd.Timestamp]:
+        """Time of the newest stored bar (in the stored time zone), or None if there is none."""
+        meta = self._meta(ticker, interval)
+        parts = self.partitions(ticker, interval)
+        if meta is None or not parts:
+            return None
+        ts = np.load(self._dir(ticker, interval) / parts[-1] / f'{TIMESTAMP}.npy', mmap_mode='r')
+        last = pd.Timestamp(int(ts[-1]))
+        return last.tz_localize('UTC').tz_convert(meta['tz']) if meta['tz'] is not None else last
+
+    def write(self, ticker: str, interval: str, df: pd.DataFrame, partition: str = 'year') -> None:
+        """Merge `df` (DatetimeIndex, one column per field) into the store.
+
+        Rows whose timestamp is already stored are replaced by the new ones. The
+        partition granularity is fixed by the first write of a ticker/interval.
+        """
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise TypeError('df must have a DatetimeIndex')
+        meta = self._meta(ticker, interval)
+        if meta is None:
+            if partition not in PARTITIONS:
+                raise ValueError(f"unknown partition: {partition!r}")
+            tz = str(df.index.tz) if df.index.tz is not None else None
+            meta = {'columns': [], 'partition': partition, 'tz': tz}
+        for col in df.columns:
+            if col not in meta['columns']:
+                meta['columns'].append(str(col))
+        if df.empty:
+            return
+
+        index = df.index if df.index.tz is None else df.index.tz_convert('UTC').tz_localize(None)
+        ts = index.as_unit('ns').asi8
+        keys = ts.astype('datetime64[ns]').astype(f"datetime64[{PARTITIONS[meta['partition']]}]")
+        base = self._dir(ticker, interval)
+        for key in np.unique(keys):
+            rows = keys == key
+            new = {TIMESTAMP: ts[rows]}
+            for col in df.columns:
+                new[str(col)] = df[col].to_numpy()[rows]
+            self._merge_partition(base / str(key), new, meta['columns'])
+        base.mkdir(parents=True, exist_ok=True)
+        (base / 'meta.json').write_text(json.dumps(meta))
+
+    @staticmethod
+    def _merge_partition(path: Path, new: Dict[str, np.ndarray], columns: Sequence[str]) -> None:
+        n_new = len(new[TIMESTAMP])
+        if (path / f'{TIMESTAMP}.npy').exists():
+            old_ts = np.load(path / f'{TIMESTAMP}.npy')
+            keep = ~np.isin(old_ts, new[TIMESTAMP])
+            merged = {TIMESTAMP: np.concatenate([old_ts[keep], new[TIMESTAMP]])}
+            for col in columns:
+                old_path = path / f'{col}.npy'
+                old = np.load(old_path)[keep] if old_path.exists() else np.full(int(keep.sum()), np.nan)
+                values = new.get(col, np.full(n_new, np.nan))
+                merged[col] = np.concatenate([old, values])
+        else:
+            merged = {TIMESTAMP: new[TIMESTAMP]}
+            for col in columns:
+                merged[col] = new.get(col, np.full(n_new, np.nan))
+        order = np.argsort(merged[TIMESTAMP], kind='stable')
+        path.mkdir(parents=True, exist_ok=True)
+        for name, values in merged.items():
+            values = np.asarray(values)
+            if values.dtype == object:
+                values = values.astype(np.float64)
+            # write next to the target and rename, so readers never see a partial file
+            tmp = path / f'.{name}.npy.tmp'
+            with open(tmp, 'wb') as fh:
+                np.save(fh, values[order])
+            os.replace(tmp, path / f'{name}.npy')
+
+    def read(
+        self,
+        ticker: str,
+        interval: str,
+        columns: Optional[Sequence[str]] = None,
+        start: DateLike = None,
+        end: DateLike = None,
+    ) -> pd.DataFrame:
+        """Bars with `start <= time <= end` (both optional), restricted to `columns`.
+
+        Naive `start`/`end` are taken in the stored time zone.
+        """
+        arrays = self.read_arrays(ticker, interval, columns, start, end)
+        meta = self._meta(ticker, interval)
+        index = pd.DatetimeIndex(arrays.pop(TIMESTAMP).view('datetime64[ns]'))
+        if meta['tz'] is not None:
+            index = index.tz_localize('UTC').tz_convert(meta['tz'])
+        return pd.DataFrame(arrays, index=index, copy=False)
+
+    def read_arrays(
+        self,
+        ticker: str,
+        interval: str,
+        columns: Optional[Sequence[str]] = None,
+        start: DateLike = None,
+        end: DateLike = None,
+    ) -> Dict[str, np.ndarray]:
+        """Like `read` but returns `{'timestamp': int64 ns, column: values, ...}`.
+
+        A range inside a single partition comes back as read-only memory-mapped views,
+        without copying.
+        """
+        meta = self._meta(ticker, interval)
+        if meta is None:
+            raise KeyError(f'{ticker} {interval} not in store {self.root}')
+        columns = list(meta['columns']) if columns is None else list(columns)
+        missing = set(columns) - set(meta['columns'])
+        if missing:
+            raise KeyError(f'unknown columns: {sorted(missing)}')
+        lo = _to_ns(start, meta['tz'])
+        hi = _to_ns(end, meta['tz'])
+        unit = PARTITIONS[meta['partition']]
+        lo_key = str(np.datetime64(lo, 'ns').astype(f'datetime64[{unit}]')) if lo is not None else None
+        hi_key = str(np.datetime64(hi, 'ns').astype(f'datetime64[{unit}]')) if hi is not None else None
+
+        base = self._dir(ticker, interval)
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in [TIMESTAMP] + columns}
+        for key in self.partitions(ticker, interval):
+            # partition keys are ISO dates of one granularity, so they sort as strings
+            if (lo_key is not None and key < lo_key) or (hi_key is not None and key > hi_key):
+                continue
+            ts = np.load(base / key / f'{TIMESTAMP}.npy', mmap_mode='r')
+            a = int(np.searchsorted(ts, lo, 'left')) if lo is not None else 0
+            b = int(np.searchsorted(ts, hi, 'right')) if hi is not None else len(ts)
+            if a >= b:
+                continue
+            parts[TIMESTAMP].append(ts[a:b])
+            for col in columns:
+                path = base / key / f'{col}.npy'
+                # a column added by a later write only has files in the partitions it touched
+                parts[col].append(np.load(path, mmap_mode='r')[a:b] if path.exists() else np.full(b - a, np.nan))
+        out = {}
+        for name, chunks in parts.items():
+            if len(chunks) == 1:
+                out[name] = chunks[0]
+            elif chunks:
+                out[name] = np.concatenate(chunks)
+            else:
+                out[name] = np.empty(0, dtype=np.int64 if name == TIMESTAMP else np.float64)
+        return out
+
+    def import_csv(self, path: Union[str, Path], ticker: Optional[str] = None, interval: str = '1d', partition: str = 'year') -> str:
+        """Load a CSV written by `screener.fetch_and_save` into the store; returns the ticker.
+
+        The ticker defaults to the file name. Extra header rows written by newer yfinance
+        versions (ticker / date labels) are dropped.
+        """
+        path = Path(path)
+        ticker = ticker or path.stem
+        df = pd.read_csv(path, index_col=0)
+        try:
+            index = pd.to_datetime(df.index, errors='coerce', format='mixed')
+        except ValueError:
+            # intraday downloads mix UTC offsets across DST changes
+            index = pd.to_datetime(df.index, errors='coerce', format='mixed', utc=True)
+        df = df[~index.isna()].apply(pd.to_numeric, errors='coerce')
+        df.index = index[~index.isna()]
+        df.index.name = None
+        self.write(ticker, interval, df, partition=partition)
+        return ticker
+
+
+def import_csv_dir(data_dir: Union[str, Path] = 'pine/data', store: Optional[MarketDataStore] = None, interval: str = '1d', partition: str = 'year') -> List[str]:
+    """Import every `*.csv` of `data_dir` (the screener's output) into `store`."""
+    store = store or MarketDataStore()
+    return [store.import_csv(path, interval=interval, partition=partition) for path in sorted(Path(data_dir).glob('*.csv'))]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    p = argparse.ArgumentParser(description='Import screener CSVs into the columnar data store')
+    p.add_argument('csv', nargs='*', help='CSV files (default: every CSV in --data-dir)')
+    p.add_argument('--data-dir', default='pine/data')
+    p.add_argument('--store', default=str(STORE_DIR))
+    p.add_argument('--interval', default='1d')
+    p.add_argument('--partition', default='year', choices=sorted(PARTITIONS))
+    args = p.parse_args()
+
+    store = MarketDataStore(args.store)
+    if args.csv:
+        imported = [store.import_csv(path, interval=args.interval, partition=args.partition) for path in args.csv]
+    else:
+        imported = import_csv_dir(args.data_dir, store, interval=args.interval, partition=args.partition)
+    print('Imported', ', '.join(imported) if imported else 'nothing', 'into', store.root)
@@ -0,0 +1,192 @@
+"""Columnar event log recorded by the simulator when `record_events=True`.
+
+Events are stored in preallocated, typed NumPy columns that grow by doubling, instead of
+one dict per event. The log still behaves as a sequence of the dicts the simulator used
+to produce (`log[i]`, iteration, comparison with a list), while `columns()`,
+`to_pandas()`, `to_arrow()`, `to_csv()` and `to_parquet()` work on the arrays directly.
+"""
+from pathlib import Path
+from typing import Dict, Iterator, List, Union
+
+import numpy as np
+
+EVENT_TYPES = ('open', 'avg', 'close')
+SIDES = ('long', 'short')
+REASONS = ('TP', 'SL', 'LIQ')
+
+OPEN, AVG, CLOSE = 0, 1, 2
+LONG_SIDE, SHORT_SIDE = 0, 1
+NO_REASON = -1
+
+_DTYPES = {
+    'type': np.int8,
+    'side': np.int8,
+    'bar': np.int64,
+    'price': np.float64,
+    'volume': np.float64,
+    'profit': np.float64,
+    'commission': np.float64,
+    'reason': np.int8,
+    'avg_count': np.int32,
+}
+# value of a column for events that do not set it
+_FILL = {'volume': np.nan, 'profit': np.nan, 'commission': np.nan, 'reason': NO_REASON, 'avg_count': 0}
+
+
+class EventLog:
+    """Growable struct-of-arrays event buffer.
+
+    `volume` holds the opened volume for 'open' events and the added volume for 'avg'
+    events; `profit`, `commission` and `reason` are only set on 'close' events.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._cols = {name: self._empty(name, max(capacity, 1)) for name in _DTYPES}
+        self._n = 0
+
+    @staticmethod
+    def _empty(name: str, size: int) -> np.ndarray:
+        if name in _FILL:
+            return np.full(size, _FILL[name], dtype=_DTYPES[name])
+        return np.zeros(size, dtype=_DTYPES[name])
+
+    def _next_row(self) -> int:
+        n = self._n
+        capacity = len(self._cols['type'])
+        if n == capacity:
+            for name, col in self._cols.items():
+                grown = self._empty(name, capacity * 2)
+                grown[:n] = col
+                self._cols[name] = grown
+        self._n = n + 1
+        return n
+
+    def add_open(self, bar: int, side: str, price: float, volume: float) -> None:
+        i = self._next_row()
+        c = self._cols
+        c['type'][i] = OPEN
+        c['side'][i] = LONG_SIDE if side == 'long' else SHORT_SIDE
+        c['bar'][i] = bar
+        c['price'][i] = price
+        c['volume'][i] = volume
+
+    def add_avg(self, bar: int, side: str, price: float, new_volume: float, avg_count: int) -> None:
+        i = self._next_row()
+        c = self._cols
+        c['type'][i] = AVG
+        c['side'][i] = LONG_SIDE if side == 'long' else SHORT_SIDE
+        c['bar'][i] = bar
+        c['price'][i] = price
+        c['volume'][i] = new_volume
+        c['avg_count'][i] = avg_count
+
+    def add_close(self, bar: int, side: str, price: float, profit: float, commission: float, reason: str) -> None:
+        i = self._next_row()
+        c = self._cols
+        c['type'][i] = CLOSE
+        c['side'][i] = LONG_SIDE if side == 'long' else SHORT_SIDE
+        c['bar'][i] = bar
+        c['price'][i] = price
+        c['profit'][i] = profit
+        c['commission'][i] = commission
+        c['reason'][i] = REASONS.index(reason)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Views (no copy) of the filled part of every column."""
+        n = self._n
+        return {name: col[:n] for name, col in self._cols.items()}
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> Dict:
+        """Event `i` as the dict `run_simulation` used to record."""
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError('event index out of range')
+        c = self._cols
+        kind = int(c['type'][i])
+        event = {'type': EVENT_TYPES[kind], 'side': SIDES[int(c['side'][i])], 'price': float(c['price'][i])}
+        if kind == OPEN:
+            event['volume'] = float(c['volume'][i])
+        elif kind == AVG:
+            event['new_volume'] = float(c['volume'][i])
+            event['avg_count'] = int(c['avg_count'][i])
+        else:
+            event['profit'] = float(c['profit'][i])
+            event['commission'] = float(c['commission'][i])
+            event['reason'] = REASONS[int(c['reason'][i])]
+        event['bar'] = int(c['bar'][i])
+        return event
+
+    def __iter__(self) -> Iterator[Dict]:
+        return (self[i] for i in range(self._n))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, EventLog):
+            mine, theirs = self.columns(), other.columns()
+            return len(self) == len(other) and all(
+                np.array_equal(mine[k], theirs[k], equal_nan=mine[k].dtype.kind == 'f') for k in mine
+            )
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"EventLog({self._n} events)"
+
+    def to_dict(self) -> Dict[str, List]:
+        """Columns as plain lists (JSON-serialisable); inverse of `from_dict`."""
+        return {name: col.tolist() for name, col in self.columns().items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List]) -> 'EventLog':
+        n = len(data['type'])
+        log = cls(capacity=n)
+        for name in _DTYPES:
+            log._cols[name][:n] = data[name]
+        log._n = n
+        return log
+
+    def to_pandas(self):
+        """DataFrame over the column buffers; type/side/reason become categoricals."""
+        import pandas as pd
+
+        c = self.columns()
+        data = {
+            'type': pd.Categorical.from_codes(c['type'], categories=list(EVENT_TYPES)),
+            'side': pd.Categorical.from_codes(c['side'], categories=list(SIDES)),
+            'bar': c['bar'],
+            'price': c['price'],
+            'volume': c['volume'],
+            'profit': c['profit'],
+            'commission': c['commission'],
+            'reason': pd.Categorical.from_codes(c['reason'], categories=list(REASONS)),
+            'avg_count': c['avg_count'],
+        }
+        return pd.DataFrame(data, copy=False)
+
+    def to_arrow(self):
+        """`pyarrow.Table` sharing the numeric buffers (requires pyarrow)."""
+        import pyarrow as pa
+
+        c = self.columns()
+        arrays = {}
+        for name, values in c.items():
+            if name in ('type', 'side', 'reason'):
+                labels = {'type': EVENT_TYPES, 'side': SIDES, 'reason': REASONS}[name]
+                indices = pa.array(values, mask=values < 0) if name == 'reason' else pa.array(values)
+                arrays[name] = pa.DictionaryArray.from_arrays(indices, pa.array(labels))
+            else:
+                arrays[name] = pa.array(values)
+        return pa.table(arrays)
+
+    def to_csv(self, path: Union[str, Path]) -> None:
+        """Write the events CSV read by `export_events_to_tv_like`."""
+        self.to_pandas().to_csv(path, index=False)
+
+    def to_parquet(self, path: Union[str, Path]) -> None:
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), str(path))
@@ -5,20 +5,92 @@ using the price CSV (pine/data/<TICKER>.csv) and outputs a CSV with columns simi
 TradingView's trade list: Entry Time, Exit Time, Side, Entry Price, Exit Price, Quantity,
 Profit, Commission, Reason
 """
+from functools import lru_cache
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from typing import Optional
 
 
+def load_price_index(price_csv: str) -> pd.Index:
+    """Timestamp index of the price CSV, parsed once per file version."""
+    p = Path(price_csv)
+    return _load_price_index(str(p.resolve()), p.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _load_price_index(path: str, mtime_ns: int) -> pd.Index:
+    # only the first (date) column is needed to map bars to times
+    return pd.read_csv(path, index_col=0, usecols=[0], parse_dates=True).index
+
+
+def bars_to_datetimes(index: pd.Index, bars) -> pd.Series:
+    """Map bar numbers to `index` entries in one lookup; missing/out-of-range bars give NaT/None."""
+    bars = pd.to_numeric(pd.Series(bars, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+    valid = ~np.isnan(bars)
+    valid[valid] = (bars[valid] >= 0) & (bars[valid] < len(index))
+    positions = np.where(valid, bars, 0).astype(np.int64)
+    if len(index) == 0:
+        return pd.Series([None] * len(bars), dtype=object)
+    times = pd.Series(index.take(positions))
+    return times.where(valid, None)
+
+
 def bar_to_datetime(price_csv: str, bar_idx: int) -> Optional[pd.Timestamp]:
-    price_df = pd.read_csv(price_csv, index_col=0, parse_dates=True)
-    # bar_idx expected to be an integer index into price_df
+    # bar_idx expected to be an integer index into the price CSV rows
     if bar_idx is None or pd.isna(bar_idx):
         return None
+    index = load_price_index(price_csv)
     idx = int(bar_idx)
-    if idx < 0 or idx >= len(price_df):
+    if idx < 0 or idx >= len(index):
         return None
-    return price_df.index[idx]
+    return index[idx]
+
+
+def pair_trades(df: pd.DataFrame) -> pd.DataFrame:
+    """Pair each close with the most recent unmatched open of the same side.
+
+    Returns one row per close with the entry/exit prices and bars; unmatched closes keep
+    empty entry fields. Opens never closed are dropped.
+    """
+    types = df['type'].to_numpy()
+    sides = df['side'].to_numpy()
+    open_rows = {}
+    close_rows = []
+    entry_rows = []
+    for i in np.flatnonzero((types == 'open') | (types == 'close')):
+        stack = open_rows.setdefault(sides[i], [])
+        if types[i] == 'open':
+            stack.append(i)
+        else:
+            close_rows.append(i)
+            entry_rows.append(stack.pop() if stack else -1)
+    close_rows = np.asarray(close_rows, dtype=np.int64)
+    entry_rows = np.asarray(entry_rows, dtype=np.int64)
+    matched = entry_rows >= 0
+    take = np.where(matched, entry_rows, 0)
+
+    def entry(col):
+        if col not in df.columns or len(df) == 0:
+            return pd.Series([None] * len(close_rows), dtype=object)
+        return pd.Series(df[col].to_numpy(dtype=object)[take]).where(matched, None)
+
+    def exit_(col):
+        if col not in df.columns:
+            return pd.Series([None] * len(close_rows), dtype=object)
+        return pd.Series(df[col].to_numpy(dtype=object)[close_rows])
+
+    return pd.DataFrame({
+        'side': pd.Series(sides[close_rows], dtype=object),
+        'entry_price': entry('price'),
+        'entry_bar': entry('bar'),
+        'quantity': entry('volume'),
+        'exit_price': exit_('price'),
+        'exit_bar': exit_('bar'),
+        'profit': exit_('profit'),
+        'commission': exit_('commission'),
+        'reason': exit_('reason'),
+    })
 
 
 def convert_events_to_trades(events_csv: str, price_csv: str, out_path: str) -> None:
@@ -26,56 +98,26 @@ def convert_events_to_trades(events_csv: str, price_csv: str, out_path: str) ->
     # Normalize columns
     df['type'] = df['type'].astype(str).str.lower()
     df['side'] = df['side'].astype(str).str.lower()
-    # We'll pair open -> close sequentially per side
-    trades = []
-
-    opens = []  # list of dicts: side, price, volume, bar
-    for _, row in df.iterrows():
-        t = row['type']
-        side = row.get('side')
-        if t == 'open':
-            opens.append({'side': side, 'entry_price': row.get('price'), 'quantity': row.get('volume'), 'entry_bar': row.get('bar')})
-        elif t == 'close':
-            # find the last open of same side (FIFO)
-            match_idx = None
-            for i in range(len(opens)-1, -1, -1):
-                if opens[i]['side'] == side:
-                    match_idx = i
-                    break
-            if match_idx is None:
-                # unmatched close — record as standalone
-                entry_price = None
-                entry_bar = None
-                quantity = None
-            else:
-                open_rec = opens.pop(match_idx)
-                entry_price = open_rec['entry_price']
-                entry_bar = open_rec['entry_bar']
-                quantity = open_rec['quantity']
-
-            exit_price = row.get('price')
-            exit_bar = row.get('bar')
-            profit = row.get('profit') if 'profit' in row else None
-            commission = row.get('commission') if 'commission' in row else None
-            reason = row.get('reason') if 'reason' in row else None
-
-            entry_time = bar_to_datetime(price_csv, entry_bar)
-            exit_time = bar_to_datetime(price_csv, exit_bar)
-
-            trades.append({
-                'Entry Time': entry_time,
-                'Exit Time': exit_time,
-                'Side': side,
-                'Entry Price': entry_price,
-                'Exit Price': exit_price,
-                'Quantity': quantity,
-                'Profit': profit,
-                'Commission': commission,
-                'Reason': reason,
-            })
+    # We'll pair open -> close per side, most recent open first
+    pairs = pair_trades(df)
+    index = load_price_index(price_csv)
 
+    trades = pd.DataFrame({
+        'Entry Time': bars_to_datetimes(index, pairs['entry_bar']),
+        'Exit Time': bars_to_datetimes(index, pairs['exit_bar']),
+        'Side': pairs['side'],
+        'Entry Price': pairs['entry_price'],
+        'Exit Price': pairs['exit_price'],
+        'Quantity': pairs['quantity'],
+        'Profit': pairs['profit'],
+        'Commission': pairs['commission'],
+        'Reason': pairs['reason'],
+    })
+    if trades.empty:
+        # no closed trades: same header-less file as writing an empty list of rows
+        trades = pd.DataFrame()
     out = Path(out_path)
-    pd.DataFrame(trades).to_csv(out, index=False)
+    trades.infer_objects().to_csv(out, index=False)
 
 
 if __name__ == '__main__':
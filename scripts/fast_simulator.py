@@ -0,0 +1,194 @@
+"""Event-driven NumPy engine equivalent to `scripts.simulator.run_simulation`.
+
+Instead of visiting every bar, the engine jumps between the bars where something can
+happen: the next entry signal while flat, or the first bar at which the open position
+averages or reaches TP/SL/liquidation. Those bars are located with array searches over
+the close prices; each of them is then processed by `Simulator.step`, exactly as the
+reference loop does, so the returned `SimulationResult` is identical. With OHLC bars the
+exit searches run over the highs and lows instead and the bars go through `step_ohlc`.
+"""
+from typing import Callable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from scripts import pine_calc
+from scripts.signals import _SIGNAL_OF_CODE
+from scripts.simulator import SimulationResult, Simulator
+from scripts.trade_manager import Position
+
+LONG = 1
+SHORT = -1
+
+# first window scanned by `_first_hit`; doubled after every miss
+_SEARCH_CHUNK = 256
+
+
+def encode_signals(signals: Union[Sequence[Optional[str]], np.ndarray]) -> np.ndarray:
+    """Return signals as an int8 array: 1 for 'long', -1 for 'short', 0 otherwise.
+
+    Numeric arrays are taken to be codes already and are only normalised with `np.sign`.
+    """
+    if isinstance(signals, np.ndarray) and signals.dtype.kind in 'iuf':
+        return np.sign(signals).astype(np.int8)
+    arr = np.asarray(signals, dtype=object)
+    return (arr == 'long').astype(np.int8) - (arr == 'short').astype(np.int8)
+
+
+def _first_hit(mask: Callable[[int, int], np.ndarray], start: int, n: int) -> int:
+    """First index >= start where `mask(lo, hi)` is True, or `n` if there is none.
+
+    Scans growing windows so the cost stays proportional to the distance travelled.
+    """
+    lo = start
+    chunk = _SEARCH_CHUNK
+    while lo < n:
+        hi = min(n, lo + chunk)
+        hits = np.flatnonzero(mask(lo, hi))
+        if hits.size:
+            return lo + int(hits[0])
+        lo = hi
+        chunk *= 2
+    return n
+
+
+def feed_fast(
+    sim: Simulator,
+    prices: Union[Sequence[float], np.ndarray],
+    signals: Union[Sequence[Optional[str]], np.ndarray],
+    ohlc: Optional[Tuple[Sequence[float], Sequence[float], Sequence[float]]] = None,
+) -> None:
+    """Equivalent of `sim.feed(prices, signals)` that only steps the bars that matter.
+
+    With `ohlc=(opens, highs, lows)` it is the equivalent of `sim.feed_ohlc` instead.
+    """
+    closes = np.ascontiguousarray(prices, dtype=np.float64)
+    codes = encode_signals(signals)
+    assert len(closes) == len(codes)
+    n = len(closes)
+    if ohlc is None:
+        highs = lows = closes
+    else:
+        opens, highs, lows = (np.ascontiguousarray(a, dtype=np.float64) for a in ohlc)
+        assert len(opens) == len(highs) == len(lows) == n
+        # the open lies within [low, high], so a gap through a level is found by these too
+    first_bar = sim.bar
+    signal_bars = np.flatnonzero(codes)
+
+    def next_signal_bar(start: int) -> int:
+        k = int(np.searchsorted(signal_bars, start))
+        return int(signal_bars[k]) if k < signal_bars.size else n
+
+    def next_position_bar(pos: Position, start: int) -> int:
+        # Nothing but the prices change while a position is open, so every condition
+        # checked by `Simulator.step` reduces to a comparison against `closes` (exits
+        # against `highs`/`lows`, which are the closes themselves without OHLC).
+        can_average = sim.useAveraging and pos.avg_count < sim.maxAvgCount
+        newVol = pos.total_volume * sim.martingaleMultiplier
+        liqPrice = None if sim.useSL else pine_calc.calculate_liquidation_price(pos.avg_price(), pos.is_long, sim.leverage, sim.margin_type)
+
+        def mask(lo: int, hi: int) -> np.ndarray:
+            seg = closes[lo:hi]
+            up, down = highs[lo:hi], lows[lo:hi]
+            hit = np.zeros(hi - lo, dtype=bool)
+            if pos.is_long:
+                if sim.useTP:
+                    hit |= up >= pos.take_profit_price
+                if sim.useSL:
+                    hit |= down <= pos.stop_loss_price
+                else:
+                    hit |= down <= liqPrice
+            else:
+                if sim.useTP:
+                    hit |= down <= pos.take_profit_price
+                if sim.useSL:
+                    hit |= up >= pos.stop_loss_price
+                else:
+                    hit |= up >= liqPrice
+            if can_average:
+                # the account is fixed until the next step, so check the whole segment at
+                # once; called directly, not through the simulator, so profiling only
+                # counts the per-step checks
+                funds = pine_calc.check_sufficient_funds(
+                    newVol, seg, sim.current_balance, sim.long_total_volume, sim.short_total_volume,
+                    sim.long_pos.active, sim.long_pos.entry_price or 0.0,
+                    sim.short_pos.active, sim.short_pos.entry_price or 0.0, sim.leverage)
+                hit |= pos.should_average(seg, sim.avgDistancePercent) & funds
+            return hit
+
+        return _first_hit(mask, start, n)
+
+    def next_bar(start: int) -> int:
+        if sim.long_pos.active:
+            return next_position_bar(sim.long_pos, start)
+        if sim.short_pos.active:
+            return next_position_bar(sim.short_pos, start)
+        return next_signal_bar(start)
+
+    curve = sim.equity
+    if curve is not None:
+        curve.reserve(n)
+    done = 0
+    i = next_bar(0)
+    while i < n:
+        if curve is not None and i > done:
+            # the skipped bars still get their mark-to-market equity
+            sim.mark_range(closes[done:i])
+        done = i + 1
+        if ohlc is None:
+            sim.step(float(closes[i]), _SIGNAL_OF_CODE[int(codes[i])], bar=first_bar + i)
+        else:
+            sim.step_ohlc(float(opens[i]), float(highs[i]), float(lows[i]), float(closes[i]), _SIGNAL_OF_CODE[int(codes[i])], bar=first_bar + i)
+        i = next_bar(i + 1)
+    if curve is not None and n > done:
+        sim.mark_range(closes[done:n])
+    sim.bar = first_bar + n
+
+
+def run_simulation_fast(
+    prices: Union[Sequence[float], np.ndarray],
+    signals: Union[Sequence[Optional[str]], np.ndarray],  # 'long' | 'short' | None, or 1 / -1 / 0
+    initial_balance: float = 1000.0,
+    risk_per_trade: float = 1.0,
+    leverage: float = 10.0,
+    commission_rate: float = 0.1,
+    margin_type: str = 'Cross',
+    useSL: bool = False,
+    useTP: bool = False,
+    slPercent: float = 1.0,
+    tpPercent: float = 2.0,
+    useAveraging: bool = True,
+    avgDistancePercent: float = 5.0,
+    martingaleMultiplier: float = 2.0,
+    maxAvgCount: int = 3,
+    min_notional: float = 1.0,
+    record_events: bool = False,
+    record_equity: bool = False,
+    stats=None,
+) -> SimulationResult:
+    """Drop-in replacement for `run_simulation` that accepts NumPy arrays."""
+    sim = Simulator(
+        initial_balance=initial_balance,
+        risk_per_trade=risk_per_trade,
+        leverage=leverage,
+        commission_rate=commission_rate,
+        margin_type=margin_type,
+        useSL=useSL,
+        useTP=useTP,
+        slPercent=slPercent,
+        tpPercent=tpPercent,
+        useAveraging=useAveraging,
+        avgDistancePercent=avgDistancePercent,
+        martingaleMultiplier=martingaleMultiplier,
+        maxAvgCount=maxAvgCount,
+        min_notional=min_notional,
+        record_events=record_events,
+        record_equity=record_equity,
+    )
+    if stats is not None:
+        stats.count('bars', len(prices))
+        stats.instrument(sim)
+        with stats.phase('simulate'):
+            feed_fast(sim, prices, signals)
+    else:
+        feed_fast(sim, prices, signals)
+    return sim.result()
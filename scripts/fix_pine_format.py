@@ -1,14 +1,12 @@
 #!/usr/bin/env python3
+import os
 import sys
 from pathlib import Path
 
+# runnable as `python scripts/fix_pine_format.py` as well as `python -m scripts.fix_pine_format`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-def paren_balance(s):
-    return s.count("(") - s.count(")")
-
-def quotes_balanced(s):
-    # simple check: counts of double quotes even
-    return s.count('"') % 2 == 0 and s.count("'") % 2 == 0
+from scripts.pine_scan import PineScanner, join_statements
 
 
 def fix_file(src, dst):
@@ -17,42 +15,15 @@ def fix_file(src, dst):
     if not src_p.exists():
         print(f"Source not found: {src}")
         return 2
-    buf = ""
-    out_lines = []
-    import re
-    stmt_split_re = re.compile(r"\)\s+(?=[a-zA-Z_][a-zA-Z0-9_]*\s*=)")
-    with src_p.open('r', encoding='utf-8') as f:
-        for raw in f:
-            line = raw.rstrip('\n')
-            if not buf:
-                buf = line
-            else:
-                buf += ' ' + line
-            # If parentheses and quotes are balanced we flush
-            if paren_balance(buf) == 0 and quotes_balanced(buf):
-                # collapse multiple spaces
-                cleaned = ' '.join(buf.split())
-                # split into multiple statements if something like ')  identifier = ' was merged
-                # replace pattern with ')\n' to ensure each statement is on its own line
-                cleaned = stmt_split_re.sub(')\n', cleaned)
-                for stmt in cleaned.split('\n'):
-                    out_lines.append(stmt)
-                buf = ""
-            else:
-                # continue accumulating
-                continue
-    # Flush remaining
-    if buf:
-        cleaned = ' '.join(buf.split())
-        cleaned = stmt_split_re.sub(')\n', cleaned)
-        for stmt in cleaned.split('\n'):
-            out_lines.append(stmt)
-
-    # Write output
+    # one pass: lines that leave a bracket or string open are merged with the next ones
+    # until the scanner sees everything closed, then split again at ') name ='
+    scanner = PineScanner()
     dst_p.parent.mkdir(parents=True, exist_ok=True)
-    with dst_p.open('w', encoding='utf-8') as f:
-        for l in out_lines:
-            f.write(l + '\n')
+    with src_p.open('r', encoding='utf-8') as f, dst_p.open('w', encoding='utf-8') as out:
+        for stmt in join_statements(f, scanner):
+            out.write(stmt + '\n')
+    for d in scanner.close():
+        print(f"{src}:{d}")
     print(f"Wrote cleaned file to: {dst}")
     return 0
 
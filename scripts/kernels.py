@@ -0,0 +1,301 @@
+"""NumPy kernels for the RSI / Bollinger Bands columns behind the signals.
+
+`rsi_bb` computes Wilder RSI and the Bollinger basis and bands of a float64 close array
+in one pass without building pandas objects; `rsi_multi` / `bollinger_multi` compute
+several lengths at once (one row each), so a sweep over `rsiLength` / `bbLength` pays
+for the shared work once. Closes may also be a (paths x bars) matrix, every path being
+computed along axis 1 exactly as it would be on its own. Outputs are preallocated (or
+passed in with `out=`) and filled chunk by chunk, `rsi_bb` alternating between the two
+indicators so each chunk of closes is read while it is still in cache:
+
+* the Wilder average `y[t] = (1 - a) * y[t-1] + a * x[t]` is evaluated per block in
+  closed form, `y[j] = w**j * (y0 + a * cumsum(x * w**-k))` with `w = 1 - a`, the block
+  being short enough for `w**-k` to stay finite;
+* the Bollinger window sums are rolling sums of `d = close - ref` and `d * d`, one add
+  per bar (`_band_increments`). Every `_bb_block(length)` bars they are recomputed from
+  the window itself around a new reference, its first finite close (`_band_sums`),
+  which keeps `var = E[d^2] - E[d]^2` well conditioned; a window whose sums lost too
+  many bits to cancellation (a spike leaving it) is summed directly. A window of equal
+  closes gets that close as basis and no width, a window holding a NaN or an infinity
+  is NaN.
+  `stream_signals.StreamingBollinger` runs the same updates bar by bar, so streaming
+  and batch bands are equal to the last bit.
+
+Results equal `signals.rsi` / `signals.bollinger_bands` (NaN warm-up included) to
+within floating point rounding; a close lying exactly on a band may compare either way.
+RSI inputs must be finite (`signals` falls back to pandas otherwise).
+"""
+import math
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# bars between recentrings of the Bollinger rolling sums (at least four windows)
+_BB_BLOCK = 64
+# a window whose square sum fell below this share of the updates that built it has lost
+# too many bits to cancellation (e.g. a spike leaving it) and is summed directly instead
+_CANCELLATION = 2.0 ** -26
+# bars per chunk of one path, bounding the temporaries
+_CHUNK_BARS = 1 << 14
+# (paths x bars) elements processed together
+_GROUP_SIZE = 1 << 20
+# largest w**-k used by the Wilder closed form
+_MAX_LOG_GROWTH = 300.0
+
+
+def _rows(close) -> Tuple[np.ndarray, bool]:
+    close = np.asarray(close, dtype=np.float64)
+    if close.ndim not in (1, 2):
+        raise ValueError('close must be a 1-D array or a (paths x bars) matrix')
+    return np.atleast_2d(close), close.ndim == 1
+
+
+def _check_lengths(lengths: Sequence[int]) -> np.ndarray:
+    lengths = np.asarray(lengths, dtype=np.int64).reshape(-1)
+    if (lengths < 1).any():
+        raise ValueError('lengths must be >= 1')
+    return lengths
+
+
+def _run(steps: List[Iterator[int]], n: int) -> None:
+    """Advance generators that yield how many bars they have written, in chunks, together."""
+    done = [0] * len(steps)
+    for target in range(_CHUNK_BARS, n + _CHUNK_BARS, _CHUNK_BARS):
+        target = min(target, n)
+        for k, step in enumerate(steps):
+            while done[k] < target:
+                done[k] = next(step)
+
+
+def _groups(paths: int, n: int) -> Iterator[slice]:
+    size = max(1, _GROUP_SIZE // max(n, 1))
+    return (slice(a, a + size) for a in range(0, paths, size))
+
+
+def rsi_multi(close: np.ndarray, lengths: Sequence[int], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """(len(lengths) x bars) Wilder RSI, row k matching `signals.rsi(close, lengths[k])`;
+    (len(lengths) x paths x bars) for a (paths x bars) `close`."""
+    close, flat = _rows(close)
+    lengths = _check_lengths(lengths)
+    if out is None:
+        out = np.empty((len(lengths),) + close.shape[flat:])
+    rows = out[:, None] if flat else out
+    for group in _groups(*close.shape):
+        _run([_rsi_steps(close[group], length, rows[k, group]) for k, length in enumerate(lengths.tolist())], close.shape[1])
+    return out
+
+
+def _moves(close: np.ndarray) -> np.ndarray:
+    """Gains and losses (2 x paths x bars-1) of each path."""
+    delta = np.diff(close, axis=1)
+    moves = np.empty((2,) + delta.shape)
+    np.maximum(delta, 0.0, out=moves[0])
+    np.maximum(-delta, 0.0, out=moves[1])
+    return moves
+
+
+def _rsi_steps(close: np.ndarray, length: int, out: np.ndarray) -> Iterator[int]:
+    out.fill(np.nan)
+    n = close.shape[1]
+    if n < 2:
+        yield n
+        return
+    a = 1.0 / length
+    w = 1.0 - a
+    if w == 0.0:
+        # with length 1 the average is the last move itself
+        _rsi_from_averages(_moves(close), length, out, 0)
+        yield n
+        return
+    block = int(max(1, min(4096, _MAX_LOG_GROWTH / -np.log(w))))
+    k = np.arange(1, block + 1, dtype=np.float64)
+    grow = w ** -k
+    decay = w ** k
+    # the averages start at the first move
+    y0 = _moves(close[:, :2])
+    for start in range(1, n - 1, block):
+        stop = min(n - 1, start + block)
+        m = stop - start
+        avg = _moves(close[:, start:stop + 1]) * grow[:m]
+        np.cumsum(avg, axis=2, out=avg)
+        avg *= a
+        avg += y0
+        avg *= decay[:m]
+        _rsi_from_averages(avg, length, out, start)
+        y0 = avg[:, :, -1:]
+        # move t ends at bar t + 1
+        yield stop + 1
+    yield n
+
+
+def _rsi_from_averages(avg: np.ndarray, length: int, out: np.ndarray, start: int) -> None:
+    """Write RSI of average gains/losses of moves `start..` (move t ends at bar t+1)."""
+    # pandas min_periods: the first `length` moves give the first value, at bar `length`
+    first = max(0, length - 1 - start)
+    m = avg.shape[2]
+    if first < m:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + avg[0, :, first:] / avg[1, :, first:]))
+        out[:, start + 1 + first:start + 1 + m] = rsi
+
+
+def _bb_block(length: int) -> int:
+    """Bars between two recentrings of the Bollinger sums of a `length` window."""
+    return max(_BB_BLOCK, 4 * length)
+
+
+def _band_sums(d: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum and sum of squares of the deviations `d` of windows (last axis) from their
+    reference, accumulated in window order."""
+    return np.cumsum(d, axis=-1)[..., -1], np.cumsum(d * d, axis=-1)[..., -1]
+
+
+def _band_increments(d_new, d_old):
+    """Change of the sums when `d_new` enters the window and `d_old` leaves it."""
+    return d_new - d_old, d_new * d_new - d_old * d_old
+
+
+def _cancelled(q, churn):
+    """Whether the square sum `q` is too small next to `churn`, the running sum of `abs`
+    of its increments since the last recentring."""
+    return q < churn * _CANCELLATION
+
+
+def _bands(s, q, ref, length: int, stddev: float):
+    """`(basis, upper, lower)` from the window sums around `ref`."""
+    mean = s / length
+    var = q / length - mean * mean
+    var = var * (var > 0)
+    width = stddev * (np.sqrt(var) if isinstance(var, np.ndarray) else math.sqrt(var))
+    basis = ref + mean
+    return basis, basis + width, basis - width
+
+
+def bollinger_multi(
+    close: np.ndarray,
+    lengths: Sequence[int],
+    stddev: Union[float, Sequence[float]],
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """(len(lengths) x bars x 3) basis / upper / lower, row k matching
+    `signals.bollinger_bands(close, lengths[k], stddev[k]).to_numpy()`;
+    (len(lengths) x paths x bars x 3) for a (paths x bars) `close`."""
+    close, flat = _rows(close)
+    lengths = _check_lengths(lengths)
+    stddev = np.broadcast_to(np.asarray(stddev, dtype=np.float64), lengths.shape)
+    if out is None:
+        out = np.empty((len(lengths),) + close.shape[flat:] + (3,))
+    rows = out[:, None] if flat else out
+    for group in _groups(*close.shape):
+        closes = _clean(close[group])
+        steps = [_bollinger_steps(closes, length, dev, rows[k, group]) for k, (length, dev) in enumerate(zip(lengths.tolist(), stddev.tolist()))]
+        _run(steps, close.shape[1])
+    return out
+
+
+def _clean(close: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    # rolling windows see infinities as missing values
+    finite = np.isfinite(close)
+    if finite.all():
+        return close, None
+    return np.where(finite, close, np.nan), finite
+
+
+def _bollinger_steps(closes: Tuple[np.ndarray, Optional[np.ndarray]], length: int, stddev: float, out: np.ndarray) -> Iterator[int]:
+    close, finite = closes
+    out.fill(np.nan)
+    paths, n = close.shape
+    if n < length:
+        yield n
+        return
+    block = _bb_block(length)
+    # output bar t = length - 1 + u; block j holds u in [j * block, (j + 1) * block)
+    outputs = n - length + 1
+    per_chunk = max(1, _CHUNK_BARS // block)
+    offsets = np.arange(block)
+    for j0 in range(0, -(-outputs // block), per_chunk):
+        starts = length - 1 + block * np.arange(j0, min(j0 + per_chunk, -(-outputs // block)))
+        bars = np.minimum(starts[:, None] + offsets, n - 1)  # (blocks, block)
+        first = starts - length + 1
+
+        # reference: the first finite close of the window at the start of each block
+        window = close[:, first[:, None] + np.arange(length)]  # (paths, blocks, length)
+        if finite is None:
+            ref = window[:, :, 0]
+        else:
+            present = ~np.isnan(window)
+            ref = np.take_along_axis(window, present.argmax(axis=2)[:, :, None], axis=2)[:, :, 0]
+            ref[~present.any(axis=2)] = 0.0
+        s0, q0 = _band_sums(_deviation(window, ref[:, :, None], finite))
+
+        d_new = _deviation(close[:, bars], ref[:, :, None], finite)
+        d_old = _deviation(close[:, np.maximum(bars - length, 0)], ref[:, :, None], finite)
+        s, q = _band_increments(d_new, d_old)
+        s[:, :, 0] = s0
+        q[:, :, 0] = q0
+        churn = np.abs(q)
+        np.cumsum(s, axis=2, out=s)
+        np.cumsum(q, axis=2, out=q)
+        np.cumsum(churn, axis=2, out=churn)
+        redo = np.nonzero(_cancelled(q, churn) & (bars < n))
+        if redo[0].size:
+            path, j, _ = redo
+            window = close[path[:, None], bars[redo[1:]][:, None] - length + 1 + np.arange(length)]
+            s[redo], q[redo] = _band_sums(_deviation(window, ref[path, j][:, None], finite))
+        bands = _bands(s, q, ref[:, :, None], length, stddev)
+
+        lo = int(starts[0])
+        hi = min(n, int(starts[-1]) + block)
+        m = hi - lo
+        window = close[:, lo - length + 1:hi]
+        # windows of equal closes: no change between any two neighbours
+        changes = np.zeros((paths, window.shape[1]), dtype=np.int32)
+        np.cumsum(window[:, 1:] != window[:, :-1], axis=1, out=changes[:, 1:])
+        equal = changes[:, length - 1:] == changes[:, :m]
+        target = out[:, lo:hi]
+        for col, values in enumerate(bands):
+            target[:, :, col] = values.reshape(paths, -1)[:, :m]
+        if equal.any():
+            target[equal] = window[:, length - 1:][equal][:, None]
+        if finite is not None:
+            missing = np.zeros((paths, window.shape[1] + 1), dtype=np.int32)
+            np.cumsum(~finite[:, lo - length + 1:hi], axis=1, out=missing[:, 1:])
+            target[missing[:, length:] != missing[:, :m]] = np.nan
+        yield hi
+    yield n
+
+
+def _deviation(values: np.ndarray, ref: np.ndarray, finite: Optional[np.ndarray]) -> np.ndarray:
+    d = values - ref
+    if finite is not None:
+        # missing closes add nothing; their windows are NaN anyway
+        d[np.isnan(d)] = 0.0
+    return d
+
+
+def rsi_bb(
+    close: np.ndarray,
+    rsiLength: int,
+    bbLength: int,
+    bbStdDev: float,
+    out_rsi: Optional[np.ndarray] = None,
+    out_bands: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """RSI (bars,) and Bollinger basis/upper/lower (bars x 3) of one close array, or
+    (paths x bars) and (paths x bars x 3) of a matrix, computed in one pass."""
+    close, flat = _rows(close)
+    if bbLength < 1 or rsiLength < 1:
+        raise ValueError('lengths must be >= 1')
+    if out_rsi is None:
+        out_rsi = np.empty(close.shape[flat:])
+    if out_bands is None:
+        out_bands = np.empty(out_rsi.shape + (3,))
+    rsi_rows = out_rsi[None] if flat else out_rsi
+    band_rows = out_bands[None] if flat else out_bands
+    for group in _groups(*close.shape):
+        steps = [
+            _rsi_steps(close[group], rsiLength, rsi_rows[group]),
+            _bollinger_steps(_clean(close[group]), bbLength, bbStdDev, band_rows[group]),
+        ]
+        _run(steps, close.shape[1])
+    return out_rsi, out_bands
@@ -0,0 +1,129 @@
+"""Per-bar equity curve recorded by the simulator and the metrics computed from it.
+
+With `record_equity=True` the simulator appends, after every bar, the mark-to-market
+equity (balance plus the unrealized PnL of the open position at the close, averaging
+fills included) and the margin that position ties up, into a preallocated
+`EquityCurve`. `compute_metrics` turns the curve into drawdown, risk-adjusted return and
+exposure figures with a few array passes; `sweep` adds them to every result row, so
+any of `METRICS` can be used as a sweep objective.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# metric -> True when lower is better (sort ascending)
+METRICS: Dict[str, bool] = {
+    'total_return': False,
+    'max_drawdown': True,
+    'sharpe': False,
+    'sortino': False,
+    'time_in_market': False,
+    'avg_margin_usage': True,
+    'max_margin_usage': True,
+}
+
+
+class EquityCurve:
+    """Growable per-bar buffer of `equity` and `margin` (used margin of open positions)."""
+
+    def __init__(self, capacity: int = 1024):
+        self._equity = np.empty(max(capacity, 1))
+        self._margin = np.empty(max(capacity, 1))
+        self._n = 0
+
+    def reserve(self, extra: int) -> None:
+        """Make room for `extra` more bars, so appending them does not reallocate."""
+        need = self._n + extra
+        capacity = len(self._equity)
+        if need > capacity:
+            capacity = max(need, 2 * capacity)
+            for name in ('_equity', '_margin'):
+                grown = np.empty(capacity)
+                grown[:self._n] = getattr(self, name)[:self._n]
+                setattr(self, name, grown)
+
+    def append(self, equity: float, margin: float) -> None:
+        if self._n == len(self._equity):
+            self.reserve(1)
+        self._equity[self._n] = equity
+        self._margin[self._n] = margin
+        self._n += 1
+
+    def extend(self, equity: np.ndarray, margin) -> None:
+        """Append a run of bars; `margin` may be a scalar shared by all of them."""
+        k = len(equity)
+        self.reserve(k)
+        self._equity[self._n:self._n + k] = equity
+        self._margin[self._n:self._n + k] = margin
+        self._n += k
+
+    @property
+    def equity(self) -> np.ndarray:
+        return self._equity[:self._n]
+
+    @property
+    def margin(self) -> np.ndarray:
+        return self._margin[:self._n]
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, EquityCurve):
+            return NotImplemented
+        return np.array_equal(self.equity, other.equity) and np.array_equal(self.margin, other.margin)
+
+    def __repr__(self) -> str:
+        return f"EquityCurve({self._n} bars)"
+
+    def to_dict(self) -> Dict[str, List[float]]:
+        return {'equity': self.equity.tolist(), 'margin': self.margin.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[float]]) -> 'EquityCurve':
+        curve = cls(capacity=len(data['equity']))
+        curve.extend(np.asarray(data['equity'], dtype=np.float64), np.asarray(data['margin'], dtype=np.float64))
+        return curve
+
+    def metrics(self, periods_per_year: float = 252.0, initial_balance: Optional[float] = None) -> Dict[str, float]:
+        return compute_metrics(self.equity, self.margin, periods_per_year, initial_balance)
+
+
+def compute_metrics(
+    equity: np.ndarray,
+    margin: Optional[np.ndarray] = None,
+    periods_per_year: float = 252.0,
+    initial_balance: Optional[float] = None,
+) -> Dict[str, float]:
+    """Metrics of a per-bar equity curve.
+
+    Returns are bar to bar (from `initial_balance` into the first bar when given);
+    Sharpe and Sortino are annualised with `periods_per_year` bars and a zero risk-free
+    rate. Drawdown is the largest fall from a running peak as a fraction of that peak.
+    Time in market is the share of bars with margin in use; margin usage is margin over
+    equity.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    if initial_balance is not None:
+        equity = np.concatenate([[initial_balance], equity])
+    out = dict.fromkeys(METRICS, np.nan)
+    if len(equity) == 0:
+        return out
+    out['total_return'] = equity[-1] / equity[0] - 1.0
+    peaks = np.maximum.accumulate(equity)
+    out['max_drawdown'] = float(np.max(1.0 - equity / peaks))
+    if len(equity) > 1:
+        returns = np.diff(equity) / equity[:-1]
+        mean = returns.mean()
+        std = returns.std()
+        downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+        scale = np.sqrt(periods_per_year)
+        out['sharpe'] = float(mean / std * scale) if std > 0 else np.nan
+        out['sortino'] = float(mean / downside * scale) if downside > 0 else np.nan
+    if margin is not None and len(margin):
+        margin = np.asarray(margin, dtype=np.float64)
+        usage = margin / equity[-len(margin):]
+        out['time_in_market'] = float(np.mean(margin > 0))
+        out['avg_margin_usage'] = float(usage.mean())
+        out['max_margin_usage'] = float(usage.max())
+    return out
@@ -0,0 +1,241 @@
+"""Monte Carlo robustness checks for the martingale strategy.
+
+Two ways to perturb a backtest:
+
+* `resample_trades` reorders (or bootstraps) the per-trade returns of one
+  `SimulationResult` and compounds them, which shows how much the drawdown depends on
+  the order the trades came in;
+* `run_monte_carlo` block-bootstraps the log returns of the price series into many
+  synthetic price paths and re-runs the whole strategy on each of them with
+  `simulate_paths`, so averaging, stops and liquidations react to the new paths.
+
+Both work on all paths at once: `simulate_paths` runs every path as one account of
+`batch_simulator.simulate_batch`, which walks the bars with array operations across
+accounts, applying the same rules and arithmetic as `Simulator.step`.
+"""
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from scripts import kernels
+from scripts.batch_simulator import simulate_batch
+from scripts.events import CLOSE, REASONS
+from scripts.signals import _codes_from_indicators
+from scripts.simulator import SimulationResult
+
+_LIQ = REASONS.index('LIQ')
+# (paths x bars) closes whose indicators are held at once by `_signal_matrix`
+_SIGNAL_ROWS = 1 << 20
+
+
+@dataclass
+class MonteCarloResult:
+    final_balance: np.ndarray  # per path
+    max_drawdown: np.ndarray  # per path, largest fall of the realized balance from its peak (fraction)
+    liquidated: np.ndarray  # per path, at least one position was liquidated
+    trades: np.ndarray  # per path
+
+    @property
+    def liquidation_probability(self) -> float:
+        return float(self.liquidated.mean())
+
+    def summary(self, quantiles: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.DataFrame:
+        """Mean and quantiles of final balance, max drawdown and trade count across paths."""
+        data = pd.DataFrame({
+            'final_balance': self.final_balance,
+            'max_drawdown': self.max_drawdown,
+            'trades': self.trades,
+        })
+        out = data.quantile(list(quantiles)).T
+        out.columns = [f'q{q:g}' for q in quantiles]
+        out.insert(0, 'mean', data.mean())
+        return out
+
+
+def _max_drawdown(balances: np.ndarray) -> np.ndarray:
+    """Max drawdown of each row of a (paths x steps) balance matrix."""
+    peaks = np.maximum.accumulate(balances, axis=1)
+    return (1.0 - balances / peaks).max(axis=1)
+
+
+def resample_trades(
+    result: SimulationResult,
+    n_paths: int = 10_000,
+    initial_balance: float = 1000.0,
+    replace: bool = False,
+    seed: Optional[int] = None,
+) -> MonteCarloResult:
+    """Compound the trades of `result` (run with `record_events=True`) in random orders.
+
+    Each trade is taken as a return on the balance it was closed from. `replace=False`
+    shuffles the trades (same final balance, different drawdowns); `replace=True`
+    bootstraps them, so the number of liquidations varies between paths too.
+    """
+    if result.events is None:
+        raise ValueError('result has no events; run the simulation with record_events=True')
+    cols = result.events.columns()
+    closed = cols['type'] == CLOSE
+    profit = cols['profit'][closed]
+    before = initial_balance + np.concatenate([[0.0], np.cumsum(profit)[:-1]])
+    returns = profit / before
+    liq = cols['reason'][closed] == _LIQ
+
+    rng = np.random.default_rng(seed)
+    n = len(returns)
+    if replace:
+        picks = rng.integers(0, n, size=(n_paths, n))
+    else:
+        picks = rng.permuted(np.broadcast_to(np.arange(n), (n_paths, n)), axis=1)
+    balances = initial_balance * np.cumprod(1.0 + returns[picks], axis=1)
+    balances = np.concatenate([np.full((n_paths, 1), initial_balance), balances], axis=1)
+    return MonteCarloResult(
+        final_balance=balances[:, -1],
+        max_drawdown=_max_drawdown(balances),
+        liquidated=liq[picks].any(axis=1),
+        trades=np.full(n_paths, n),
+    )
+
+
+def block_bootstrap_prices(prices: Sequence[float], n_paths: int, block: int = 50, seed: Optional[int] = None) -> np.ndarray:
+    """(n_paths x len(prices)) synthetic paths built from circular blocks of log returns.
+
+    Every path starts at `prices[0]`; blocks of `block` consecutive returns are drawn at
+    random start positions (wrapping around), which keeps short-range autocorrelation
+    and volatility clustering.
+    """
+    closes = np.asarray(prices, dtype=np.float64)
+    log_returns = np.diff(np.log(closes))
+    n = len(log_returns)
+    rng = np.random.default_rng(seed)
+    n_blocks = -(-n // block)
+    starts = rng.integers(0, n, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :n] % n
+    growth = np.zeros((n_paths, n + 1))
+    np.cumsum(log_returns[idx], axis=1, out=growth[:, 1:])
+    return closes[0] * np.exp(growth)
+
+
+def _signal_matrix(
+    paths: np.ndarray,
+    useRSI: bool = True,
+    rsiLength: int = 14,
+    rsiLongLevel: int = 30,
+    rsiShortLevel: int = 70,
+    useBB: bool = True,
+    bbLength: int = 20,
+    bbStdDev: float = 2.0,
+) -> np.ndarray:
+    """`signals.generate_signal_codes` of every path, as a (paths x bars) int8 matrix.
+
+    The indicators run along the bars of `_SIGNAL_ROWS` paths at a time, so each path
+    gets exactly the codes a single run on it would use.
+    """
+    paths = np.asarray(paths, dtype=np.float64)
+    if not np.isfinite(paths).all():
+        raise ValueError('paths must be finite')
+    rows = max(1, _SIGNAL_ROWS // max(paths.shape[1], 1))
+    shape = (min(rows, len(paths)), paths.shape[1])
+    r = np.empty(shape) if useRSI else None
+    bands = np.empty(shape + (3,)) if useBB else None
+    codes = np.empty(paths.shape, dtype=np.int8)
+    for start in range(0, len(paths), rows):
+        part = paths[start:start + rows]
+        count = len(part)
+        if useRSI and useBB:
+            kernels.rsi_bb(part, rsiLength, bbLength, bbStdDev, out_rsi=r[:count], out_bands=bands[:count])
+        elif useRSI:
+            kernels.rsi_multi(part, [rsiLength], out=r[None, :count])
+        elif useBB:
+            kernels.bollinger_multi(part, [bbLength], bbStdDev, out=bands[None, :count])
+        codes[start:start + count] = _codes_from_indicators(
+            part, r[:count] if useRSI else None, bands[:count] if useBB else None, rsiLongLevel, rsiShortLevel)
+    return codes
+
+
+def simulate_paths(
+    paths: np.ndarray,
+    signals: np.ndarray,
+    initial_balance: float = 1000.0,
+    risk_per_trade: float = 1.0,
+    leverage: float = 10.0,
+    commission_rate: float = 0.1,
+    margin_type: str = 'Cross',
+    useSL: bool = False,
+    useTP: bool = False,
+    slPercent: float = 1.0,
+    tpPercent: float = 2.0,
+    useAveraging: bool = True,
+    avgDistancePercent: float = 5.0,
+    martingaleMultiplier: float = 2.0,
+    maxAvgCount: int = 3,
+    min_notional: float = 1.0,
+) -> MonteCarloResult:
+    """`run_simulation` on every row of `paths` (paths x bars) with signal codes `signals`.
+
+    Each path is an independent account. Drawdown is measured on the realized balance.
+    """
+    assert np.ndim(paths) == 2 and np.shape(paths) == np.shape(signals)
+    res = simulate_batch(
+        paths, signals,
+        initial_balance=initial_balance, risk_per_trade=risk_per_trade, leverage=leverage,
+        commission_rate=commission_rate, margin_type=margin_type, useSL=useSL, useTP=useTP,
+        slPercent=slPercent, tpPercent=tpPercent, useAveraging=useAveraging,
+        avgDistancePercent=avgDistancePercent, martingaleMultiplier=martingaleMultiplier,
+        maxAvgCount=maxAvgCount, min_notional=min_notional,
+    )
+    return MonteCarloResult(final_balance=res.final_balance, max_drawdown=res.max_drawdown, liquidated=res.liquidations > 0, trades=res.trades)
+
+
+def run_monte_carlo(
+    prices: Sequence[float],
+    n_paths: int = 10_000,
+    block: int = 50,
+    seed: Optional[int] = None,
+    batch_size: int = 2_000,
+    signal_params: Optional[dict] = None,
+    **params,
+) -> MonteCarloResult:
+    """Block-bootstrap `n_paths` price paths from `prices` and simulate all of them.
+
+    Paths are generated and simulated `batch_size` at a time to bound memory; `params`
+    go to `simulate_paths`, `signal_params` to the RSI/BB signal generation.
+    """
+    rng = np.random.default_rng(seed)
+    parts = []
+    for start in range(0, n_paths, batch_size):
+        count = min(batch_size, n_paths - start)
+        paths = block_bootstrap_prices(prices, count, block=block, seed=rng.integers(2**63))
+        parts.append(simulate_paths(paths, _signal_matrix(paths, **(signal_params or {})), **params))
+    return MonteCarloResult(*(np.concatenate([getattr(p, f) for p in parts]) for f in ('final_balance', 'max_drawdown', 'liquidated', 'trades')))
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    p = argparse.ArgumentParser(description='Block-bootstrap Monte Carlo of the strategy on a price CSV')
+    p.add_argument('--prices', required=True, help='Price CSV (pine/data/<TICKER>.csv)')
+    p.add_argument('--column', default='Close')
+    p.add_argument('--paths', type=int, default=10_000)
+    p.add_argument('--block', type=int, default=50)
+    p.add_argument('--seed', type=int, default=None)
+    p.add_argument('--useSL', action='store_true')
+    p.add_argument('--useTP', action='store_true')
+    p.add_argument('--slPercent', type=float, default=1.0)
+    p.add_argument('--tpPercent', type=float, default=2.0)
+    p.add_argument('--martingaleMultiplier', type=float, default=2.0)
+    p.add_argument('--maxAvgCount', type=int, default=3)
+    p.add_argument('--leverage', type=float, default=10.0)
+    args = p.parse_args()
+
+    closes = pd.read_csv(args.prices, index_col=0)[args.column].to_numpy(dtype=np.float64)
+    started = time.time()
+    mc = run_monte_carlo(
+        closes, n_paths=args.paths, block=args.block, seed=args.seed,
+        useSL=args.useSL, useTP=args.useTP, slPercent=args.slPercent, tpPercent=args.tpPercent,
+        martingaleMultiplier=args.martingaleMultiplier, maxAvgCount=args.maxAvgCount, leverage=args.leverage,
+    )
+    print(mc.summary().to_string())
+    print(f'liquidation probability {mc.liquidation_probability:.2%} ({time.time() - started:.1f}s)')
@@ -0,0 +1,252 @@
+"""Parity of the Python simulator with TradingView over many symbols at once.
+
+For every `<TICKER>.csv` in a directory of TradingView "List of Trades" exports of the
+strategy, the matching price file `<TICKER>.csv` (pine/data format) is replayed with
+`run_simulation_from_prices`, one symbol per worker process. Both trade lists are
+reduced to positions and aligned on (side, entry time):
+
+* a TradingView export lists every entry of a position as its own trade with the shared
+  exit, so entries with the same side and exit time are merged into one position (the
+  first entry's time and price, the summed profit), which is what
+  `export_events_to_tv_like.pair_trades` gives for the simulator;
+* exports with one row per trade (`Entry Time` / `Exit Time` columns, as written by
+  `export_events_to_tv_like`) are read as well.
+
+The report has one row per aligned position with the price and profit deltas
+(Python minus TradingView) and a `status`: `ok`, `mismatch` (exit time differs or a
+delta is over tolerance), `missing_py` or `missing_tv`.
+
+    python -m scripts.parity --trades tv_exports/ --prices pine/data/ --out mismatches.csv
+"""
+import os
+import re
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.export_events_to_tv_like import bars_to_datetimes, pair_trades
+from scripts.simulator import run_simulation_from_prices
+
+STATUSES = ('ok', 'mismatch', 'missing_py', 'missing_tv')
+_POSITION_COLUMNS = ['side', 'entry_time', 'exit_time', 'entry_price', 'exit_price', 'profit']
+
+
+@dataclass
+class ParityReport:
+    trades: pd.DataFrame  # one row per aligned position, with a `symbol` column
+    summary: pd.DataFrame  # one row per symbol: counts per status, largest deltas
+    errors: Dict[str, str] = field(default_factory=dict)  # symbol -> why it was not checked
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and bool((self.trades['status'] == 'ok').all())
+
+    def mismatches(self) -> pd.DataFrame:
+        return self.trades[self.trades['status'] != 'ok']
+
+
+def _column(df: pd.DataFrame, pattern: str) -> Optional[str]:
+    for col in df.columns:
+        if re.match(pattern, str(col), flags=re.IGNORECASE) and '%' not in str(col):
+            return col
+    return None
+
+
+def _times(values) -> pd.Series:
+    times = pd.to_datetime(pd.Series(values), errors='coerce')
+    if getattr(times.dt, 'tz', None) is not None:
+        times = times.dt.tz_localize(None)
+    return times
+
+
+def load_tv_trades(path: str) -> pd.DataFrame:
+    """Positions of a TradingView "List of Trades" CSV (`_POSITION_COLUMNS`)."""
+    df = pd.read_csv(path)
+    if df.empty:
+        return pd.DataFrame(columns=_POSITION_COLUMNS)
+    if 'Entry Time' in df.columns:
+        # one row per trade, as written by export_events_to_tv_like
+        trades = pd.DataFrame({
+            'side': df['Side'].astype(str).str.lower(),
+            'entry_time': _times(df['Entry Time']),
+            'exit_time': _times(df['Exit Time']),
+            'entry_price': pd.to_numeric(df['Entry Price'], errors='coerce'),
+            'exit_price': pd.to_numeric(df['Exit Price'], errors='coerce'),
+            'profit': pd.to_numeric(df['Profit'], errors='coerce'),
+        })
+    else:
+        # TradingView: an 'Entry <side>' and an 'Exit <side>' row per trade number
+        number, kind = _column(df, r'trade\s*#'), _column(df, r'type')
+        time, price = _column(df, r'date'), _column(df, r'price')
+        profit = _column(df, r'(profit|net p&l)')
+        if None in (number, kind, time, price, profit):
+            raise ValueError(f'{path}: not a TradingView list of trades (columns {list(df.columns)})')
+        kinds = df[kind].astype(str).str.lower()
+        rows = pd.DataFrame({
+            'trade': df[number],
+            'entry': kinds.str.startswith('entry'),
+            'side': kinds.str.split().str[-1],
+            'time': _times(df[time]),
+            'price': pd.to_numeric(df[price], errors='coerce'),
+            'profit': pd.to_numeric(df[profit], errors='coerce'),
+        })
+        entries = rows[rows['entry']].set_index('trade')
+        exits = rows[~rows['entry']].set_index('trade')
+        # open trades have no exit row
+        entries = entries.loc[entries.index.intersection(exits.index)]
+        exits = exits.loc[entries.index]
+        trades = pd.DataFrame({
+            'side': entries['side'].to_numpy(),
+            'entry_time': entries['time'].to_numpy(),
+            'exit_time': exits['time'].to_numpy(),
+            'entry_price': entries['price'].to_numpy(),
+            'exit_price': exits['price'].to_numpy(),
+            'profit': exits['profit'].to_numpy(),
+        })
+    # averaging entries of one position share its exit: keep the first entry, sum profits
+    trades = trades.sort_values('entry_time', kind='stable')
+    positions = trades.groupby(['side', 'exit_time'], sort=False, dropna=False).agg(
+        entry_time=('entry_time', 'first'),
+        entry_price=('entry_price', 'first'),
+        exit_price=('exit_price', 'first'),
+        profit=('profit', 'sum'),
+    ).reset_index()
+    return positions[_POSITION_COLUMNS].sort_values('entry_time', kind='stable').reset_index(drop=True)
+
+
+def simulate_trades(prices: pd.DataFrame, column: str = 'Close', **params) -> pd.DataFrame:
+    """Positions the simulator takes on `prices` (`_POSITION_COLUMNS`)."""
+    res = run_simulation_from_prices(prices[column].to_numpy(dtype=np.float64), record_events=True, **params)
+    pairs = pair_trades(res.events.to_pandas())
+    index = pd.DatetimeIndex(_times(prices.index))
+    return pd.DataFrame({
+        'side': pairs['side'].astype(str),
+        'entry_time': _times(bars_to_datetimes(index, pairs['entry_bar'])),
+        'exit_time': _times(bars_to_datetimes(index, pairs['exit_bar'])),
+        'entry_price': pairs['entry_price'].astype(np.float64),
+        'exit_price': pairs['exit_price'].astype(np.float64),
+        'profit': pairs['profit'].astype(np.float64),
+    }, columns=_POSITION_COLUMNS)
+
+
+def align_trades(py: pd.DataFrame, tv: pd.DataFrame, price_tol: float = 1e-6, profit_tol: float = 0.01) -> pd.DataFrame:
+    """Outer join of two position lists on (side, entry_time) with deltas and a status.
+
+    Prices match within `price_tol` relative to the TradingView price, profits within
+    `profit_tol` (TradingView rounds them to cents).
+    """
+    df = py.merge(tv, on=['side', 'entry_time'], how='outer', suffixes=('_py', '_tv'), indicator=True)
+    for name in ('entry_price', 'exit_price', 'profit'):
+        df[f'{name}_delta'] = df[f'{name}_py'] - df[f'{name}_tv']
+    prices_ok = np.ones(len(df), dtype=bool)
+    for name in ('entry_price', 'exit_price'):
+        prices_ok &= (df[f'{name}_delta'].abs() <= price_tol * df[f'{name}_tv'].abs()).to_numpy()
+    same = (
+        (df['exit_time_py'] == df['exit_time_tv']).to_numpy()
+        & prices_ok
+        & (df['profit_delta'].abs() <= profit_tol).to_numpy()
+    )
+    source = df.pop('_merge').astype(str).to_numpy()
+    df['status'] = np.select(
+        [source == 'left_only', source == 'right_only', same],
+        ['missing_tv', 'missing_py', 'ok'],
+        'mismatch',
+    )
+    return df.sort_values('entry_time', kind='stable').reset_index(drop=True)
+
+
+def _check_symbol(task: Tuple[str, str, str, Dict[str, Any], float, float]) -> Tuple[str, Optional[pd.DataFrame], Optional[str]]:
+    symbol, trades_path, prices_path, params, price_tol, profit_tol = task
+    try:
+        tv = load_tv_trades(trades_path)
+        py = simulate_trades(pd.read_csv(prices_path, index_col=0), **params)
+        return symbol, align_trades(py, tv, price_tol, profit_tol), None
+    except Exception as exc:  # reported per symbol, the other symbols still run
+        return symbol, None, f'{type(exc).__name__}: {exc}'
+
+
+def _summarize(trades: pd.DataFrame) -> pd.DataFrame:
+    counts = pd.crosstab(trades['symbol'], trades['status']).reindex(columns=list(STATUSES), fill_value=0)
+    deltas = trades.assign(
+        price_delta=trades[['entry_price_delta', 'exit_price_delta']].abs().max(axis=1),
+        profit_delta=trades['profit_delta'].abs(),
+    ).groupby('symbol')[['price_delta', 'profit_delta']].max()
+    return counts.join(deltas).rename(columns={'price_delta': 'max_price_delta', 'profit_delta': 'max_profit_delta'})
+
+
+def run_parity(
+    trades_dir: str,
+    prices_dir: str,
+    params: Optional[Dict[str, Any]] = None,
+    processes: Optional[int] = None,
+    price_tol: float = 1e-6,
+    profit_tol: float = 0.01,
+) -> ParityReport:
+    """Check every TradingView export in `trades_dir` against `prices_dir/<stem>.csv`.
+
+    `params` go to `run_simulation_from_prices` for every symbol (the strategy inputs
+    the exports were made with). Symbols without a price file, or whose check raised,
+    are listed in `errors`.
+    """
+    params = dict(params or {})
+    tasks = []
+    errors: Dict[str, str] = {}
+    for path in sorted(Path(trades_dir).glob('*.csv')):
+        prices = Path(prices_dir) / path.name
+        if prices.exists():
+            tasks.append((path.stem, str(path), str(prices), params, price_tol, profit_tol))
+        else:
+            errors[path.stem] = f'no price file {prices}'
+    if processes is None:
+        processes = min(len(tasks), os.cpu_count() or 1)
+    if processes > 1:
+        with Pool(processes) as pool:
+            results = list(pool.imap_unordered(_check_symbol, tasks, chunksize=max(1, len(tasks) // (4 * processes))))
+    else:
+        results = [_check_symbol(task) for task in tasks]
+
+    none = pd.DataFrame(columns=_POSITION_COLUMNS)
+    frames: List[pd.DataFrame] = [align_trades(none, none).assign(symbol='')]
+    for symbol, aligned, error in sorted(results, key=lambda r: r[0]):
+        if error is not None:
+            errors[symbol] = error
+        else:
+            frames.append(aligned.assign(symbol=symbol))
+    trades = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    trades = trades[['symbol'] + [c for c in trades.columns if c != 'symbol']]
+    return ParityReport(trades=trades, summary=_summarize(trades), errors=errors)
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from scripts.cli import parse_settings
+
+    p = argparse.ArgumentParser(description='Compare TradingView trade lists with run_simulation_from_prices')
+    p.add_argument('--trades', required=True, help='Directory of TradingView "List of Trades" CSVs named <TICKER>.csv')
+    p.add_argument('--prices', required=True, help='Directory of price CSVs named <TICKER>.csv (pine/data)')
+    p.add_argument('--set', action='append', default=[], help='name=value strategy input (repeatable)')
+    p.add_argument('--processes', type=int, default=None)
+    p.add_argument('--price-tol', type=float, default=1e-6, help='Relative price tolerance')
+    p.add_argument('--profit-tol', type=float, default=0.01, help='Absolute profit tolerance')
+    p.add_argument('--out', default=None, help='Write the mismatching trades to this CSV')
+    args = p.parse_args()
+
+    try:
+        # simulate_trades records the events itself
+        params = parse_settings(args.set, reserved=('record_events',))
+    except ValueError as exc:
+        p.error(str(exc))
+    report = run_parity(args.trades, args.prices, params, processes=args.processes, price_tol=args.price_tol, profit_tol=args.profit_tol)
+    print(report.summary.to_string())
+    for symbol, error in sorted(report.errors.items()):
+        print(f'{symbol}: {error}')
+    if args.out:
+        report.mismatches().to_csv(args.out, index=False)
+        print('Wrote', args.out)
+    sys.exit(0 if report.ok else 1)
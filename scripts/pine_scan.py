@@ -0,0 +1,143 @@
+"""Streaming scanner for Pine source: bracket depth, strings and comments, line by line.
+
+`PineScanner.feed` takes one line at a time and updates its state in time linear in the
+line, so a whole file is checked in one pass whatever the length of its statements.
+It tracks
+
+* open brackets `(`, `[`, `{` with the line/column where each was opened;
+* strings (`"..."` or `'...'`, with backslash escapes), which may run past the end of a
+  line, as in a statement broken inside a string literal;
+* `//` comments, whose quotes and brackets are ignored;
+
+and collects `Diagnostic`s with 1-based line/column: mismatched or unmatched brackets,
+unterminated strings (reported by `close()` at the end of input) and, as a warning,
+lines longer than `max_line_length`. `feed` returns True when the line ends a statement
+(nothing left open), which is what `fix_pine_format` uses to merge broken statements:
+
+    scanner = PineScanner()
+    statements = list(join_statements(lines, scanner))
+    for d in scanner.close():
+        print(d)
+"""
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+OPENERS = {'(': ')', '[': ']', '{': '}'}
+CLOSERS = {v: k for k, v in OPENERS.items()}
+# characters that change the scanner state; everything else is skipped in bulk
+_SPECIAL = re.compile(r'[()\[\]{}"\'/]')
+# ') name =' left on one line by merging two statements
+_STMT_SPLIT = re.compile(r"\)\s+(?=[a-zA-Z_][a-zA-Z0-9_]*\s*=)")
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    line: int
+    col: int
+    message: str
+    severity: str = 'error'  # or 'warning'
+
+    def __str__(self) -> str:
+        return f'{self.line}:{self.col}: {self.severity}: {self.message}'
+
+
+class PineScanner:
+    def __init__(self, max_line_length: int = 400):
+        self.max_line_length = max_line_length
+        self.diagnostics: List[Diagnostic] = []
+        self.line = 0
+        # (bracket, line, col) of the brackets still open
+        self.stack: List[Tuple[str, int, int]] = []
+        # (quote, line, col) of the string still open, if any
+        self.string: Optional[Tuple[str, int, int]] = None
+
+    @property
+    def balanced(self) -> bool:
+        return not self.stack and self.string is None
+
+    @property
+    def errors(self) -> List[Diagnostic]:
+        return [d for d in self.diagnostics if d.severity == 'error']
+
+    def feed(self, line: str) -> bool:
+        """Scan the next line (trailing newline optional); True if nothing is left open."""
+        line = line.rstrip('\r\n')
+        self.line += 1
+        if len(line) > self.max_line_length:
+            self.diagnostics.append(Diagnostic(self.line, self.max_line_length + 1, f'line is {len(line)} characters long', 'warning'))
+        i, n = 0, len(line)
+        while i < n:
+            if self.string is not None:
+                i = self._scan_string(line, i)
+                continue
+            match = _SPECIAL.search(line, i)
+            if match is None:
+                break
+            i = match.start()
+            ch = line[i]
+            if ch == '/':
+                if line.startswith('//', i):
+                    break
+            elif ch in OPENERS:
+                self.stack.append((ch, self.line, i + 1))
+            elif ch in CLOSERS:
+                self._close_bracket(ch, i + 1)
+            else:
+                self.string = (ch, self.line, i + 1)
+            i += 1
+        return self.balanced
+
+    def _scan_string(self, line: str, i: int) -> int:
+        quote = self.string[0]
+        n = len(line)
+        while i < n:
+            j = line.find(quote, i)
+            k = line.find('\\', i, j if j >= 0 else n)
+            if k >= 0:
+                i = k + 2
+                continue
+            if j < 0:
+                return n
+            self.string = None
+            return j + 1
+        return n
+
+    def _close_bracket(self, ch: str, col: int) -> None:
+        if not self.stack:
+            self.diagnostics.append(Diagnostic(self.line, col, f'unmatched {ch!r}'))
+            return
+        opener, line, opened = self.stack.pop()
+        if OPENERS[opener] != ch:
+            self.diagnostics.append(Diagnostic(self.line, col, f'{ch!r} does not close {opener!r} opened at {line}:{opened}'))
+
+    def close(self) -> List[Diagnostic]:
+        """Report what is still open at the end of input; returns all diagnostics."""
+        if self.string is not None:
+            quote, line, col = self.string
+            self.diagnostics.append(Diagnostic(line, col, f'unterminated string {quote}'))
+            self.string = None
+        for opener, line, col in self.stack:
+            self.diagnostics.append(Diagnostic(line, col, f'unclosed {opener!r}'))
+        self.stack = []
+        return self.diagnostics
+
+
+def _split_statements(parts: List[str]) -> List[str]:
+    # collapse whitespace, then put statements merged as ') name =' on their own lines
+    return _STMT_SPLIT.sub(')\n', ' '.join(' '.join(parts).split())).split('\n')
+
+
+def join_statements(lines: Iterable[str], scanner: Optional[PineScanner] = None) -> Iterator[str]:
+    """Merge lines into whole statements: a line that leaves a bracket or string open is
+    joined with the following ones until everything is closed again."""
+    scanner = scanner if scanner is not None else PineScanner()
+    parts: List[str] = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        parts.append(line)
+        if scanner.feed(line):
+            yield from _split_statements(parts)
+            parts = []
+    if parts:
+        yield from _split_statements(parts)
@@ -0,0 +1,153 @@
+"""Multi-symbol backtest sharing one cross-margin account.
+
+Prices and signals are (bars x symbols) arrays. Per-symbol position state lives in a
+`trade_manager.PositionBatch`, so each bar updates the whole universe with array operations; only the
+symbols that open or average on a bar are visited one by one, because every such
+order is checked against the margin left after the previous one.
+
+The per-symbol rules are those of `Simulator.step`: at most one position per symbol,
+open on a signal while flat, martingale averaging, then TP/SL/liquidation on the close.
+Margin is shared: `pine_calc.check_sufficient_funds` sees all longs and all shorts of
+the account as one long and one short book. A NaN price means the symbol has no bar.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from scripts import pine_calc
+from scripts.fast_simulator import encode_signals
+from scripts.trade_manager import PositionBatch
+
+
+@dataclass
+class PortfolioResult:
+    final_balance: float
+    total_profit: float
+    total_commission: float
+    wins: int
+    losses: int
+    trades: int
+    symbols: List[str]
+    symbol_profit: np.ndarray
+    symbol_trades: np.ndarray
+
+
+def _entry_notional(book: PositionBatch, is_long: bool) -> float:
+    held = book.active & (book.is_long == is_long)
+    return float((book.total_volume[held] * book.entry_price[held]).sum())
+
+
+def run_portfolio(
+    prices: Union[np.ndarray, pd.DataFrame],
+    signals: Union[np.ndarray, pd.DataFrame],  # same shape; 'long'/'short'/None or 1/-1/0
+    symbols: Optional[Sequence[str]] = None,
+    initial_balance: float = 1000.0,
+    risk_per_trade: float = 1.0,
+    leverage: float = 10.0,
+    commission_rate: float = 0.1,
+    margin_type: str = 'Cross',
+    useSL: bool = False,
+    useTP: bool = False,
+    slPercent: float = 1.0,
+    tpPercent: float = 2.0,
+    useAveraging: bool = True,
+    avgDistancePercent: float = 5.0,
+    martingaleMultiplier: float = 2.0,
+    maxAvgCount: int = 3,
+    min_notional: float = 1.0,
+) -> PortfolioResult:
+    if symbols is None:
+        symbols = list(prices.columns) if isinstance(prices, pd.DataFrame) else [str(k) for k in range(np.shape(prices)[1])]
+    closes = np.asarray(prices, dtype=np.float64)
+    sig = np.asarray(signals)
+    codes = encode_signals(sig.ravel()).reshape(sig.shape)
+    assert closes.ndim == 2 and closes.shape == codes.shape and closes.shape[1] == len(symbols)
+    n_bars, n_symbols = closes.shape
+
+    # liquidation price is linear in the average price
+    liq_long = pine_calc.calculate_liquidation_price(1.0, True, leverage, margin_type)
+    liq_short = pine_calc.calculate_liquidation_price(1.0, False, leverage, margin_type)
+
+    book = PositionBatch(n_symbols)
+    # entry notional of all open longs / shorts, the inputs of the margin check
+    margin = {True: 0.0, False: 0.0}
+    current_balance = initial_balance
+    total_profit = 0.0
+    total_commission = 0.0
+    wins = 0
+    losses = 0
+    trades = 0
+    symbol_profit = np.zeros(n_symbols)
+    symbol_trades = np.zeros(n_symbols, dtype=np.int64)
+    has_signal = (codes != 0).any(axis=1)
+
+    def funds_ok(trade_vol: float, price: float) -> bool:
+        # check_sufficient_funds only uses volume * entry price per book, so each side of
+        # the account is passed as one unit of volume priced at its total entry notional
+        return pine_calc.check_sufficient_funds(trade_vol, price, current_balance, 1.0, 1.0, margin[True] > 0, margin[True], margin[False] > 0, margin[False], leverage)
+
+    for t in range(n_bars):
+        if not has_signal[t] and not book.active.any():
+            continue
+        close = closes[t]
+
+        # Opens: flat symbols with a signal, checked one by one against the shared margin
+        candidates = np.flatnonzero((codes[t] != 0) & ~book.active & np.isfinite(close))
+        if candidates.size and current_balance > 0:
+            for k in candidates:
+                price = float(close[k])
+                pos_vol = pine_calc.calculate_position_volume(price, current_balance, risk_per_trade, leverage)
+                if pos_vol > 0 and pos_vol * price >= min_notional and funds_ok(pos_vol, price):
+                    is_long = bool(codes[t, k] > 0)
+                    book.is_long[k] = is_long
+                    book.open(k, price, pos_vol, useSL, useTP, slPercent, tpPercent)
+                    margin[is_long] += pos_vol * price
+                    trades += 1
+                    symbol_trades[k] += 1
+
+        # Averaging: the price reached the next level of the current average
+        if useAveraging:
+            reached = book.active & (book.avg_count < maxAvgCount) & book.should_average(close, avgDistancePercent)
+            for k in np.flatnonzero(reached):
+                price = float(close[k])
+                newVol = float(book.total_volume[k]) * martingaleMultiplier
+                if funds_ok(newVol, price):
+                    book.add_average(k, price, martingaleMultiplier)
+                    book.update_targets(k, useSL, useTP, slPercent, tpPercent)
+                    margin[bool(book.is_long[k])] += newVol * float(book.entry_price[k])
+
+        # Closes: TP, then SL, then liquidation when no stop is used
+        is_long = book.is_long
+        exit_now = np.zeros(n_symbols, dtype=bool)
+        if useTP:
+            exit_now |= np.where(is_long, close >= book.take_profit_price, close <= book.take_profit_price)
+        if useSL:
+            exit_now |= np.where(is_long, close <= book.stop_loss_price, close >= book.stop_loss_price)
+        else:
+            ap = book.avg_price()
+            exit_now |= np.where(is_long, close <= ap * liq_long, close >= ap * liq_short)
+        closing = np.flatnonzero(book.active & exit_now)
+        if closing.size:
+            profit, commission = book.close(closing, close[closing], commission_rate)
+            for p, c in zip(profit.tolist(), commission.tolist()):
+                current_balance += p
+                total_profit += p
+                total_commission += c
+            symbol_profit[closing] += profit
+            wins += int((profit >= 0).sum())
+            losses += int((profit < 0).sum())
+            margin = {True: _entry_notional(book, True), False: _entry_notional(book, False)}
+
+    return PortfolioResult(
+        final_balance=current_balance,
+        total_profit=total_profit,
+        total_commission=total_commission,
+        wins=wins,
+        losses=losses,
+        trades=trades,
+        symbols=list(symbols),
+        symbol_profit=symbol_profit,
+        symbol_trades=symbol_trades,
+    )
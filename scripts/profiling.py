@@ -0,0 +1,145 @@
+"""Opt-in instrumentation of the simulator hot path.
+
+Pass a `SimStats` as `stats=` to `run_simulation`, `run_simulation_fast`,
+`run_simulation_from_prices` or `signals.generate_signals_from_series` and it collects
+
+* `timers`: seconds spent per phase (`signals`, `simulate`) and per hot-path function
+  (`step`, `check_sufficient_funds`, `avg_price`, `add_average`, `close`, `record_event`,
+  `rsi`, `bollinger_bands`); times are inclusive, so `step` contains the functions it calls;
+* `calls`: number of calls of each of those functions;
+* `counters`: `bars` fed to the simulator and `closes_TP` / `closes_SL` / `closes_LIQ`.
+
+The entry points hand their `Simulator` to `SimStats.instrument`, which swaps the class
+of that simulator, its positions and its event log for subclasses with timing wrappers;
+signal generation times its indicator columns through `SimStats.timed`. Nothing global
+is patched, so runs without stats, in other threads or interleaved with this one are
+untouched. With `stats=None` (the default) the only cost is one `is None` test per call
+of the entry points.
+
+With `SimStats(profile=True)` the phases also run under `cProfile`; `dump_profile(path)`
+writes the standard pstats file, which `snakeviz`, `flameprof` or `gprof2dot` turn into
+call graphs and flame graphs.
+
+    stats = SimStats()
+    run_simulation_from_prices(closes, engine='fast', stats=stats)
+    print(stats.report())
+"""
+import cProfile
+import functools
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+
+
+@dataclass
+class SimStats:
+    timers: Dict[str, float] = field(default_factory=dict)
+    calls: Dict[str, int] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    profile: bool = False
+    profiler: Optional[cProfile.Profile] = None
+    _depth: int = field(default=0, repr=False, compare=False)
+    # hot-path class -> its timed subclass, see instrument()
+    _classes: Dict[type, type] = field(default_factory=dict, repr=False, compare=False)
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + calls
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        """`fn` wrapped to add its time and calls to the timer `name`."""
+        return _timed(self, name, fn)
+
+    def instrument(self, sim) -> None:
+        """Time the hot path of one `Simulator` (its positions and event log included)."""
+        for owner, methods in ((sim, _SIMULATOR_METHODS), (sim.long_pos, _POSITION_METHODS),
+                               (sim.short_pos, _POSITION_METHODS), (sim.events, _EVENT_LOG_METHODS)):
+            if owner is not None:
+                owner.__class__ = self._timed_class(type(owner), methods)
+
+    def _timed_class(self, cls: type, methods: Tuple[Tuple[str, str, Optional[Callable]], ...]) -> type:
+        # one subclass per class and stats object; an empty __slots__ keeps the instance
+        # layout, so the class of an existing object can be swapped for it
+        if cls in self._classes.values():
+            return cls
+        timed = self._classes.get(cls)
+        if timed is None:
+            namespace = {attr: _timed(self, name, getattr(cls, attr), on_call) for attr, name, on_call in methods}
+            timed = self._classes[cls] = type(cls.__name__, (cls,), {'__slots__': (), '__module__': cls.__module__, **namespace})
+        return timed
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator['SimStats']:
+        """Time the block as `name`; with `profile`, the outermost phase runs under cProfile."""
+        with ExitStack() as stack:
+            if self._depth == 0:
+                if self.profile:
+                    if self.profiler is None:
+                        self.profiler = cProfile.Profile()
+                    self.profiler.enable()
+                    stack.callback(self.profiler.disable)
+            self._depth += 1
+            stack.callback(setattr, self, '_depth', self._depth - 1)
+            started = time.perf_counter()
+            try:
+                yield self
+            finally:
+                self.add_time(name, time.perf_counter() - started)
+
+    def summary(self) -> pd.DataFrame:
+        """One row per timer: seconds, calls and microseconds per call, slowest first."""
+        df = pd.DataFrame({'seconds': pd.Series(self.timers, dtype=float), 'calls': pd.Series(self.calls, dtype='int64')})
+        df['us_per_call'] = df['seconds'] / df['calls'] * 1e6
+        return df.sort_values('seconds', ascending=False)
+
+    def report(self) -> str:
+        counters = ', '.join(f'{k}={v}' for k, v in sorted(self.counters.items()))
+        return f'{self.summary().to_string(float_format=lambda v: f"{v:.6g}")}\n{counters}'
+
+    def dump_profile(self, path: str) -> None:
+        if self.profiler is None:
+            raise ValueError('no profile recorded; use SimStats(profile=True)')
+        self.profiler.dump_stats(path)
+
+
+def _timed(stats: SimStats, name: str, fn: Callable, on_call: Optional[Callable] = None) -> Callable:
+    perf_counter = time.perf_counter
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if on_call is not None:
+            on_call(stats, *args, **kwargs)
+        started = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stats.timers[name] = stats.timers.get(name, 0.0) + (perf_counter() - started)
+            stats.calls[name] = stats.calls.get(name, 0) + 1
+    return wrapper
+
+
+def _count_close(stats: SimStats, sim, pos, side, close, close_reason, i) -> None:
+    stats.count(f'closes_{close_reason}')
+
+
+# (attribute, timer name, on_call) of the timed methods of each hot-path class
+_SIMULATOR_METHODS = (
+    ('step', 'step', None),
+    ('_close', 'close', _count_close),
+    ('_sufficient_funds', 'check_sufficient_funds', None),
+)
+_POSITION_METHODS = (
+    ('avg_price', 'avg_price', None),
+    ('add_average', 'add_average', None),
+)
+_EVENT_LOG_METHODS = (
+    ('add_open', 'record_event', None),
+    ('add_avg', 'record_event', None),
+    ('add_close', 'record_event', None),
+)
@@ -0,0 +1,178 @@
+"""Persistent, content-addressed cache of `run_simulation_from_prices` results.
+
+An entry is keyed by a hash of the price series, every parameter of the run (defaults
+included) and `engine_version()`, a hash of the source of the modules that compute
+results plus the NumPy version. Editing the simulator therefore changes every key: old
+entries are never returned again and age out under the size bound.
+
+Each entry is one compressed `.npz` holding the `SimulationResult` scalars and, when
+recorded, the typed event columns and the equity curve. Writes go through a temporary
+file and `os.replace`, so sweep workers can share one directory. After every
+`max_bytes / 16` written, the least recently used entries are deleted until the files
+fit in `max_bytes` again (a hit refreshes the file's modification time).
+
+    cache = RunCache('pine/run_cache')
+    res = run_simulation_from_prices(closes, tpPercent=2.0, run_cache=cache)
+"""
+import functools
+import hashlib
+import importlib
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+from scripts.events import EventLog
+from scripts.metrics import EquityCurve
+from scripts.signals import series_digest
+from scripts.simulator import FROM_PRICES_DEFAULTS, SimulationResult, run_simulation_from_prices
+
+RUN_CACHE_DIR = Path('pine/run_cache')
+# modules whose code decides the result of a run
+ENGINE_MODULES = (
+    'scripts.simulator', 'scripts.fast_simulator', 'scripts.trade_manager', 'scripts.pine_calc',
+    'scripts.events', 'scripts.metrics', 'scripts.signals', 'scripts.kernels',
+)
+# parameters that do not change the result
+_SERVICE_PARAMS = ('indicator_cache', 'stats', 'run_cache')
+_SCALARS = ('final_balance', 'total_profit', 'total_commission', 'wins', 'losses', 'trades')
+
+
+@functools.lru_cache(maxsize=None)
+def engine_version() -> str:
+    """Hash of the source of `ENGINE_MODULES` and the NumPy version."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.__version__.encode())
+    for name in ENGINE_MODULES:
+        h.update(name.encode())
+        h.update(Path(importlib.import_module(name).__file__).read_bytes())
+    return h.hexdigest()
+
+
+def _canonical(value: Any) -> str:
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (np.ndarray, list)):
+        arr = np.asarray(value)
+        return f'array:{arr.dtype.str}:{series_digest(arr.astype(np.float64))}'
+    if isinstance(value, tuple):
+        return '(' + ','.join(_canonical(v) for v in value) + ')'
+    return repr(value)
+
+
+class RunCache:
+    def __init__(self, root: Union[str, Path] = RUN_CACHE_DIR, max_bytes: int = 1024 * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # bytes written since the directory was last measured
+        self._written = 0
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._files())
+
+    def _files(self):
+        if not self.root.exists():
+            return iter(())
+        return (entry for entry in os.scandir(self.root) if entry.name.endswith('.npz'))
+
+    def _path(self, key: str) -> Path:
+        return self.root / f'{key}.npz'
+
+    def key(self, prices, params: Dict[str, Any]) -> str:
+        """Key of a run of `run_simulation_from_prices(prices, **params)`."""
+        unknown = set(params) - set(FROM_PRICES_DEFAULTS)
+        if unknown:
+            raise TypeError(f'unknown parameters: {sorted(unknown)}')
+        settings = {**FROM_PRICES_DEFAULTS, **params}
+        h = hashlib.blake2b(digest_size=20)
+        h.update(engine_version().encode())
+        h.update(series_digest(np.asarray(prices, dtype=np.float64)).encode())
+        for name in sorted(settings):
+            if name not in _SERVICE_PARAMS:
+                h.update(f'\0{name}={_canonical(settings[name])}'.encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[SimulationResult]:
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                res = SimulationResult(**{name: data[name].item() for name in _SCALARS})
+                if 'events/type' in data:
+                    res.events = EventLog.from_dict({name[7:]: data[name] for name in data.files if name.startswith('events/')})
+                if 'equity' in data:
+                    res.equity = EquityCurve.from_dict({'equity': data['equity'], 'margin': data['margin']})
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+            # missing, or half-written by a process that died: recomputed by the caller
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return res
+
+    def put(self, key: str, res: SimulationResult) -> None:
+        arrays = {name: np.asarray(getattr(res, name)) for name in _SCALARS}
+        if res.events is not None:
+            arrays.update({f'events/{name}': col for name, col in res.events.columns().items()})
+        if res.equity is not None:
+            arrays.update(equity=res.equity.equity, margin=res.equity.margin)
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._written += self._path(key).stat().st_size
+        if self._written > self.max_bytes // 16:
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the total size is within `max_bytes`;
+        returns how many were deleted."""
+        self._written = 0
+        entries = []
+        for entry in self._files():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for entry in list(self._files()):
+            os.unlink(entry.path)
+
+    def run(self, prices, **params) -> SimulationResult:
+        """`run_simulation_from_prices(prices, **params)`, answered from the cache when the
+        same run was stored before. Runs with `stats` are always computed."""
+        params.pop('run_cache', None)
+        if params.get('stats') is not None:
+            return run_simulation_from_prices(prices, **params)
+        key = self.key(prices, params)
+        res = self.get(key)
+        if res is None:
+            res = run_simulation_from_prices(prices, **params)
+            self.put(key, res)
+        return res
@@ -1,14 +1,47 @@
 """Simple screener to download OHLCV historical data using yfinance.
 Provides functions for fetching and saving CSVs to `pine/data/` for later use in TradingView/Pine comparisons.
+
+`update_universe` keeps a `datastore.MarketDataStore` current: for each ticker it only
+downloads the bars after the last stored one, many tickers at a time, with retries and
+an optional rate limit. Downloads go through a provider object (`YFinanceProvider` by
+default, `FakeProvider` for offline use and tests).
+
+Importing the module has no side effects: yfinance is imported on the first download
+and `DATA_DIR` is created when a CSV is saved into it.
 """
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import importlib
 from pathlib import Path
-from typing import Optional
+import threading
+import time
+from typing import Callable, Dict, Iterable, Mapping, Optional
 
 import pandas as pd
-import yfinance as yf
 
 DATA_DIR = Path('pine/data')
-DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+
+class _LazyModule:
+    """Stand-in for a module that imports it on first attribute access.
+
+    Attributes set on it (as `unittest.mock.patch('scripts.screener.yf.download')`
+    does) take precedence over the module's own.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+yf = _LazyModule('yfinance')
 
 
 def fetch_data(ticker: str, start: Optional[str] = None, end: Optional[str] = None, period: Optional[str] = None, interval: str = '1d') -> pd.DataFrame:
@@ -30,11 +63,160 @@ def fetch_data(ticker: str, start: Optional[str] = None, end: Optional[str] = No
 def fetch_and_save(ticker: str, start: Optional[str] = None, end: Optional[str] = None, period: Optional[str] = None, interval: str = '1d') -> Path:
     """Fetch data and save to CSV under `pine/data/<ticker>.csv` (returns path)."""
     df = fetch_data(ticker, start=start, end=end, period=period, interval=interval)
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
     out = DATA_DIR / f"{ticker.replace('/','_')}.csv"
     df.to_csv(out)
     return out
 
 
+def fetch_and_store(ticker: str, start: Optional[str] = None, end: Optional[str] = None, period: Optional[str] = None, interval: str = '1d', store=None) -> str:
+    """Fetch data and merge it into a `datastore.MarketDataStore` (default `pine/store`)."""
+    from scripts.datastore import MarketDataStore
+
+    df = fetch_data(ticker, start=start, end=end, period=period, interval=interval)
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.droplevel(-1, axis=1)
+    store = store or MarketDataStore()
+    store.write(ticker, interval, df)
+    return ticker
+
+
+class YFinanceProvider:
+    """Download backend using `yf.download`; returns an empty frame when there is no data."""
+
+    def download(self, ticker: str, start=None, end=None, period: Optional[str] = None, interval: str = '1d') -> pd.DataFrame:
+        df = yf.download(ticker, start=start, end=end, period=period, interval=interval, progress=False)
+        if isinstance(df.columns, pd.MultiIndex):
+            # newer yfinance returns (field, ticker) columns even for one ticker
+            df = df.droplevel(-1, axis=1)
+        return df
+
+
+class FakeProvider:
+    """Offline backend serving fixed frames, with `end` exclusive like yfinance.
+
+    `period` is ignored (the whole frame is served). The first `fail_times` calls per
+    ticker raise `ConnectionError`; `calls` records every `(ticker, start, end)` asked for.
+    """
+
+    def __init__(self, frames: Mapping[str, pd.DataFrame], fail_times: int = 0):
+        self.frames = dict(frames)
+        self.fail_times = fail_times
+        self.calls = []
+        self._failures: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def download(self, ticker: str, start=None, end=None, period: Optional[str] = None, interval: str = '1d') -> pd.DataFrame:
+        with self._lock:
+            self.calls.append((ticker, start, end))
+            failed = self._failures.get(ticker, 0)
+            if failed < self.fail_times:
+                self._failures[ticker] = failed + 1
+                raise ConnectionError(f'simulated failure for {ticker}')
+        df = self.frames.get(ticker)
+        if df is None:
+            return pd.DataFrame()
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index < pd.Timestamp(end)]
+        return df
+
+
+class RateLimiter:
+    """Spaces calls to `wait()` at least `1 / rate` seconds apart, across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+@dataclass
+class UpdateReport:
+    rows: Dict[str, int] = field(default_factory=dict)  # bars downloaded per ticker
+    failed: Dict[str, str] = field(default_factory=dict)  # ticker -> last error
+
+
+def update_ticker(ticker: str, interval: str = '1d', provider=None, store=None, period: str = 'max', limiter: Optional[RateLimiter] = None) -> int:
+    """Download the bars after the last stored one (all of `period` when none) into `store`.
+
+    The last stored bar is fetched again, since it may still have been forming. Returns
+    the number of bars downloaded.
+    """
+    from scripts.datastore import MarketDataStore
+
+    provider = provider or YFinanceProvider()
+    store = store or MarketDataStore()
+    last = store.last_timestamp(ticker, interval)
+    if limiter is not None:
+        limiter.wait()
+    if last is None:
+        df = provider.download(ticker, period=period, interval=interval)
+    else:
+        df = provider.download(ticker, start=last, interval=interval)
+    if df.empty:
+        return 0
+    store.write(ticker, interval, df)
+    return len(df)
+
+
+def _with_retries(fn: Callable[[], int], retries: int, backoff: float) -> int:
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def update_universe(
+    tickers: Iterable[str],
+    interval: str = '1d',
+    provider=None,
+    store=None,
+    period: str = 'max',
+    max_workers: int = 8,
+    retries: int = 3,
+    backoff: float = 1.0,
+    rate_limit: Optional[float] = None,
+) -> UpdateReport:
+    """`update_ticker` for many tickers on a pool of `max_workers` threads.
+
+    Each ticker is retried `retries` times with exponential `backoff` (seconds);
+    `rate_limit` caps downloads per second across the pool. Tickers that still fail are
+    reported in `UpdateReport.failed` instead of stopping the others.
+    """
+    from scripts.datastore import MarketDataStore
+
+    provider = provider or YFinanceProvider()
+    store = store or MarketDataStore()
+    limiter = RateLimiter(rate_limit) if rate_limit else None
+    report = UpdateReport()
+
+    def work(ticker: str) -> int:
+        return _with_retries(lambda: update_ticker(ticker, interval, provider, store, period, limiter), retries, backoff)
+
+    tickers = list(dict.fromkeys(tickers))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {ticker: pool.submit(work, ticker) for ticker in tickers}
+        for ticker, future in futures.items():
+            try:
+                report.rows[ticker] = future.result()
+            except Exception as exc:
+                report.failed[ticker] = repr(exc)
+    return report
+
+
 if __name__ == '__main__':
     # small CLI example
     import argparse
@@ -45,7 +227,20 @@ if __name__ == '__main__':
     p.add_argument('--interval', default='1d')
     p.add_argument('--start', default=None)
     p.add_argument('--end', default=None)
+    p.add_argument('--store', action='store_true', help='Write into the columnar data store instead of a CSV')
+    p.add_argument('--update', action='store_true', help='Incrementally update the data store; ticker may be a comma-separated list')
+    p.add_argument('--workers', type=int, default=8)
+    p.add_argument('--rate', type=float, default=None, help='Max downloads per second')
     args = p.parse_args()
 
-    path = fetch_and_save(args.ticker, start=args.start, end=args.end, period=args.period, interval=args.interval)
-    print('Saved', path)
+    if args.update:
+        report = update_universe(args.ticker.split(','), interval=args.interval, max_workers=args.workers, rate_limit=args.rate)
+        print('Updated', sum(report.rows.values()), 'bars for', len(report.rows), 'tickers')
+        for ticker, error in report.failed.items():
+            print('FAILED', ticker, error)
+    elif args.store:
+        fetch_and_store(args.ticker, start=args.start, end=args.end, period=args.period, interval=args.interval)
+        print('Stored', args.ticker, args.interval)
+    else:
+        path = fetch_and_save(args.ticker, start=args.start, end=args.end, period=args.period, interval=args.interval)
+        print('Saved', path)
@@ -1,9 +1,21 @@
-from typing import List, Optional, Dict
+from collections import OrderedDict
+from contextlib import nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Hashable, List, Optional, Dict, Sequence, Tuple, Union
+import hashlib
+import os
+import tempfile
 import numpy as np
-import pandas as pd
 
+from scripts import kernels
 
-def rsi(series: pd.Series, length: int) -> pd.Series:
+if TYPE_CHECKING:
+    # pandas is only imported for the fallback indicators, so workers and CLI calls
+    # that stay on the NumPy kernels start without it
+    import pandas as pd
+
+
+def rsi(series: 'pd.Series', length: int) -> 'pd.Series':
     # Wilder's RSI (RMA / EMA with alpha=1/length)
     delta = series.diff()
     gain = delta.clip(lower=0.0)
@@ -16,7 +28,9 @@ def rsi(series: pd.Series, length: int) -> pd.Series:
     return rsi
 
 
-def bollinger_bands(series: pd.Series, length: int, stddev: float) -> pd.DataFrame:
+def bollinger_bands(series: 'pd.Series', length: int, stddev: float) -> 'pd.DataFrame':
+    import pandas as pd
+
     basis = series.rolling(length, min_periods=length).mean()
     # population std (ddof=0) to match Pine ta.stdev behavior
     dev = series.rolling(length, min_periods=length).std(ddof=0)
@@ -25,6 +39,160 @@ def bollinger_bands(series: pd.Series, length: int, stddev: float) -> pd.DataFra
     return pd.DataFrame({'basis': basis, 'upper': upper, 'lower': lower})
 
 
+def series_digest(values: np.ndarray) -> str:
+    """Content hash of a float64 series, used as the series part of cache keys."""
+    arr = np.ascontiguousarray(values, dtype=np.float64)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(arr.shape).encode())
+    h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+class IndicatorCache:
+    """LRU cache of indicator arrays keyed by (indicator, series digest, params).
+
+    Entries are evicted least-recently-used first once their total size exceeds
+    `max_bytes`. With `disk_dir` set, every entry is also written there as `.npy` and
+    misses in memory fall back to disk, so the cache survives across processes and runs.
+    Files are written through a temporary file and `os.replace`, so workers can share
+    the directory; an unreadable file counts as a miss.
+    Cached arrays are read-only; callers get views, not copies.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, disk_dir: Optional[Union[str, Path]] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _disk_path(self, key: Hashable) -> Path:
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return self.disk_dir / f"{name}.npy"
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        arr = self._entries.get(key)
+        if arr is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return arr
+        if self.disk_dir is not None:
+            try:
+                arr = np.load(self._disk_path(key))
+            except (OSError, EOFError, ValueError):
+                # missing, or cut short by a worker that died while writing it
+                arr = None
+            if arr is not None:
+                self._remember(key, arr)
+                self.hits += 1
+                return arr
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, arr: np.ndarray) -> np.ndarray:
+        arr = np.asarray(arr)
+        if self.disk_dir is not None:
+            # write next to the target and rename, so other workers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, arr)
+                os.replace(tmp, self._disk_path(key))
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        return self._remember(key, arr)
+
+    def _remember(self, key: Hashable, arr: np.ndarray) -> np.ndarray:
+        arr.flags.writeable = False
+        if arr.nbytes > self.max_bytes:
+            return arr
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        self._entries[key] = arr
+        self.nbytes += arr.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        return arr
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        arr = self.get(key)
+        if arr is None:
+            arr = self.put(key, compute())
+        return arr
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nbytes = 0
+
+
+def precompute_indicators(
+    close: Union[List[float], np.ndarray],
+    cache: IndicatorCache,
+    rsi_lengths: Sequence[int] = (),
+    bb_params: Sequence[Tuple[int, float]] = (),
+) -> None:
+    """Put the RSI of every `rsi_lengths` value and the bands of every
+    `(bbLength, bbStdDev)` of `bb_params` into `cache`, all lengths computed together
+    by `kernels.rsi_multi` / `kernels.bollinger_multi`.
+
+    Later `generate_signal_codes(close, ..., cache=cache)` calls find them there.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    if not np.isfinite(close).all():
+        return
+    digest = series_digest(close)
+    rsi_lengths = [n for n in dict.fromkeys(rsi_lengths) if cache.get(('rsi', digest, n)) is None]
+    bb_params = [p for p in dict.fromkeys(bb_params) if cache.get(('bb', digest) + tuple(p)) is None]
+    if rsi_lengths:
+        for n, col in zip(rsi_lengths, kernels.rsi_multi(close, rsi_lengths)):
+            cache.put(('rsi', digest, n), col)
+    if bb_params:
+        lengths, devs = zip(*bb_params)
+        for p, bands in zip(bb_params, kernels.bollinger_multi(close, lengths, devs)):
+            cache.put(('bb', digest) + tuple(p), bands)
+
+
+# parameters of generate_signals_from_series besides the data
+SIGNAL_PARAMS = ('useRSI', 'rsiLength', 'rsiLongLevel', 'rsiShortLevel', 'useBB', 'bbLength', 'bbStdDev')
+
+
+def generate_signal_codes(
+    close: Union[List[float], np.ndarray, 'pd.Series'],
+    useRSI: bool = True,
+    rsiLength: int = 14,
+    rsiLongLevel: int = 30,
+    rsiShortLevel: int = 70,
+    useBB: bool = True,
+    bbLength: int = 20,
+    bbStdDev: float = 2.0,
+    cache: Optional[IndicatorCache] = None,
+    stats=None,
+) -> np.ndarray:
+    """Replicate Pine logic for finalLongSignal/finalShortSignal as an int8 array:
+    `LONG` (1), `SHORT` (-1) or `FLAT` (0) per bar. The simulators take it as is.
+
+    With `cache`, RSI/BB columns and the signal vector are reused for repeated inputs;
+    the returned array is then a read-only view. With `stats` (a `profiling.SimStats`),
+    the time spent is added to its 'signals' phase.
+    """
+    with stats.phase('signals') if stats is not None else nullcontext():
+        close = np.asarray(close, dtype=np.float64)
+        if cache is None:
+            return _signal_codes(close, useRSI, rsiLength, rsiLongLevel, rsiShortLevel, useBB, bbLength, bbStdDev, stats=stats)
+        digest = series_digest(close)
+        key = ('signals', digest, useRSI, rsiLength, rsiLongLevel, rsiShortLevel, useBB, bbLength, bbStdDev)
+        return cache.get_or_compute(key, lambda: _signal_codes(close, useRSI, rsiLength, rsiLongLevel, rsiShortLevel, useBB, bbLength, bbStdDev, cache, digest, stats))
+
+
 def generate_signals_from_series(
     close: List[float],
     useRSI: bool = True,
@@ -34,38 +202,87 @@ def generate_signals_from_series(
     useBB: bool = True,
     bbLength: int = 20,
     bbStdDev: float = 2.0,
+    cache: Optional[IndicatorCache] = None,
+    stats=None,
 ) -> List[Optional[str]]:
-    """Replicate Pine logic for finalLongSignal/finalShortSignal.
-    Returns a list of 'long' / 'short' / None per bar aligning with input close list.
+    """`generate_signal_codes` as a list of 'long' / 'short' / None per bar.
+
+    Kept for callers that work with strings; `signals_from_codes` converts a code array.
     """
-    s = pd.Series(close)
-    rsi_series = rsi(s, rsiLength) if useRSI else pd.Series([np.nan]*len(s))
-    bb = bollinger_bands(s, bbLength, bbStdDev) if useBB else pd.DataFrame({'upper': [np.nan]*len(s), 'lower': [np.nan]*len(s)})
-
-    rsiLongSignal = (useRSI) & (rsi_series <= rsiLongLevel)
-    rsiShortSignal = (useRSI) & (rsi_series >= rsiShortLevel)
-    bbLongSignal = (useBB) & (s <= bb['lower'])
-    bbShortSignal = (useBB) & (s >= bb['upper'])
-
-    finalLong = pd.Series([False]*len(s))
-    finalShort = pd.Series([False]*len(s))
-
-    if useRSI and useBB:
-        finalLong = rsiLongSignal & bbLongSignal
-        finalShort = rsiShortSignal & bbShortSignal
-    elif useRSI:
-        finalLong = rsiLongSignal
-        finalShort = rsiShortSignal
-    elif useBB:
-        finalLong = bbLongSignal
-        finalShort = bbShortSignal
-
-    signals: List[Optional[str]] = []
-    for long, short in zip(finalLong.fillna(False), finalShort.fillna(False)):
-        if long:
-            signals.append('long')
-        elif short:
-            signals.append('short')
-        else:
-            signals.append(None)
-    return signals
+    return signals_from_codes(generate_signal_codes(close, useRSI, rsiLength, rsiLongLevel, rsiShortLevel, useBB, bbLength, bbStdDev, cache, stats))
+
+
+def filter_signal_codes(codes: np.ndarray, allowed: np.ndarray) -> np.ndarray:
+    """Keep the entries of `codes` on bars where `allowed` (e.g. the codes of a higher
+    timeframe, see `timeframes.TimeframeCache.signal_codes`) signals the same side."""
+    codes = np.asarray(codes, dtype=np.int8)
+    return np.where(codes == np.asarray(allowed), codes, FLAT).astype(np.int8)
+
+
+LONG, SHORT, FLAT = 1, -1, 0
+# signal of each code, indexed by the code itself: 0 -> None, 1 -> 'long', -1 -> 'short'
+_SIGNAL_OF_CODE = (None, 'long', 'short')
+
+
+def signals_from_codes(codes: np.ndarray) -> List[Optional[str]]:
+    """The string view of a signal code array: 'long' / 'short' / None per bar."""
+    return np.array(_SIGNAL_OF_CODE, dtype=object)[np.asarray(codes, dtype=np.intp)].tolist()
+
+
+def _series(close: np.ndarray) -> 'pd.Series':
+    import pandas as pd
+
+    return pd.Series(close)
+
+
+def _signal_codes(
+    close: np.ndarray,
+    useRSI: bool,
+    rsiLength: int,
+    rsiLongLevel: int,
+    rsiShortLevel: int,
+    useBB: bool,
+    bbLength: int,
+    bbStdDev: float,
+    cache: Optional[IndicatorCache] = None,
+    digest: Optional[str] = None,
+    stats=None,
+) -> np.ndarray:
+    # the RSI kernel needs finite closes; pandas handles gaps and infinities
+    finite = bool(np.isfinite(close).all())
+    r = bands = None
+    if useRSI:
+        def compute_rsi():
+            return kernels.rsi_multi(close, [rsiLength])[0] if finite else rsi(_series(close), rsiLength).to_numpy()
+        if stats is not None:
+            compute_rsi = stats.timed('rsi', compute_rsi)
+        r = cache.get_or_compute(('rsi', digest, rsiLength), compute_rsi) if cache is not None else compute_rsi()
+    if useBB:
+        def compute_bands():
+            return kernels.bollinger_multi(close, [bbLength], bbStdDev)[0]
+        if stats is not None:
+            compute_bands = stats.timed('bollinger_bands', compute_bands)
+        bands = cache.get_or_compute(('bb', digest, bbLength, bbStdDev), compute_bands) if cache is not None else compute_bands()
+    return _codes_from_indicators(close, r, bands, rsiLongLevel, rsiShortLevel)
+
+
+def _codes_from_indicators(
+    close: np.ndarray,
+    r: Optional[np.ndarray],
+    bands: Optional[np.ndarray],
+    rsiLongLevel: int,
+    rsiShortLevel: int,
+) -> np.ndarray:
+    """Signal codes of `close` (bars, or paths x bars) from its RSI (same shape) and
+    Bollinger basis/upper/lower (shape + 3); a filter given as None is off."""
+    # both filters must agree when both are on; NaN warm-up bars compare False
+    long = np.full(close.shape, r is not None or bands is not None)
+    short = long.copy()
+    if r is not None:
+        long &= r <= rsiLongLevel
+        short &= r >= rsiShortLevel
+    if bands is not None:
+        long &= close <= bands[..., 2]
+        short &= close >= bands[..., 1]
+    # long wins when both fire, as in the Pine if/else chain
+    return np.where(long, LONG, np.where(short, SHORT, FLAT)).astype(np.int8)
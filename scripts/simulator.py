@@ -1,6 +1,12 @@
-from dataclasses import dataclass
-from typing import List, Optional, Dict
+import copy
+import inspect
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Dict, Tuple
 
+import numpy as np
+
+from scripts.events import EventLog
+from scripts.metrics import EquityCurve
 from scripts.trade_manager import Position
 from scripts import pine_calc
 
@@ -13,102 +19,164 @@ class SimulationResult:
     wins: int
     losses: int
     trades: int
-    events: List[Dict] = None
+    events: Optional[EventLog] = None
+    equity: Optional[EquityCurve] = None
 
 
-def run_simulation(
-    prices: List[float],
-    signals: List[Optional[str]],  # 'long' | 'short' | None
-    initial_balance: float = 1000.0,
-    risk_per_trade: float = 1.0,
-    leverage: float = 10.0,
-    commission_rate: float = 0.1,
-    margin_type: str = 'Cross',
-    useSL: bool = False,
-    useTP: bool = False,
-    slPercent: float = 1.0,
-    tpPercent: float = 2.0,
-    useAveraging: bool = True,
-    avgDistancePercent: float = 5.0,
-    martingaleMultiplier: float = 2.0,
-    maxAvgCount: int = 3,
-    min_notional: float = 1.0,    record_events: bool = False,):
-    assert len(prices) == len(signals)
+# parameters of run_simulation that configure a Simulator (everything but the data)
+SIMULATOR_PARAMS = (
+    'initial_balance', 'risk_per_trade', 'leverage', 'commission_rate', 'margin_type',
+    'useSL', 'useTP', 'slPercent', 'tpPercent', 'useAveraging', 'avgDistancePercent',
+    'martingaleMultiplier', 'maxAvgCount', 'min_notional', 'record_events', 'record_equity', 'intrabar_path',
+)
+
+# order in which `step_ohlc` assumes the high and the low were reached inside a bar:
+# 'auto' follows TradingView's broker emulator (the extreme nearer the open comes first),
+# 'worst' takes the extreme adverse to the open position first
+INTRABAR_PATHS = ('auto', 'high_first', 'low_first', 'worst')
+
+# mutable state carried between bars, besides the two positions
+_STATE_FIELDS = (
+    'bar', 'current_balance', 'total_profit', 'total_commission', 'wins', 'losses', 'trades',
+    'long_total_volume', 'short_total_volume', 'events', 'equity',
+)
+
+
+def _signal_view(signals):
+    """Iterate signals given as strings or as numeric codes (1 / -1 / 0, any int or float
+    dtype, read by sign as `fast_simulator.encode_signals` does), as strings."""
+    if isinstance(signals, np.ndarray) and signals.dtype.kind in 'iuf':
+        return map(_SIGNAL_OF_CODE.__getitem__, np.sign(signals).astype(np.int8).tolist())
+    return signals
 
-    current_balance = initial_balance
-    total_profit = 0.0
-    total_commission = 0.0
-    wins = 0
-    losses = 0
-    trades = 0
 
-    long_pos = Position(is_long=True)
-    short_pos = Position(is_long=False)
+class Simulator:
+    """Bar-by-bar form of `run_simulation`.
 
-    longPositionActive = False
-    shortPositionActive = False
+    Bars are fed with `step(close, signal)` or `feed(prices, signals)`, or as OHLC bars
+    with `step_ohlc` / `feed_ohlc`; `result()` can be taken at any point. `snapshot()` returns the full state (parameters, counters,
+    positions and events) as plain data, and `Simulator.restore(state)` continues from it,
+    so extending a backtest only costs the new bars.
+    """
 
-    long_total_volume = 0.0
-    short_total_volume = 0.0
+    def __init__(
+        self,
+        initial_balance: float = 1000.0,
+        risk_per_trade: float = 1.0,
+        leverage: float = 10.0,
+        commission_rate: float = 0.1,
+        margin_type: str = 'Cross',
+        useSL: bool = False,
+        useTP: bool = False,
+        slPercent: float = 1.0,
+        tpPercent: float = 2.0,
+        useAveraging: bool = True,
+        avgDistancePercent: float = 5.0,
+        martingaleMultiplier: float = 2.0,
+        maxAvgCount: int = 3,
+        min_notional: float = 1.0,
+        record_events: bool = False,
+        record_equity: bool = False,
+        intrabar_path: str = 'auto',
+    ):
+        if intrabar_path not in INTRABAR_PATHS:
+            raise ValueError(f"unknown intrabar_path: {intrabar_path!r}")
+        self.initial_balance = initial_balance
+        self.risk_per_trade = risk_per_trade
+        self.leverage = leverage
+        self.commission_rate = commission_rate
+        self.margin_type = margin_type
+        self.useSL = useSL
+        self.useTP = useTP
+        self.slPercent = slPercent
+        self.tpPercent = tpPercent
+        self.useAveraging = useAveraging
+        self.avgDistancePercent = avgDistancePercent
+        self.martingaleMultiplier = martingaleMultiplier
+        self.maxAvgCount = maxAvgCount
+        self.min_notional = min_notional
+        self.record_events = record_events
+        self.record_equity = record_equity
+        self.intrabar_path = intrabar_path
 
-    events = [] if record_events else None
+        # index of the next bar; events are stamped with it
+        self.bar = 0
+        self.current_balance = initial_balance
+        self.total_profit = 0.0
+        self.total_commission = 0.0
+        self.wins = 0
+        self.losses = 0
+        self.trades = 0
 
-    for i, close in enumerate(prices):
-        sig = signals[i]
+        self.long_pos = Position(is_long=True)
+        self.short_pos = Position(is_long=False)
+
+        self.long_total_volume = 0.0
+        self.short_total_volume = 0.0
+
+        self.events: Optional[EventLog] = EventLog() if record_events else None
+        # mark-to-market equity after every bar, see scripts.metrics
+        self.equity: Optional[EquityCurve] = EquityCurve() if record_equity else None
+
+    def _sufficient_funds(self, trade_vol: float, price: float) -> bool:
+        long_pos = self.long_pos
+        short_pos = self.short_pos
+        return pine_calc.check_sufficient_funds(trade_vol, price, self.current_balance, self.long_total_volume, self.short_total_volume, long_pos.active, long_pos.entry_price or 0.0, short_pos.active, short_pos.entry_price or 0.0, self.leverage)
+
+    def step(self, close: float, signal: Optional[str] = None, bar: Optional[int] = None) -> None:
+        """Process one bar. `bar` defaults to the bar after the previous one."""
+        i = self.bar if bar is None else bar
+        self.bar = i + 1
+        long_pos = self.long_pos
+        short_pos = self.short_pos
+        record_events = self.record_events
+        events = self.events
 
         # Open position if signal and no position active
-        if sig == 'long' and not long_pos.active and not short_pos.active:
-            pos_vol = pine_calc.calculate_position_volume(close, current_balance, risk_per_trade, leverage)
-            if pos_vol > 0 and pos_vol * close >= min_notional and pine_calc.check_sufficient_funds(pos_vol, close, current_balance, long_total_volume, short_total_volume, long_pos.active, long_pos.entry_price or 0.0, short_pos.active, short_pos.entry_price or 0.0, leverage):
-                long_pos.open(close, pos_vol, useSL, useTP, slPercent, tpPercent)
-                long_total_volume = long_pos.total_volume
-                trades += 1
+        if signal == 'long' and not long_pos.active and not short_pos.active:
+            pos_vol = pine_calc.calculate_position_volume(close, self.current_balance, self.risk_per_trade, self.leverage)
+            if pos_vol > 0 and pos_vol * close >= self.min_notional and self._sufficient_funds(pos_vol, close):
+                long_pos.open(close, pos_vol, self.useSL, self.useTP, self.slPercent, self.tpPercent)
+                self.long_total_volume = long_pos.total_volume
+                self.trades += 1
                 if record_events:
-                    events.append({
-                        'type': 'open', 'side': 'long', 'price': close, 'volume': pos_vol, 'bar': i,
-                    })
+                    events.add_open(i, 'long', close, pos_vol)
             else:
                 # not enough notional or funds to open
                 pass
-        elif sig == 'short' and not short_pos.active and not long_pos.active:
-            pos_vol = pine_calc.calculate_position_volume(close, current_balance, risk_per_trade, leverage)
-            if pos_vol > 0 and pos_vol * close >= min_notional and pine_calc.check_sufficient_funds(pos_vol, close, current_balance, long_total_volume, short_total_volume, long_pos.active, long_pos.entry_price or 0.0, short_pos.active, short_pos.entry_price or 0.0, leverage):
-                short_pos.open(close, pos_vol, useSL, useTP, slPercent, tpPercent)
-                short_total_volume = short_pos.total_volume
-                trades += 1
+        elif signal == 'short' and not short_pos.active and not long_pos.active:
+            pos_vol = pine_calc.calculate_position_volume(close, self.current_balance, self.risk_per_trade, self.leverage)
+            if pos_vol > 0 and pos_vol * close >= self.min_notional and self._sufficient_funds(pos_vol, close):
+                short_pos.open(close, pos_vol, self.useSL, self.useTP, self.slPercent, self.tpPercent)
+                self.short_total_volume = short_pos.total_volume
+                self.trades += 1
                 if record_events:
-                    events.append({
-                        'type': 'open', 'side': 'short', 'price': close, 'volume': pos_vol, 'bar': i,
-                    })
+                    events.add_open(i, 'short', close, pos_vol)
             else:
                 # not enough notional or funds to open
                 pass
         # Averaging
-        if long_pos.active and useAveraging and long_pos.avg_count < maxAvgCount:
-            if long_pos.should_average(close, avgDistancePercent):
-                newVol = long_pos.total_volume * martingaleMultiplier
-                if pine_calc.check_sufficient_funds(newVol, close, current_balance, long_total_volume, short_total_volume, long_pos.active, long_pos.entry_price or 0.0, short_pos.active, short_pos.entry_price or 0.0, leverage):
-                    long_pos.add_average(close, martingaleMultiplier)
+        if long_pos.active and self.useAveraging and long_pos.avg_count < self.maxAvgCount:
+            if long_pos.should_average(close, self.avgDistancePercent):
+                newVol = long_pos.total_volume * self.martingaleMultiplier
+                if self._sufficient_funds(newVol, close):
+                    long_pos.add_average(close, self.martingaleMultiplier)
                     # update TP/SL after averaging to match Pine behaviour
-                    long_pos.update_targets(useSL, useTP, slPercent, tpPercent)
-                    long_total_volume = long_pos.total_volume
+                    long_pos.update_targets(self.useSL, self.useTP, self.slPercent, self.tpPercent)
+                    self.long_total_volume = long_pos.total_volume
                     if record_events:
-                        events.append({
-                            'type': 'avg', 'side': 'long', 'price': close, 'new_volume': long_pos.avg_volumes[-1], 'avg_count': long_pos.avg_count, 'bar': i,
-                        })
-
-        if short_pos.active and useAveraging and short_pos.avg_count < maxAvgCount:
-            if short_pos.should_average(close, avgDistancePercent):
-                newVol = short_pos.total_volume * martingaleMultiplier
-                if pine_calc.check_sufficient_funds(newVol, close, current_balance, long_total_volume, short_total_volume, long_pos.active, long_pos.entry_price or 0.0, short_pos.active, short_pos.entry_price or 0.0, leverage):
-                    short_pos.add_average(close, martingaleMultiplier)
+                        events.add_avg(i, 'long', close, newVol, long_pos.avg_count)
+
+        if short_pos.active and self.useAveraging and short_pos.avg_count < self.maxAvgCount:
+            if short_pos.should_average(close, self.avgDistancePercent):
+                newVol = short_pos.total_volume * self.martingaleMultiplier
+                if self._sufficient_funds(newVol, close):
+                    short_pos.add_average(close, self.martingaleMultiplier)
                     # update TP/SL after averaging to match Pine behaviour
-                    short_pos.update_targets(useSL, useTP, slPercent, tpPercent)
-                    short_total_volume = short_pos.total_volume
+                    short_pos.update_targets(self.useSL, self.useTP, self.slPercent, self.tpPercent)
+                    self.short_total_volume = short_pos.total_volume
                     if record_events:
-                        events.append({
-                            'type': 'avg', 'side': 'short', 'price': close, 'new_volume': short_pos.avg_volumes[-1], 'avg_count': short_pos.avg_count, 'bar': i,
-                        })
+                        events.add_avg(i, 'short', close, newVol, short_pos.avg_count)
 
         # Closing logic for long
         if long_pos.active:
@@ -116,30 +184,19 @@ def run_simulation(
             if ap is not None:
                 should_close = False
                 close_reason = ''
-                if useTP and close >= long_pos.take_profit_price:
+                if self.useTP and close >= long_pos.take_profit_price:
                     should_close = True
                     close_reason = 'TP'
-                elif useSL and close <= long_pos.stop_loss_price:
+                elif self.useSL and close <= long_pos.stop_loss_price:
                     should_close = True
                     close_reason = 'SL'
-                elif not useSL:
-                    liqPrice = pine_calc.calculate_liquidation_price(ap, True, leverage, margin_type)
+                elif not self.useSL:
+                    liqPrice = pine_calc.calculate_liquidation_price(ap, True, self.leverage, self.margin_type)
                     if close <= liqPrice:
                         should_close = True
                         close_reason = 'LIQ'
                 if should_close:
-                    profit, commission = long_pos.close(close, commission_rate)
-                    current_balance += profit
-                    total_profit += profit
-                    total_commission += commission
-                    if record_events:
-                        events.append({
-                            'type': 'close', 'side': 'long', 'price': close, 'profit': profit, 'commission': commission, 'reason': close_reason, 'bar': i,
-                        })
-                    if profit >= 0:
-                        wins += 1
-                    else:
-                        losses += 1
+                    self._close(long_pos, 'long', close, close_reason, i)
 
         # Closing logic for short
         if short_pos.active:
@@ -147,43 +204,281 @@ def run_simulation(
             if ap is not None:
                 should_close = False
                 close_reason = ''
-                if useTP and close <= short_pos.take_profit_price:
+                if self.useTP and close <= short_pos.take_profit_price:
                     should_close = True
                     close_reason = 'TP'
-                elif useSL and close >= short_pos.stop_loss_price:
+                elif self.useSL and close >= short_pos.stop_loss_price:
                     should_close = True
                     close_reason = 'SL'
-                elif not useSL:
-                    liqPrice = pine_calc.calculate_liquidation_price(ap, False, leverage, margin_type)
+                elif not self.useSL:
+                    liqPrice = pine_calc.calculate_liquidation_price(ap, False, self.leverage, self.margin_type)
                     if close >= liqPrice:
                         should_close = True
                         close_reason = 'LIQ'
                 if should_close:
-                    profit, commission = short_pos.close(close, commission_rate)
-                    current_balance += profit
-                    total_profit += profit
-                    total_commission += commission
-                    if record_events:
-                        events.append({
-                            'type': 'close', 'side': 'short', 'price': close, 'profit': profit, 'commission': commission, 'reason': close_reason, 'bar': i,
-                        })
-                    if profit >= 0:
-                        wins += 1
-                    else:
-                        losses += 1
-
-    return SimulationResult(
-        final_balance=current_balance,
-        total_profit=total_profit,
-        total_commission=total_commission,
-        wins=wins,
-        losses=losses,
-        trades=trades,
-        events=events,
+                    self._close(short_pos, 'short', close, close_reason, i)
+
+        if self.equity is not None:
+            self._mark(close)
+
+    def _mark(self, close: float) -> None:
+        equity = self.current_balance
+        margin = 0.0
+        for pos in (self.long_pos, self.short_pos):
+            if pos.active:
+                ap = pos.avg_price()
+                equity = equity + ((close - ap) * pos.total_volume if pos.is_long else (ap - close) * pos.total_volume)
+                margin = margin + pos.total_volume * pos.entry_price / self.leverage
+        self.equity.append(equity, margin)
+
+    def mark_range(self, closes: np.ndarray) -> None:
+        """Record the equity of bars on which nothing happens (as `step` would for each)."""
+        equity = np.full(len(closes), self.current_balance)
+        margin = 0.0
+        for pos in (self.long_pos, self.short_pos):
+            if pos.active:
+                ap = pos.avg_price()
+                equity = equity + ((closes - ap) * pos.total_volume if pos.is_long else (ap - closes) * pos.total_volume)
+                margin = margin + pos.total_volume * pos.entry_price / self.leverage
+        self.equity.extend(equity, margin)
+
+    def step_ohlc(self, open_: float, high: float, low: float, close: float, signal: Optional[str] = None, bar: Optional[int] = None) -> None:
+        """Process one OHLC bar.
+
+        Positions carried into the bar are checked for TP/SL/liquidation along the assumed
+        intrabar path (open, first extreme, second extreme) and filled at the level they
+        cross, or at the open when the bar gaps through it. The close is then processed as
+        in `step`: entries and averaging still happen on the close only, and, as in `step`,
+        a bar that starts with a position open does not enter on its signal.
+        """
+        i = self.bar if bar is None else bar
+        if self.long_pos.active or self.short_pos.active:
+            signal = None
+            if self.long_pos.active:
+                self._intrabar_exit(self.long_pos, 'long', self._intrabar_points(True, open_, high, low), i)
+            if self.short_pos.active:
+                self._intrabar_exit(self.short_pos, 'short', self._intrabar_points(False, open_, high, low), i)
+        self.step(close, signal, bar=i)
+
+    def _intrabar_points(self, is_long: bool, open_: float, high: float, low: float) -> Tuple[float, float, float]:
+        path = self.intrabar_path
+        if path == 'auto':
+            high_first = high - open_ <= open_ - low
+        elif path == 'worst':
+            high_first = not is_long
+        else:
+            high_first = path == 'high_first'
+        return (open_, high, low) if high_first else (open_, low, high)
+
+    def _intrabar_exit(self, pos: Position, side: str, points: Tuple[float, float, float], i: int) -> None:
+        target = pos.take_profit_price if self.useTP else None
+        if self.useSL:
+            stop, stop_reason = pos.stop_loss_price, 'SL'
+        else:
+            stop = pine_calc.calculate_liquidation_price(pos.avg_price(), pos.is_long, self.leverage, self.margin_type)
+            stop_reason = 'LIQ'
+        for k, price in enumerate(points):
+            # a level already passed at the open fills at the open, later ones at the level
+            if target is not None and (price >= target if pos.is_long else price <= target):
+                self._close(pos, side, price if k == 0 else target, 'TP', i)
+                return
+            if price <= stop if pos.is_long else price >= stop:
+                self._close(pos, side, price if k == 0 else stop, stop_reason, i)
+                return
+
+    def _close(self, pos: Position, side: str, close: float, close_reason: str, i: int) -> None:
+        profit, commission = pos.close(close, self.commission_rate)
+        self.current_balance += profit
+        self.total_profit += profit
+        self.total_commission += commission
+        if self.record_events:
+            self.events.add_close(i, side, close, profit, commission, close_reason)
+        if profit >= 0:
+            self.wins += 1
+        else:
+            self.losses += 1
+
+    def feed(self, prices: List[float], signals: List[Optional[str]], engine: str = 'loop') -> None:
+        """Process a chunk of bars following the ones already seen.
+
+        `signals` are 'long' / 'short' / None, or an int8 code array from
+        `signals.generate_signal_codes`.
+        `engine='fast'` skips bars where nothing can happen (see `scripts.fast_simulator`).
+        """
+        if engine == 'fast':
+            from scripts.fast_simulator import feed_fast
+            feed_fast(self, prices, signals)
+            return
+        if engine != 'loop':
+            raise ValueError(f"unknown engine: {engine!r}")
+        assert len(prices) == len(signals)
+        if self.equity is not None:
+            self.equity.reserve(len(prices))
+        for close, sig in zip(prices, _signal_view(signals)):
+            self.step(close, sig)
+
+    def feed_ohlc(self, opens: List[float], highs: List[float], lows: List[float], closes: List[float], signals: List[Optional[str]], engine: str = 'loop') -> None:
+        """`feed` for OHLC bars, processed with `step_ohlc`."""
+        if engine == 'fast':
+            from scripts.fast_simulator import feed_fast
+            feed_fast(self, closes, signals, ohlc=(opens, highs, lows))
+            return
+        if engine != 'loop':
+            raise ValueError(f"unknown engine: {engine!r}")
+        assert len(opens) == len(highs) == len(lows) == len(closes) == len(signals)
+        if self.equity is not None:
+            self.equity.reserve(len(closes))
+        for bar in zip(opens, highs, lows, closes, _signal_view(signals)):
+            self.step_ohlc(*bar)
+
+    def result(self) -> SimulationResult:
+        return SimulationResult(
+            final_balance=self.current_balance,
+            total_profit=self.total_profit,
+            total_commission=self.total_commission,
+            wins=self.wins,
+            losses=self.losses,
+            trades=self.trades,
+            events=self.events,
+            equity=self.equity,
+        )
+
+    def snapshot(self) -> Dict:
+        """Deep copy of the full simulator state as plain (JSON-serialisable) data."""
+        state = {name: getattr(self, name) for name in _STATE_FIELDS}
+        if self.events is not None:
+            state['events'] = self.events.to_dict()
+        if self.equity is not None:
+            state['equity'] = self.equity.to_dict()
+        return copy.deepcopy({
+            'params': {name: getattr(self, name) for name in SIMULATOR_PARAMS},
+            'state': state,
+            'long_pos': asdict(self.long_pos),
+            'short_pos': asdict(self.short_pos),
+        })
+
+    @classmethod
+    def restore(cls, snapshot: Dict) -> 'Simulator':
+        """Rebuild a simulator from `snapshot()` output; it continues where that one stopped."""
+        snapshot = copy.deepcopy(snapshot)
+        sim = cls(**snapshot['params'])
+        for name, value in snapshot['state'].items():
+            setattr(sim, name, value)
+        if sim.events is not None:
+            sim.events = EventLog.from_dict(sim.events)
+        if sim.equity is not None:
+            sim.equity = EquityCurve.from_dict(sim.equity)
+        sim.long_pos = Position(**snapshot['long_pos'])
+        sim.short_pos = Position(**snapshot['short_pos'])
+        return sim
+
+
+def run_simulation(
+    prices: List[float],
+    signals: List[Optional[str]],  # 'long' | 'short' | None, or int8 codes 1 / -1 / 0
+    initial_balance: float = 1000.0,
+    risk_per_trade: float = 1.0,
+    leverage: float = 10.0,
+    commission_rate: float = 0.1,
+    margin_type: str = 'Cross',
+    useSL: bool = False,
+    useTP: bool = False,
+    slPercent: float = 1.0,
+    tpPercent: float = 2.0,
+    useAveraging: bool = True,
+    avgDistancePercent: float = 5.0,
+    martingaleMultiplier: float = 2.0,
+    maxAvgCount: int = 3,
+    min_notional: float = 1.0,    record_events: bool = False,
+    record_equity: bool = False,
+    # optional profiling.SimStats collecting timers and counters of the run
+    stats=None,):
+    assert len(prices) == len(signals)
+
+    sim = Simulator(
+        initial_balance=initial_balance,
+        risk_per_trade=risk_per_trade,
+        leverage=leverage,
+        commission_rate=commission_rate,
+        margin_type=margin_type,
+        useSL=useSL,
+        useTP=useTP,
+        slPercent=slPercent,
+        tpPercent=tpPercent,
+        useAveraging=useAveraging,
+        avgDistancePercent=avgDistancePercent,
+        martingaleMultiplier=martingaleMultiplier,
+        maxAvgCount=maxAvgCount,
+        min_notional=min_notional,
+        record_events=record_events,
+        record_equity=record_equity,
+    )
+    if stats is not None:
+        stats.count('bars', len(prices))
+        stats.instrument(sim)
+        with stats.phase('simulate'):
+            sim.feed(prices, signals)
+    else:
+        sim.feed(prices, signals)
+    return sim.result()
+
+
+def run_simulation_ohlc(
+    opens: List[float],
+    highs: List[float],
+    lows: List[float],
+    closes: List[float],
+    signals: List[Optional[str]],  # 'long' | 'short' | None, decided on the close
+    initial_balance: float = 1000.0,
+    risk_per_trade: float = 1.0,
+    leverage: float = 10.0,
+    commission_rate: float = 0.1,
+    margin_type: str = 'Cross',
+    useSL: bool = False,
+    useTP: bool = False,
+    slPercent: float = 1.0,
+    tpPercent: float = 2.0,
+    useAveraging: bool = True,
+    avgDistancePercent: float = 5.0,
+    martingaleMultiplier: float = 2.0,
+    maxAvgCount: int = 3,
+    min_notional: float = 1.0,
+    record_events: bool = False,
+    record_equity: bool = False,
+    intrabar_path: str = 'auto',
+    engine: str = 'loop',
+) -> SimulationResult:
+    """`run_simulation` on OHLC bars: TP/SL/liquidation also trigger on the bar's high/low.
+
+    The arrays are the Open/High/Low/Close columns saved by `screener.fetch_and_save`.
+    With open == high == low == close on every bar and no averaging the result equals
+    `run_simulation`. With averaging it can differ: a level crossed inside the bar closes
+    the position before the close could average it and move the targets.
+    """
+    sim = Simulator(
+        initial_balance=initial_balance,
+        risk_per_trade=risk_per_trade,
+        leverage=leverage,
+        commission_rate=commission_rate,
+        margin_type=margin_type,
+        useSL=useSL,
+        useTP=useTP,
+        slPercent=slPercent,
+        tpPercent=tpPercent,
+        useAveraging=useAveraging,
+        avgDistancePercent=avgDistancePercent,
+        martingaleMultiplier=martingaleMultiplier,
+        maxAvgCount=maxAvgCount,
+        min_notional=min_notional,
+        record_events=record_events,
+        record_equity=record_equity,
+        intrabar_path=intrabar_path,
     )
+    sim.feed_ohlc(opens, highs, lows, closes, signals, engine=engine)
+    return sim.result()
 
 
-from scripts.signals import generate_signals_from_series
+from scripts.signals import _SIGNAL_OF_CODE, filter_signal_codes, generate_signal_codes
 
 
 def run_simulation_from_prices(
@@ -204,6 +499,7 @@ def run_simulation_from_prices(
     maxAvgCount: int = 3,
     min_notional: float = 1.0,
     record_events: bool = False,
+    record_equity: bool = False,
     # signal generation params (match Pine defaults)
     useRSI: bool = True,
     rsiLength: int = 14,
@@ -212,8 +508,26 @@ def run_simulation_from_prices(
     useBB: bool = True,
     bbLength: int = 20,
     bbStdDev: float = 2.0,
+    # 'loop' walks every bar, 'fast' uses the event-driven engine in scripts.fast_simulator
+    engine: str = 'loop',
+    # optional signals.IndicatorCache reused across calls on the same prices
+    indicator_cache=None,
+    # optional (start, stop) range of bars to trade; signals still come from the whole
+    # series, so overlapping windows share warmed-up indicators through indicator_cache
+    window: Optional[Tuple[int, int]] = None,
+    # optional profiling.SimStats; times signal generation and simulation separately
+    stats=None,
+    # optional int8 codes per bar (e.g. higher-timeframe signals from scripts.timeframes);
+    # only entries on the side it signals on the same bar are taken
+    signal_filter=None,
+    # optional run_cache.RunCache; identical runs (same prices, parameters and engine
+    # code) are loaded from it instead of simulated
+    run_cache=None,
 ):
-    signals = generate_signals_from_series(
+    if run_cache is not None:
+        params = {name: value for name, value in locals().items() if name in FROM_PRICES_DEFAULTS}
+        return run_cache.run(prices, **params)
+    signals = generate_signal_codes(
         prices,
         useRSI=useRSI,
         rsiLength=rsiLength,
@@ -222,8 +536,22 @@ def run_simulation_from_prices(
         useBB=useBB,
         bbLength=bbLength,
         bbStdDev=bbStdDev,
+        cache=indicator_cache,
+        stats=stats,
     )
-    return run_simulation(
+    if signal_filter is not None:
+        signals = filter_signal_codes(signals, signal_filter)
+    if window is not None:
+        start, stop = window
+        prices = prices[start:stop]
+        signals = signals[start:stop]
+    if engine == 'loop':
+        simulate = run_simulation
+    elif engine == 'fast':
+        from scripts.fast_simulator import run_simulation_fast as simulate
+    else:
+        raise ValueError(f"unknown engine: {engine!r}")
+    return simulate(
         prices,
         signals,
         initial_balance=initial_balance,
@@ -241,4 +569,14 @@ def run_simulation_from_prices(
         maxAvgCount=maxAvgCount,
         min_notional=min_notional,
         record_events=record_events,
+        record_equity=record_equity,
+        stats=stats,
     )
+
+
+# keyword defaults of run_simulation_from_prices, for filling in partial parameter sets
+FROM_PRICES_DEFAULTS = {
+    name: param.default
+    for name, param in inspect.signature(run_simulation_from_prices).parameters.items()
+    if param.default is not inspect.Parameter.empty
+}
@@ -0,0 +1,198 @@
+"""Incremental RSI / Bollinger Bands / signal engine for live or replayed bars.
+
+Each object is fed one close at a time with `push` and does O(1) work per bar (amortized
+for the Bollinger window, whose sums are recomputed every few windows). The RSI follows
+the online algorithm pandas uses for `ewm(adjust=False)` and the bands share their
+rolling-sum updates with the batch kernel, so every pushed value equals the corresponding
+element of `signals.rsi` / `kernels.bollinger_multi` /
+`signals.generate_signals_from_series` over the same history.
+"""
+from collections import deque
+import math
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+
+from scripts import kernels
+from scripts.signals import _SIGNAL_OF_CODE
+
+NaN = float('nan')
+
+
+class _WilderRMA:
+    """`Series.ewm(alpha=1/length, adjust=False, min_periods=length).mean()`, one value at a time."""
+
+    def __init__(self, length: int):
+        alpha = 1.0 / length
+        com = (1 - alpha) / alpha
+        alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = alpha
+        self.unit_com = com == 1
+        self.min_periods = length
+        self.weighted = NaN
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.started = False
+
+    def push(self, cur: float) -> float:
+        is_observation = cur == cur
+        if not self.started:
+            self.started = True
+            self.weighted = cur
+            self.nobs = int(is_observation)
+        else:
+            self.nobs += is_observation
+            weighted = self.weighted
+            if weighted == weighted:
+                self.old_wt *= self.old_wt_factor
+                if is_observation:
+                    # pandas skips the update on constant series to avoid rounding noise
+                    if weighted != cur:
+                        new_wt = 1.0 - self.old_wt if self.unit_com else self.new_wt
+                        weighted = self.old_wt * weighted + new_wt * cur
+                        weighted /= (self.old_wt + new_wt)
+                        self.weighted = weighted
+                    self.old_wt = 1.0
+            elif is_observation:
+                self.weighted = cur
+        return self.weighted if self.nobs >= self.min_periods else NaN
+
+
+class StreamingRSI:
+    """Wilder RSI matching `signals.rsi(series, length)` bar by bar."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.prev_close = NaN
+        self.avg_gain = _WilderRMA(length)
+        self.avg_loss = _WilderRMA(length)
+        self.value = NaN
+
+    def push(self, close: float) -> float:
+        delta = close - self.prev_close
+        self.prev_close = close
+        if delta != delta:
+            gain = loss = NaN
+        else:
+            gain = delta if delta > 0.0 else 0.0
+            loss = -delta if delta < 0.0 else 0.0
+        avg_gain = self.avg_gain.push(gain)
+        avg_loss = self.avg_loss.push(loss)
+        if avg_loss == 0.0:
+            # mirror float64 division: x/0 -> inf, 0/0 -> nan
+            rs = NaN if (avg_gain != avg_gain or avg_gain == 0.0) else float('inf')
+        else:
+            rs = avg_gain / avg_loss
+        self.value = 100 - (100 / (1 + rs))
+        return self.value
+
+
+class StreamingBollinger:
+    """Bollinger Bands matching `kernels.bollinger_multi(series, [length], stddev)` bar by bar.
+
+    The window sums are updated with `kernels._band_increments` and recomputed around a
+    new reference every `kernels._bb_block(length)` bars (or for one bar when
+    `kernels._cancelled`), on the same bars and with the same arithmetic as the batch
+    kernel, so both give the same bands to the last bit.
+    """
+
+    def __init__(self, length: int, stddev: float):
+        self.length = length
+        self.stddev = stddev
+        self.block = kernels._bb_block(length)
+        self.window: Deque[float] = deque(maxlen=length)
+        self.bars = 0
+        self.ref = self.s = self.q = self.churn = 0.0
+        # NaN closes in the window, and the run of equal closes ending at the last bar
+        self.missing = 0
+        self.same = 0
+        self.value: Tuple[float, float, float] = (NaN, NaN, NaN)
+
+    def push(self, close: float) -> Tuple[float, float, float]:
+        """Add one close and return `(basis, upper, lower)`."""
+        if math.isinf(close):
+            # rolling windows see infinities as missing values
+            close = NaN
+        window = self.window
+        old = window[0] if len(window) == self.length else NaN
+        self.same = self.same + 1 if window and close == window[-1] else 1
+        window.append(close)
+        self.missing += (close != close) - (old != old and self.bars >= self.length)
+        self.bars += 1
+        u = self.bars - self.length
+        if u < 0:
+            return self.value
+        if u % self.block == 0:
+            values = np.array(window)
+            present = values == values
+            self.ref = float(values[present.argmax()]) if present.any() else 0.0
+            self.s, self.q = self._window_sums()
+            self.churn = abs(self.q)
+        else:
+            ds, dq = kernels._band_increments(self._deviation(close), self._deviation(old))
+            self.s = self.s + ds
+            self.q = self.q + dq
+            self.churn = self.churn + abs(dq)
+        if self.missing:
+            self.value = (NaN, NaN, NaN)
+        elif self.same >= self.length:
+            self.value = (close, close, close)
+        else:
+            s, q = self._window_sums() if kernels._cancelled(self.q, self.churn) else (self.s, self.q)
+            self.value = kernels._bands(s, q, self.ref, self.length, self.stddev)
+        return self.value
+
+    def _deviation(self, close: float) -> float:
+        # missing closes add nothing; their windows are NaN anyway
+        return close - self.ref if close == close else 0.0
+
+    def _window_sums(self) -> Tuple[float, float]:
+        d = np.array(self.window) - self.ref
+        d[d != d] = 0.0
+        return tuple(map(float, kernels._band_sums(d)))
+
+
+class StreamingSignals:
+    """Incremental counterpart of `signals.generate_signals_from_series`.
+
+    `push(close)` returns 'long' / 'short' / None for the new bar.
+    """
+
+    def __init__(
+        self,
+        useRSI: bool = True,
+        rsiLength: int = 14,
+        rsiLongLevel: int = 30,
+        rsiShortLevel: int = 70,
+        useBB: bool = True,
+        bbLength: int = 20,
+        bbStdDev: float = 2.0,
+    ):
+        self.useRSI = useRSI
+        self.useBB = useBB
+        self.rsiLongLevel = rsiLongLevel
+        self.rsiShortLevel = rsiShortLevel
+        self.rsi = StreamingRSI(rsiLength) if useRSI else None
+        self.bb = StreamingBollinger(bbLength, bbStdDev) if useBB else None
+
+    def push(self, close: float) -> Optional[str]:
+        rsiLong = rsiShort = bbLong = bbShort = False
+        if self.rsi is not None:
+            r = self.rsi.push(close)
+            rsiLong = r <= self.rsiLongLevel
+            rsiShort = r >= self.rsiShortLevel
+        if self.bb is not None:
+            basis, upper, lower = self.bb.push(close)
+            bbLong = close <= lower
+            bbShort = close >= upper
+
+        if self.useRSI and self.useBB:
+            finalLong, finalShort = rsiLong and bbLong, rsiShort and bbShort
+        elif self.useRSI:
+            finalLong, finalShort = rsiLong, rsiShort
+        elif self.useBB:
+            finalLong, finalShort = bbLong, bbShort
+        else:
+            finalLong = finalShort = False
+        return _SIGNAL_OF_CODE[1 if finalLong else -1 if finalShort else 0]
@@ -0,0 +1,322 @@
+"""Parallel parameter sweeps over `simulator.run_simulation_from_prices`.
+
+The price series is copied once into shared memory; pool workers attach to it on start-up,
+so each task only ships its small parameter dict. Results are yielded as runs finish and
+collected into a table ranked by the chosen objective.
+
+`run_batch_sweep` is the single-process alternative for grids over trade parameters: the
+sets that share their signal parameters are simulated together by
+`batch_simulator.simulate_batch`, one pass over the bars for the whole group.
+"""
+import itertools
+import os
+import random
+import sys
+from dataclasses import fields
+from multiprocessing import Pool
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts.batch_simulator import simulate_batch
+from scripts.metrics import METRICS
+from scripts.signals import SIGNAL_PARAMS, IndicatorCache, filter_signal_codes, generate_signal_codes, precompute_indicators
+from scripts.simulator import FROM_PRICES_DEFAULTS, run_simulation_from_prices
+
+if TYPE_CHECKING:
+    # workers never build tables; pandas is imported when the results are collected
+    import pandas as pd
+
+# parameters most commonly tuned, with the type their values are coerced to
+SWEEP_PARAMS: Dict[str, type] = {
+    'rsiLength': int,
+    'bbLength': int,
+    'bbStdDev': float,
+    'slPercent': float,
+    'tpPercent': float,
+    'avgDistancePercent': float,
+    'martingaleMultiplier': float,
+    'maxAvgCount': int,
+}
+
+# run_simulation_from_prices parameters `simulate_batch` takes one value per account of
+BATCH_PARAMS = (
+    'initial_balance', 'risk_per_trade', 'leverage', 'commission_rate', 'margin_type',
+    'useSL', 'useTP', 'slPercent', 'tpPercent', 'useAveraging', 'avgDistancePercent',
+    'martingaleMultiplier', 'maxAvgCount', 'min_notional',
+)
+_RESULT_FIELDS = ('final_balance', 'total_profit', 'total_commission', 'wins', 'losses', 'trades')
+
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_prices: Optional[np.ndarray] = None
+_worker_base: Dict[str, Any] = {}
+# per-process: runs that only change trade parameters reuse the RSI/BB columns and signals
+_worker_cache = IndicatorCache()
+
+
+def param_grid(spec: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of `spec` values, e.g. {'slPercent': [1, 2], 'tpPercent': [1, 3]}."""
+    keys = list(spec)
+    return [dict(zip(keys, values)) for values in itertools.product(*(spec[k] for k in keys))]
+
+
+def random_search(spec: Dict[str, Any], n: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Draw `n` parameter sets from `spec`.
+
+    A `(low, high)` tuple samples uniformly (inclusive integers for int parameters),
+    a list samples one of its values.
+    """
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        params = {}
+        for key, dist in spec.items():
+            if isinstance(dist, tuple):
+                low, high = dist
+                if SWEEP_PARAMS.get(key) is int:
+                    params[key] = rng.randint(int(low), int(high))
+                else:
+                    params[key] = rng.uniform(low, high)
+            else:
+                params[key] = rng.choice(list(dist))
+        out.append(params)
+    return out
+
+
+def _attach_prices(shm_name: str, length: int, base_params: Dict[str, Any]) -> None:
+    global _worker_shm, _worker_prices, _worker_base
+    if sys.version_info >= (3, 13):
+        _worker_shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    else:
+        _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_prices = np.ndarray((length,), dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_base = base_params
+
+
+def _attach_prices_local(arr: np.ndarray, base_params: Dict[str, Any]) -> None:
+    global _worker_prices, _worker_base
+    _worker_prices = arr
+    _worker_base = base_params
+
+
+def _run_one(task: Tuple[int, Dict[str, Any]]) -> Tuple[int, Dict[str, Any]]:
+    idx, params = task
+    res = run_simulation_from_prices(_worker_prices, indicator_cache=_worker_cache, **{**_worker_base, **params})
+    row = dict(params)
+    row.update({f.name: getattr(res, f.name) for f in fields(res) if f.name not in ('events', 'equity')})
+    if res.equity is not None:
+        row.update(res.equity.metrics())
+    return idx, row
+
+
+def iter_sweep(
+    prices: Sequence[float],
+    param_sets: Sequence[Dict[str, Any]],
+    base_params: Optional[Dict[str, Any]] = None,
+    processes: Optional[int] = None,
+    chunksize: Optional[int] = None,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield `(index, row)` for each parameter set as soon as its run finishes.
+
+    `row` holds the parameters plus the `SimulationResult` summary fields, and the
+    `metrics.METRICS` values when `record_equity` is set. `base_params` are passed to
+    every run (defaults to the fast engine); `processes=1` runs in-process.
+    """
+    base = {'engine': 'fast', **(base_params or {})}
+    arr = np.ascontiguousarray(prices, dtype=np.float64)
+    tasks = list(enumerate(param_sets))
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(tasks) <= 1:
+        _attach_prices_local(arr, base)
+        for task in tasks:
+            yield _run_one(task)
+        return
+
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    try:
+        np.ndarray(arr.shape, dtype=np.float64, buffer=shm.buf)[:] = arr
+        if chunksize is None:
+            chunksize = max(1, len(tasks) // (processes * 16))
+        with Pool(processes, initializer=_attach_prices, initargs=(shm.name, len(arr), base)) as pool:
+            yield from pool.imap_unordered(_run_one, tasks, chunksize=chunksize)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def objective_params(objective: str, base_params: Optional[Dict[str, Any]], ascending: Optional[bool]) -> Tuple[Dict[str, Any], bool]:
+    """`base_params` and sort direction for ranking by `objective`."""
+    base = dict(base_params or {})
+    if objective in METRICS:
+        base['record_equity'] = True
+    if ascending is None:
+        ascending = METRICS.get(objective, False)
+    return base, ascending
+
+
+def _ranked(rows: List[Optional[Dict[str, Any]]], objective: str, ascending: bool) -> 'pd.DataFrame':
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    return df.sort_values(objective, ascending=ascending, kind='stable').reset_index(drop=True)
+
+
+def run_sweep(
+    prices: Sequence[float],
+    param_sets: Sequence[Dict[str, Any]],
+    base_params: Optional[Dict[str, Any]] = None,
+    processes: Optional[int] = None,
+    objective: str = 'final_balance',
+    ascending: Optional[bool] = None,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+) -> 'pd.DataFrame':
+    """Run every parameter set and return the results ranked by `objective`.
+
+    `objective` is a `SimulationResult` field or one of `metrics.METRICS` (the runs then
+    record their equity curve). `ascending` defaults to False, or to the metric's own
+    direction. `on_result(index, row)` is called as each run finishes.
+    """
+    base_params, ascending = objective_params(objective, base_params, ascending)
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(param_sets)
+    for idx, row in iter_sweep(prices, param_sets, base_params=base_params, processes=processes):
+        rows[idx] = row
+        if on_result is not None:
+            on_result(idx, row)
+    return _ranked(rows, objective, ascending)
+
+
+def run_batch_sweep(
+    prices: Sequence[float],
+    param_sets: Sequence[Dict[str, Any]],
+    base_params: Optional[Dict[str, Any]] = None,
+    objective: str = 'final_balance',
+    ascending: Optional[bool] = None,
+) -> 'pd.DataFrame':
+    """`run_sweep` computed with `simulate_batch`, one batch per distinct signal setting.
+
+    Returns the same table. Only `SimulationResult` fields can be objectives, since the
+    batch engine keeps no per-bar equity; `engine` is ignored.
+    """
+    if objective in METRICS:
+        raise ValueError(f'{objective!r} needs equity curves; use run_sweep')
+    if ascending is None:
+        ascending = False
+    base = dict(base_params or {})
+    unsupported = {k for params in [base, *param_sets] for k, v in params.items() if k in ('record_events', 'record_equity', 'window') and v}
+    if unsupported:
+        raise ValueError(f'not supported by the batch engine: {sorted(unsupported)}')
+    closes = np.ascontiguousarray(prices, dtype=np.float64)
+    settings = [{**FROM_PRICES_DEFAULTS, **base, **params} for params in param_sets]
+    groups: Dict[Tuple, List[int]] = {}
+    for i, s in enumerate(settings):
+        groups.setdefault(tuple(s[name] for name in SIGNAL_PARAMS), []).append(i)
+
+    cache = IndicatorCache()
+    # every RSI / BB length of the grid in one kernel pass each
+    spec = [dict(zip(SIGNAL_PARAMS, key)) for key in groups]
+    precompute_indicators(
+        closes, cache,
+        rsi_lengths=[p['rsiLength'] for p in spec if p['useRSI']],
+        bb_params=[(p['bbLength'], p['bbStdDev']) for p in spec if p['useBB']],
+    )
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(param_sets)
+    for key, members in groups.items():
+        signals = generate_signal_codes(closes, cache=cache, **dict(zip(SIGNAL_PARAMS, key)))
+        if base.get('signal_filter') is not None:
+            signals = filter_signal_codes(signals, base['signal_filter'])
+        per_account = {name: [settings[i][name] for i in members] for name in BATCH_PARAMS}
+        res = simulate_batch(closes, signals, n=len(members), **per_account)
+        for j, i in enumerate(members):
+            row = dict(param_sets[i])
+            row.update({name: getattr(res, name)[j].item() for name in _RESULT_FIELDS})
+            rows[i] = row
+    return _ranked(rows, objective, ascending)
+
+
+def _parse_value(key: str, text: str) -> Any:
+    cast = SWEEP_PARAMS.get(key, float)
+    if cast is not int:
+        return cast(text)
+    value = float(text)
+    if not value.is_integer():
+        raise ValueError(f'{key} must be an integer, got {text!r}')
+    return int(value)
+
+
+def _parse_values(key: str, text: str) -> List[Any]:
+    return [_parse_value(key, v) for v in text.split(',')]
+
+
+def _parse_spec(items: Sequence[str], allow_ranges: bool) -> Dict[str, Any]:
+    spec: Dict[str, Any] = {}
+    for item in items:
+        key, _, text = item.partition('=')
+        if not text:
+            raise ValueError(f"expected name=values, got {item!r}")
+        if allow_ranges and ':' in text:
+            low, high = text.split(':')
+            spec[key] = (float(low), float(high))
+        else:
+            spec[key] = _parse_values(key, text)
+    return spec
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    import pandas as pd
+
+    p = argparse.ArgumentParser(description='Parallel parameter sweep over run_simulation_from_prices')
+    p.add_argument('--prices', required=True, help='Price CSV (pine/data/<TICKER>.csv)')
+    p.add_argument('--column', default='Close')
+    p.add_argument('--grid', action='append', default=[], help='name=v1,v2,... (repeatable)')
+    p.add_argument('--random', action='append', default=[], help='name=low:high or name=v1,v2,... (repeatable)')
+    p.add_argument('--samples', type=int, default=100, help='Number of random-search draws')
+    p.add_argument('--seed', type=int, default=None)
+    p.add_argument('--processes', type=int, default=None)
+    p.add_argument('--objective', default='final_balance')
+    p.add_argument('--ascending', action='store_true', default=None)
+    p.add_argument('--batch', action='store_true', help='Simulate sets sharing signal parameters together (single process)')
+    p.add_argument('--top', type=int, default=20)
+    p.add_argument('--out', default=None, help='Write the ranked table to this CSV')
+    args = p.parse_args()
+
+    if bool(args.grid) == bool(args.random):
+        p.error('give either --grid or --random')
+    try:
+        if args.grid:
+            sets = param_grid(_parse_spec(args.grid, allow_ranges=False))
+        else:
+            sets = random_search(_parse_spec(args.random, allow_ranges=True), args.samples, seed=args.seed)
+    except ValueError as exc:
+        p.error(str(exc))
+
+    closes = pd.read_csv(args.prices, index_col=0)[args.column].to_numpy(dtype=np.float64)
+    _, ascending = objective_params(args.objective, None, args.ascending)
+    started = time.time()
+    best: Dict[str, Any] = {}
+    done = 0
+
+    def report(idx, row):
+        global done, best
+        done += 1
+        value = row[args.objective]
+        better = not best or (value < best[args.objective] if ascending else value > best[args.objective])
+        if better:
+            best = row
+        if better or done == len(sets):
+            print(f"[{done}/{len(sets)} {time.time() - started:.1f}s] best {args.objective}={best[args.objective]:.4f} {best}")
+
+    if args.batch:
+        table = run_batch_sweep(closes, sets, objective=args.objective, ascending=ascending)
+        print(f"[{len(sets)} sets {time.time() - started:.1f}s]")
+    else:
+        table = run_sweep(closes, sets, processes=args.processes, objective=args.objective, ascending=ascending, on_result=report)
+    print(table.head(args.top).to_string())
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print('Wrote', args.out)
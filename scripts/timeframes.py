@@ -0,0 +1,233 @@
+"""Higher-timeframe bars and indicators aligned to a base timeframe, without lookahead.
+
+`resample_ohlcv` groups the bars of an OHLCV frame (as written by `screener` or read from
+`datastore.MarketDataStore`) into higher-timeframe (HTF) bars with NumPy reductions over
+the bar timestamps, and records for every base bar which HTF bar was the last one
+*completed* at its close. A HTF bar completes on the base bar that closes at the end of
+its period, so a base bar sees the HTF values the way Pine's
+`request.security(..., lookahead=barmerge.lookahead_off)` shows them on historical
+bars: the bar in progress is never visible before it ends. A period whose last base bars
+are missing (a gap in the data) completes on the next bar after it.
+
+`TimeframeCache` keeps the resampled bars per (ticker, interval) and the HTF indicator
+columns in a `signals.IndicatorCache`, so a sweep resamples each timeframe once:
+
+    tf = TimeframeCache()
+    daily = tf.signal_codes('AAPL', minute_bars, '1d', useBB=False, rsiLongLevel=40)
+    run_simulation_from_prices(minute_bars['Close'], signal_filter=daily)
+"""
+import hashlib
+import re
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts import kernels
+from scripts.signals import IndicatorCache, generate_signal_codes, precompute_indicators, rsi, series_digest
+
+_NS = {'m': 60 * 10**9, 'h': 3600 * 10**9, 'd': 86400 * 10**9}
+_DAY = _NS['d']
+
+
+def parse_interval(interval: str) -> Tuple[int, str]:
+    """`'15m'` -> `(15, 'm')`; units are m, h, d, wk and mo (yfinance interval names)."""
+    match = re.fullmatch(r'(\d+)(m|h|d|wk|mo)', interval)
+    if match is None or int(match.group(1)) <= 0:
+        raise ValueError(f'unknown interval: {interval!r}')
+    return int(match.group(1)), match.group(2)
+
+
+def _local_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    # wall-clock time, so days and weeks start at local midnight
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit('ns').asi8
+
+
+def _buckets(ns: np.ndarray, interval: str, offset: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Period number of every timestamp and the start of each period (local ns)."""
+    count, unit = parse_interval(interval)
+    shifted = ns - offset
+    if unit in _NS:
+        width = count * _NS[unit]
+        bucket = shifted // width
+        return bucket, bucket * width + offset
+    days = shifted // _DAY
+    if unit == 'wk':
+        # 1970-01-01 was a Thursday; weeks start on Monday
+        bucket = (days + 3) // (7 * count)
+        return bucket, (bucket * 7 * count - 3) * _DAY + offset
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    bucket = months // count
+    starts = (bucket * count).astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+    return bucket, starts * _DAY + offset
+
+
+def _period_end(start: np.ndarray, interval: str, offset: int) -> np.ndarray:
+    """End (local ns, exclusive) of the periods starting at `start`."""
+    count, unit = parse_interval(interval)
+    if unit in _NS:
+        return start + count * _NS[unit]
+    if unit == 'wk':
+        return start + 7 * count * _DAY
+    months = ((start - offset) // _DAY).astype('datetime64[D]').astype('datetime64[M]') + count
+    return months.astype('datetime64[D]').astype(np.int64) * _DAY + offset
+
+
+def _base_digest(base: pd.DataFrame) -> str:
+    """Content hash of what `resample_ohlcv` reads from a base frame."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'{base.index.tz}'.encode())
+    h.update(np.ascontiguousarray(base.index.as_unit('ns').asi8).tobytes())
+    for col in ('Open', 'High', 'Low', 'Close', 'Volume'):
+        if col in base.columns:
+            h.update(f'{col}:{series_digest(base[col].to_numpy(dtype=np.float64))}'.encode())
+    return h.hexdigest()
+
+
+@dataclass
+class Resampled:
+    """HTF bars of a base frame and, per base bar, the row of the last completed one."""
+    bars: pd.DataFrame  # Open/High/Low/Close/Volume, indexed by period start
+    visible: np.ndarray  # int64 per base bar, -1 before the first HTF bar completes
+
+    def align(self, values: np.ndarray, fill=np.nan) -> np.ndarray:
+        """Values of the HTF bars (one per row of `bars`) as seen from each base bar."""
+        values = np.asarray(values)
+        return np.where(self.visible >= 0, values[np.maximum(self.visible, 0)], fill)
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str, offset: str = '0min', base_interval: Optional[str] = None) -> Resampled:
+    """Group the sorted bars of `df` (DatetimeIndex) into `interval` bars.
+
+    Periods start at local midnight plus `offset` (e.g. '30min' for hourly bars that open
+    at 9:30, as TradingView aligns them to the session); weeks start on Monday.
+    A base bar completes its period when it closes at or after the period end, so a
+    period whose last bars are missing becomes visible only from the next bar on.
+    `base_interval` is the bar length of `df`; by default it is the smallest gap
+    between bars.
+    """
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise TypeError('df must have a DatetimeIndex')
+    ns = _local_ns(df.index)
+    n = len(ns)
+    if n and (np.diff(ns) <= 0).any():
+        raise ValueError('bars must be sorted by time without duplicates')
+    shift = pd.Timedelta(offset).value
+    bucket, period_start = _buckets(ns, interval, shift)
+
+    first = np.ones(n, dtype=bool)
+    first[1:] = bucket[1:] != bucket[:-1]
+    starts = np.flatnonzero(first)
+    last = np.append(starts[1:] - 1, n - 1) if n else starts
+    data: Dict[str, np.ndarray] = {}
+    if n:
+        columns = {c: df[c].to_numpy(dtype=np.float64) for c in ('Open', 'High', 'Low', 'Close', 'Volume') if c in df.columns}
+        if 'Open' in columns:
+            data['Open'] = columns['Open'][starts]
+        if 'High' in columns:
+            data['High'] = np.maximum.reduceat(columns['High'], starts)
+        if 'Low' in columns:
+            data['Low'] = np.minimum.reduceat(columns['Low'], starts)
+        data['Close'] = columns['Close'][last]
+        if 'Volume' in columns:
+            data['Volume'] = np.add.reduceat(columns['Volume'], starts)
+    index = pd.DatetimeIndex(period_start[starts].astype('datetime64[ns]')).as_unit(df.index.unit)
+    if df.index.tz is not None:
+        index = index.tz_localize(df.index.tz, ambiguous='NaT', nonexistent='shift_forward')
+    bars = pd.DataFrame(data, index=index)
+
+    # row of the period each base bar belongs to; it is visible once a bar closes at its end
+    row = np.cumsum(first) - 1
+    step = pd.Timedelta(base_interval).value if base_interval else (int(np.diff(ns).min()) if n > 1 else 0)
+    complete = ns + step >= _period_end(period_start, interval, shift)
+    visible = np.where(complete, row, row - 1)
+    return Resampled(bars=bars, visible=visible)
+
+
+class TimeframeCache:
+    """Resampled bars per (ticker, interval, offset) and their indicator columns.
+
+    An entry is keyed by a digest of the base index and OHLCV columns, so it is rebuilt
+    when any bar changes (revised history included); the HTF indicator columns go
+    through `indicator_cache`, keyed by the content of the HTF closes.
+
+    The digest is computed once per base frame object and reused for every interval and
+    later call with the same frame, as long as its length and first/last timestamps are
+    unchanged. A frame edited in place keeping those is not noticed: pass a new frame
+    (e.g. `df.copy()`) after revising bars.
+    """
+
+    def __init__(self, indicator_cache: Optional[IndicatorCache] = None):
+        self.indicator_cache = indicator_cache if indicator_cache is not None else IndicatorCache()
+        self._entries: Dict[Hashable, Tuple[str, Resampled]] = {}
+        # id(frame) -> (weak reference to it, (length, first, last), digest)
+        self._digests: Dict[int, Tuple[weakref.ref, Tuple, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _digest(self, base: pd.DataFrame) -> str:
+        shape = (len(base), base.index[0], base.index[-1]) if len(base) else (0,)
+        known = self._digests.get(id(base))
+        if known is not None and known[0]() is base and known[1] == shape:
+            return known[2]
+        digest = _base_digest(base)
+        key = id(base)
+        # forget the frame once it is garbage collected, before its id can be reused
+        ref = weakref.ref(base, lambda _, key=key, digests=self._digests: digests.pop(key, None))
+        self._digests[key] = (ref, shape, digest)
+        return digest
+
+    def get(self, ticker: str, base: pd.DataFrame, interval: str, offset: str = '0min') -> Resampled:
+        stamp = self._digest(base)
+        key = (ticker, interval, offset)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        resampled = resample_ohlcv(base, interval, offset)
+        self._entries[key] = (stamp, resampled)
+        return resampled
+
+    def signal_codes(self, ticker: str, base: pd.DataFrame, interval: str, offset: str = '0min', **signal_params) -> np.ndarray:
+        """`signals.generate_signal_codes` of the HTF closes, as seen from each base bar (int8)."""
+        htf = self.get(ticker, base, interval, offset)
+        codes = generate_signal_codes(htf.bars['Close'].to_numpy(), cache=self.indicator_cache, **signal_params)
+        return htf.align(codes, fill=0).astype(np.int8)
+
+    def indicators(
+        self,
+        ticker: str,
+        base: pd.DataFrame,
+        interval: str,
+        offset: str = '0min',
+        rsiLength: int = 14,
+        bbLength: int = 20,
+        bbStdDev: float = 2.0,
+    ) -> pd.DataFrame:
+        """HTF close, RSI and Bollinger basis/upper/lower as seen from each base bar."""
+        htf = self.get(ticker, base, interval, offset)
+        close = np.ascontiguousarray(htf.bars['Close'].to_numpy(), dtype=np.float64)
+        cache = self.indicator_cache
+        precompute_indicators(close, cache, [rsiLength], [(bbLength, bbStdDev)])
+        digest = series_digest(close)
+        r = cache.get(('rsi', digest, rsiLength))
+        bands = cache.get(('bb', digest, bbLength, bbStdDev))
+        if r is None or bands is None:
+            # gaps in the closes: the pandas RSI skips them
+            r = rsi(pd.Series(close), rsiLength).to_numpy()
+            bands = kernels.bollinger_multi(close, [bbLength], bbStdDev)[0]
+        return pd.DataFrame({
+            'close': htf.align(close),
+            'rsi': htf.align(r),
+            'basis': htf.align(bands[:, 0]),
+            'upper': htf.align(bands[:, 1]),
+            'lower': htf.align(bands[:, 2]),
+        }, index=base.index)
@@ -1,17 +1,24 @@
-from typing import List, Optional
-from dataclasses import dataclass, field
+from typing import Optional, Tuple, Union
+from dataclasses import dataclass
+
+import numpy as np
 
 from scripts import pine_calc
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
+    """One side's position. Fills are kept as running sums, so the average price is O(1).
+
+    `notional` is the sum of price * volume over the entry and averaging fills and
+    `total_volume` the sum of their volumes; they are accumulated in fill order, which
+    gives the same value as `pine_calc.calculate_average_price` over the fill lists.
+    """
     is_long: bool
     active: bool = False
-    avg_prices: List[float] = field(default_factory=list)
-    avg_volumes: List[float] = field(default_factory=list)
     avg_count: int = 0
     total_volume: float = 0.0
+    notional: float = 0.0
     entry_price: Optional[float] = None
     stop_loss_price: Optional[float] = None
     take_profit_price: Optional[float] = None
@@ -21,8 +28,7 @@ class Position:
             raise ValueError("entry_price and pos_vol must be > 0")
         self.active = True
         self.entry_price = entry_price
-        self.avg_prices = [entry_price]
-        self.avg_volumes = [pos_vol]
+        self.notional = entry_price * pos_vol
         self.avg_count = 0
         self.total_volume = pos_vol
         # initialize stops/tp based on entry; update_targets is used after averaging
@@ -48,8 +54,9 @@ class Position:
             self.take_profit_price = (ap * (1 + tpPercent / 100)) if self.is_long else (ap * (1 - tpPercent / 100))
         else:
             self.take_profit_price = None
+
     def avg_price(self) -> Optional[float]:
-        return pine_calc.calculate_average_price(self.avg_prices, self.avg_volumes)
+        return self.notional / self.total_volume if self.total_volume > 0 else None
 
     def next_avg_price(self, avgDistancePercent: float) -> Optional[float]:
         ap = self.avg_price()
@@ -76,8 +83,7 @@ class Position:
             raise ValueError("martingaleMultiplier must be > 0")
         newVol = self.total_volume * martingaleMultiplier
         self.avg_count += 1
-        self.avg_prices.append(close)
-        self.avg_volumes.append(newVol)
+        self.notional += close * newVol
         self.total_volume += newVol
         # after averaging, we might want to update stops/tp externally based on new avg
         return newVol
@@ -93,3 +99,94 @@ class Position:
         self.active = False
         self.avg_count = 0
         return profit, commission
+
+
+Index = Union[int, np.ndarray]
+
+
+def _at(value, idx: Index):
+    """`value[idx]` for per-slot arrays; scalars apply to every slot as they are."""
+    return value[idx] if isinstance(value, np.ndarray) and value.ndim else value
+
+
+class PositionBatch:
+    """Struct-of-arrays form of `Position` for many independent positions.
+
+    Every field is a length-`n` array (`nan` where `Position` would hold None). Methods
+    take an index (int, index array or boolean mask) and apply the `Position` rules to
+    those slots at once, using the same arithmetic. Settings such as `slPercent` or
+    `useTP` may be scalars or length-`n` arrays with a value per slot.
+    """
+
+    def __init__(self, n: int, is_long: Union[bool, np.ndarray] = True):
+        self.is_long = np.broadcast_to(np.asarray(is_long, dtype=bool), (n,)).copy()
+        self.active = np.zeros(n, dtype=bool)
+        self.avg_count = np.zeros(n, dtype=np.int64)
+        self.total_volume = np.zeros(n)
+        self.notional = np.zeros(n)
+        self.entry_price = np.full(n, np.nan)
+        self.stop_loss_price = np.full(n, np.nan)
+        self.take_profit_price = np.full(n, np.nan)
+
+    def __len__(self) -> int:
+        return len(self.active)
+
+    def open(self, idx: Index, entry_price, pos_vol, useSL, useTP, slPercent, tpPercent) -> None:
+        entry_price = np.asarray(entry_price, dtype=np.float64)
+        pos_vol = np.asarray(pos_vol, dtype=np.float64)
+        if (entry_price <= 0).any() or (pos_vol <= 0).any():
+            raise ValueError("entry_price and pos_vol must be > 0")
+        self.active[idx] = True
+        self.entry_price[idx] = entry_price
+        self.notional[idx] = entry_price * pos_vol
+        self.avg_count[idx] = 0
+        self.total_volume[idx] = pos_vol
+        self._set_targets(idx, entry_price, useSL, useTP, slPercent, tpPercent)
+
+    def _set_targets(self, idx: Index, ref: np.ndarray, useSL, useTP, slPercent, tpPercent) -> None:
+        is_long = self.is_long[idx]
+        slPercent, tpPercent = _at(slPercent, idx), _at(tpPercent, idx)
+        self.stop_loss_price[idx] = np.where(_at(useSL, idx), np.where(is_long, ref * (1 - slPercent / 100), ref * (1 + slPercent / 100)), np.nan)
+        self.take_profit_price[idx] = np.where(_at(useTP, idx), np.where(is_long, ref * (1 + tpPercent / 100), ref * (1 - tpPercent / 100)), np.nan)
+
+    def update_targets(self, idx: Index, useSL, useTP, slPercent, tpPercent) -> None:
+        self._set_targets(idx, self.avg_price()[idx], useSL, useTP, slPercent, tpPercent)
+
+    def avg_price(self) -> np.ndarray:
+        """Average price of every slot (`nan` where nothing was filled yet)."""
+        out = np.full(len(self), np.nan)
+        np.divide(self.notional, self.total_volume, out=out, where=self.total_volume > 0)
+        return out
+
+    def next_avg_price(self, avgDistancePercent) -> np.ndarray:
+        ap = self.avg_price()
+        return np.where(self.is_long, ap * (1 - avgDistancePercent / 100.0), ap * (1 + avgDistancePercent / 100.0))
+
+    def should_average(self, close, avgDistancePercent) -> np.ndarray:
+        """Per-slot `Position.should_average` for closes broadcast against the batch."""
+        nap = self.next_avg_price(avgDistancePercent)
+        return np.where(self.is_long, close <= nap, close >= nap)
+
+    def add_average(self, idx: Index, close, martingaleMultiplier) -> np.ndarray:
+        if not self.active[idx].all():
+            raise RuntimeError("position not active")
+        martingaleMultiplier = _at(martingaleMultiplier, idx)
+        if np.any(martingaleMultiplier <= 0):
+            raise ValueError("martingaleMultiplier must be > 0")
+        newVol = self.total_volume[idx] * martingaleMultiplier
+        self.avg_count[idx] += 1
+        self.notional[idx] += close * newVol
+        self.total_volume[idx] += newVol
+        return newVol
+
+    def close(self, idx: Index, close_price, commission_rate) -> Tuple[np.ndarray, np.ndarray]:
+        """Close the slots at `idx`; returns `(profit, commission)` arrays like `Position.close`."""
+        if not self.active[idx].all():
+            raise RuntimeError("position not active")
+        ap = self.avg_price()[idx]
+        vol = self.total_volume[idx]
+        gross = np.where(self.is_long[idx], (close_price - ap) * vol, (ap - close_price) * vol)
+        commission = (vol * close_price) * (_at(commission_rate, idx) / 100.0)
+        self.active[idx] = False
+        self.avg_count[idx] = 0
+        return gross - commission, commission
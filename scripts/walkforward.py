@@ -0,0 +1,167 @@
+"""Walk-forward optimization over `simulator.run_simulation_from_prices`.
+
+The series is cut into consecutive out-of-sample (OOS) windows, each preceded by an
+in-sample (IS) window (rolling, or anchored at the first bar). Every parameter set is run
+on every IS window in one parallel sweep; the best set of each window is then traded on
+the OOS window that follows it.
+
+Signals always come from indicators over the whole series, which are causal, so a window
+sees the same, warmed-up values it would have seen live, and the sweep workers compute
+each indicator once (`signals.IndicatorCache`) instead of once per window. The OOS
+windows are traded by a single `Simulator` whose parameters switch at each window
+boundary, so a position opened in one window is carried into the next, and the
+stitched OOS equity curve is the mark-to-market equity of that one account.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from scripts.signals import SIGNAL_PARAMS, IndicatorCache, filter_signal_codes, generate_signal_codes
+from scripts.simulator import FROM_PRICES_DEFAULTS, SIMULATOR_PARAMS, SimulationResult, Simulator
+from scripts.sweep import iter_sweep, objective_params
+
+# (is_start, is_stop, oos_start, oos_stop), stops exclusive
+Window = Tuple[int, int, int, int]
+
+# parameters that can change between OOS windows of the same account
+_SWITCHABLE = tuple(name for name in SIMULATOR_PARAMS if name not in ('initial_balance', 'record_events', 'record_equity'))
+
+
+@dataclass
+class WalkForwardResult:
+    windows: pd.DataFrame  # one row per window: ranges, chosen parameters, IS and OOS figures
+    equity: pd.Series  # mark-to-market equity after each OOS bar
+    result: SimulationResult  # the stitched OOS run
+
+
+def walk_forward_windows(n: int, in_sample: int, out_of_sample: int, anchored: bool = False) -> List[Window]:
+    """Consecutive OOS windows of `out_of_sample` bars (the last may be shorter) covering
+    bars `in_sample..n`, each with the `in_sample` bars before it (or all of them when
+    `anchored`) as its IS window."""
+    if in_sample <= 0 or out_of_sample <= 0:
+        raise ValueError('in_sample and out_of_sample must be > 0')
+    windows = []
+    start = in_sample
+    while start < n:
+        stop = min(start + out_of_sample, n)
+        windows.append((0 if anchored else start - in_sample, start, start, stop))
+        start = stop
+    return windows
+
+
+def _optimize(
+    closes: np.ndarray,
+    windows: Sequence[Window],
+    param_sets: Sequence[Dict[str, Any]],
+    base_params: Dict[str, Any],
+    processes: Optional[int],
+    objective: str,
+    ascending: bool,
+) -> List[Dict[str, Any]]:
+    tasks = [{**params, 'window': (w[0], w[1])} for w in windows for params in param_sets]
+    best: List[Optional[Tuple[Tuple[float, int], Dict[str, Any]]]] = [None] * len(windows)
+    for idx, row in iter_sweep(closes, tasks, base_params=base_params, processes=processes):
+        w, k = divmod(idx, len(param_sets))
+        # ties go to the earlier parameter set, whatever order the runs finish in;
+        # undefined metrics (NaN) rank last
+        value = row[objective]
+        key = (np.inf if value != value else value if ascending else -value, k)
+        if best[w] is None or key < best[w][0]:
+            best[w] = (key, row)
+    return [row for _, row in best]
+
+
+def walk_forward(
+    prices: Union[Sequence[float], pd.Series],
+    param_sets: Sequence[Dict[str, Any]],
+    in_sample: int,
+    out_of_sample: int,
+    anchored: bool = False,
+    base_params: Optional[Dict[str, Any]] = None,
+    processes: Optional[int] = None,
+    objective: str = 'final_balance',
+    ascending: Optional[bool] = None,
+) -> WalkForwardResult:
+    """Optimize `param_sets` on each IS window by `objective` and trade the winners OOS.
+
+    `objective`, `ascending` and `base_params` work as in `sweep.run_sweep`; the OOS
+    account starts from the `initial_balance` of `base_params`. The equity is indexed
+    like `prices` when it is a Series, by bar number otherwise.
+    """
+    base, ascending = objective_params(objective, {'engine': 'fast', **(base_params or {})}, ascending)
+    closes = np.ascontiguousarray(prices, dtype=np.float64)
+    windows = walk_forward_windows(len(closes), in_sample, out_of_sample, anchored)
+    if not windows:
+        raise ValueError(f'series of {len(closes)} bars is too short for in_sample={in_sample}')
+    chosen = _optimize(closes, windows, param_sets, base, processes, objective, ascending)
+    tuned = list(dict.fromkeys(k for params in param_sets for k in params))
+
+    settings = [{**FROM_PRICES_DEFAULTS, **base, **{k: row[k] for k in tuned if k in row}} for row in chosen]
+    first = settings[0]
+    sim = Simulator(**{name: first[name] for name in SIMULATOR_PARAMS if name in first and name != 'record_equity'}, record_equity=True)
+    cache = IndicatorCache()
+    rows = []
+    for (is_start, is_stop, oos_start, oos_stop), params, row in zip(windows, settings, chosen):
+        for name in _SWITCHABLE:
+            if name in params:
+                setattr(sim, name, params[name])
+        signals = generate_signal_codes(closes, cache=cache, **{name: params[name] for name in SIGNAL_PARAMS})
+        if params['signal_filter'] is not None:
+            signals = filter_signal_codes(signals, params['signal_filter'])
+        balance, trades = sim.current_balance, sim.trades
+        sim.bar = oos_start
+        sim.feed(closes[oos_start:oos_stop], signals[oos_start:oos_stop], engine=params['engine'])
+        rows.append({
+            'is_start': is_start, 'is_stop': is_stop, 'oos_start': oos_start, 'oos_stop': oos_stop,
+            **{k: row.get(k) for k in tuned},
+            f'is_{objective}': row[objective],
+            'oos_profit': sim.current_balance - balance,
+            'oos_trades': sim.trades - trades,
+        })
+
+    first_oos = windows[0][2]
+    index = prices.index[first_oos:] if isinstance(prices, pd.Series) else pd.RangeIndex(first_oos, len(closes))
+    return WalkForwardResult(
+        windows=pd.DataFrame(rows),
+        equity=pd.Series(sim.equity.equity, index=index, name='equity'),
+        result=sim.result(),
+    )
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from scripts.sweep import _parse_spec, param_grid, random_search
+
+    p = argparse.ArgumentParser(description='Walk-forward optimization over run_simulation_from_prices')
+    p.add_argument('--prices', required=True, help='Price CSV (pine/data/<TICKER>.csv)')
+    p.add_argument('--column', default='Close')
+    p.add_argument('--in-sample', type=int, required=True, help='Bars per in-sample window')
+    p.add_argument('--out-of-sample', type=int, required=True, help='Bars per out-of-sample window')
+    p.add_argument('--anchored', action='store_true', help='In-sample windows all start at the first bar')
+    p.add_argument('--grid', action='append', default=[], help='name=v1,v2,... (repeatable)')
+    p.add_argument('--random', action='append', default=[], help='name=low:high or name=v1,v2,... (repeatable)')
+    p.add_argument('--samples', type=int, default=100, help='Number of random-search draws')
+    p.add_argument('--seed', type=int, default=None)
+    p.add_argument('--processes', type=int, default=None)
+    p.add_argument('--objective', default='final_balance')
+    p.add_argument('--ascending', action='store_true', default=None)
+    p.add_argument('--out', default=None, help='Write the OOS equity curve to this CSV')
+    args = p.parse_args()
+
+    if bool(args.grid) == bool(args.random):
+        p.error('give either --grid or --random')
+    if args.grid:
+        sets = param_grid(_parse_spec(args.grid, allow_ranges=False))
+    else:
+        sets = random_search(_parse_spec(args.random, allow_ranges=True), args.samples, seed=args.seed)
+
+    closes = pd.read_csv(args.prices, index_col=0)[args.column]
+    wf = walk_forward(closes, sets, args.in_sample, args.out_of_sample, anchored=args.anchored, processes=args.processes, objective=args.objective, ascending=args.ascending)
+    print(wf.windows.to_string())
+    print('OOS final balance', wf.result.final_balance, 'trades', wf.result.trades)
+    if args.out:
+        wf.equity.to_csv(args.out)
+        print('Wrote', args.out)
@@ -2,40 +2,34 @@
 """Simple static checks for Pine scripts.
 Checks for:
 - balanced parentheses/brackets
-- even number of double quotes
+- terminated strings
 - no extremely long single-line statements (as a heuristic)
+Problems are reported as line:col; the file is read once, line by line.
 """
+import os
 import sys
 from pathlib import Path
 
-def check(path: Path):
-    s = path.read_text(encoding='utf-8')
-    # brackets
-    pairs = {')': '(', ']': '[', '}': '{'}
-    stack = []
-    for i, ch in enumerate(s, 1):
-        if ch in '([{':
-            stack.append((ch, i))
-        elif ch in ')]}':
-            if not stack or stack[-1][0] != pairs[ch]:
-                print(f"Unbalanced bracket {ch} at pos {i}")
-                return 1
-            stack.pop()
-    if stack:
-        print('Unmatched opening brackets at positions:', [pos for _, pos in stack])
-        return 1
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-    # quotes
-    if s.count('"') % 2 != 0:
-        print('Odd number of double quotes')
-        return 1
+from scripts.pine_scan import PineScanner
 
-    # long lines heuristic
-    bad = [ (i+1,len(l)) for i,l in enumerate(s.splitlines()) if len(l) > 400 ]
-    if bad:
-        print('Warning: extremely long lines (line,length):')
-        for b in bad[:10]:
-            print(b)
+
+def check(path: Path, max_line_length: int = 400):
+    scanner = PineScanner(max_line_length)
+    with path.open('r', encoding='utf-8') as f:
+        for line in f:
+            scanner.feed(line)
+    diagnostics = scanner.close()
+    warnings = [d for d in diagnostics if d.severity == 'warning']
+    if warnings:
+        print('Warning: extremely long lines:')
+        for d in warnings[:10]:
+            print(f'{path}:{d}')
+    if scanner.errors:
+        for d in scanner.errors:
+            print(f'{path}:{d}')
+        return 1
 
     print('Checks passed for', path)
     return 0
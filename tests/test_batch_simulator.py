@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.batch_simulator import simulate_batch
+from scripts.fast_simulator import encode_signals
+from scripts.signals import generate_signals_from_series
+from scripts.simulator import run_simulation
+from scripts.sweep import param_grid, run_batch_sweep, run_sweep
+
+
+def make_prices(n=2000, seed=5):
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.012, n)))
+
+
+def test_grid_matches_run_simulation():
+    prices = make_prices()
+    signals = generate_signals_from_series(prices.tolist())
+    grid = param_grid({
+        'useSL': [False, True],
+        'useTP': [False, True],
+        'slPercent': [1.0, 3.0],
+        'tpPercent': [0.5, 2.0],
+        'avgDistancePercent': [0.5, 2.0],
+        'leverage': [10.0, 60.0],
+    })
+    per_account = {k: np.array([p[k] for p in grid]) for k in grid[0]}
+    res = simulate_batch(prices, encode_signals(signals), martingaleMultiplier=1.5, maxAvgCount=5, **per_account)
+    assert len(res) == len(grid)
+    for k, params in enumerate(grid):
+        ref = run_simulation(prices.tolist(), signals, martingaleMultiplier=1.5, maxAvgCount=5, record_events=True, **params)
+        assert res.final_balance[k] == ref.final_balance
+        assert res.total_commission[k] == ref.total_commission
+        assert (res.wins[k], res.losses[k], res.trades[k]) == (ref.wins, ref.losses, ref.trades)
+        assert res.liquidations[k] == sum(e['type'] == 'close' and e['reason'] == 'LIQ' for e in ref.events)
+    assert res.liquidations.any()
+
+
+def test_batch_sizes_must_agree():
+    with pytest.raises(ValueError):
+        simulate_batch(make_prices(50), np.zeros(50), slPercent=[1.0, 2.0], tpPercent=[1.0, 2.0, 3.0])
+
+
+def test_batch_sweep_matches_run_sweep():
+    prices = make_prices(1500, seed=8)
+    grid = param_grid({'rsiLength': [10, 14], 'slPercent': [1.0, 2.0], 'tpPercent': [1.0, 3.0], 'avgDistancePercent': [1.0, 4.0]})
+    expected = run_sweep(prices, grid, processes=1)
+    pd.testing.assert_frame_equal(run_batch_sweep(prices, grid), expected)
+    with pytest.raises(ValueError):
+        run_batch_sweep(prices, grid, objective='sharpe')
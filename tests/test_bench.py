@@ -0,0 +1,28 @@
+import numpy as np
+
+from scripts.bench import STARTUP_BUDGETS, check_startup, compare, gbm_prices, random_signals, run_benchmarks
+
+
+def test_generators_are_reproducible():
+    assert np.array_equal(gbm_prices(500, seed=4), gbm_prices(500, seed=4))
+    signals = random_signals(10_000, 0.01, seed=4)
+    assert 50 < signals.count('long') < 150 and 50 < signals.count('short') < 150
+
+
+def test_run_benchmarks_and_compare():
+    doc = run_benchmarks(sizes=['2000'], densities=[0.01], engines=['loop', 'fast'])
+    names = set(doc['results'])
+    assert names == {'signals/2000', 'signal-codes/2000', 'simulate-loop/2000/d=0.01', 'simulate-fast/2000/d=0.01', 'export/2000/d=0.01'}
+    for r in doc['results'].values():
+        assert r['bars_per_s'] > 0 and r['peak_mb'] >= 0
+    assert compare(doc, doc) == []
+
+    slower = {'results': {k: dict(v, bars_per_s=v['bars_per_s'] * 0.5) for k, v in doc['results'].items()}}
+    assert {name for name, _ in compare(slower, doc, threshold=0.2)} == names
+    assert compare(slower, doc, threshold=0.6) == []
+
+
+def test_startup_stays_light():
+    results, problems = check_startup()
+    assert set(results) == set(STARTUP_BUDGETS)
+    assert problems == []
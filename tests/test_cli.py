@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.cli import main, parse_settings
+
+
+def write_prices(path, n=2000):
+    close = 100.0 * np.exp(np.cumsum(np.random.default_rng(3).normal(0.0, 0.01, n)))
+    pd.DataFrame({'Close': close}, index=pd.date_range('2024-01-01', periods=n, freq='h')).to_csv(path)
+
+
+def test_parse_settings_types_values_like_defaults():
+    assert parse_settings(['useSL=false', 'leverage=20', 'maxAvgCount=4', 'margin_type=Isolated']) == {
+        'useSL': False, 'leverage': 20.0, 'maxAvgCount': 4, 'margin_type': 'Isolated',
+    }
+    for bad in ('nope=1', 'leverage', 'window=1', 'maxAvgCount=2.9', 'leverage=x'):
+        with pytest.raises(ValueError):
+            parse_settings([bad])
+    with pytest.raises(ValueError):
+        parse_settings(['engine=loop'], reserved=('engine',))
+
+
+# the module may already be imported by other tests; a CLI process imports it fresh
+@pytest.mark.filterwarnings('ignore:.*found in sys.modules:RuntimeWarning')
+def test_run_and_forwarded_commands(tmp_path, capsys):
+    prices, events, trades = tmp_path / 'X.csv', tmp_path / 'events.csv', tmp_path / 'trades.csv'
+    write_prices(prices)
+    assert main(['run', '--prices', str(prices), '--set', 'useSL=false', '--events', str(events)]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith('final_balance=') and events.exists()
+
+    # export is handled by export_events_to_tv_like's own CLI
+    assert main(['export', '--events', str(events), '--prices', str(prices), '--out', str(trades)]) == 0
+    assert len(pd.read_csv(trades)) == int(out.split('trades=')[1].split()[0])
+    assert main(['export']) == 2
+    assert main(['run', '--prices', str(prices), '--set', 'bogus=1']) == 2
+    # parameters the command sets itself are refused instead of clashing in the call
+    assert main(['run', '--prices', str(prices), '--set', 'engine=loop']) == 2
+    assert main(['run', '--prices', str(prices), '--set', 'record_events=true']) == 2
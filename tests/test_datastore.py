@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.datastore import MarketDataStore, import_csv_dir
+
+
+def minute_bars(start, n, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(start, periods=n, freq='min')
+    return pd.DataFrame({'Close': 100 + rng.random(n), 'Volume': np.arange(n, dtype=np.int64)}, index=idx)
+
+
+def test_roundtrip_and_partitioning(tmp_path):
+    store = MarketDataStore(tmp_path)
+    df = minute_bars('2020-12-31 23:00', 180)
+    store.write('BTC/USD', '1m', df)
+    assert store.tickers() == ['BTC_USD']
+    assert store.partitions('BTC/USD', '1m') == ['2020', '2021']
+    out = store.read('BTC/USD', '1m')
+    pd.testing.assert_frame_equal(out, df, check_freq=False, check_index_type=False)
+    assert out.index.equals(df.index)
+
+
+def test_read_selects_columns_and_range(tmp_path):
+    store = MarketDataStore(tmp_path)
+    df = minute_bars('2021-01-01', 3 * 1440)
+    store.write('X', '1m', df, partition='day')
+    out = store.read('X', '1m', columns=['Close'], start='2021-01-02 10:00', end='2021-01-02 10:09')
+    assert list(out.columns) == ['Close']
+    assert len(out) == 10
+    np.testing.assert_array_equal(out['Close'].to_numpy(), df.loc['2021-01-02 10:00':'2021-01-02 10:09', 'Close'].to_numpy())
+    # a range inside one partition is a memory-mapped view
+    arrays = store.read_arrays('X', '1m', columns=['Close'], start='2021-01-02', end='2021-01-02 12:00')
+    assert isinstance(arrays['Close'].base, np.memmap) or isinstance(arrays['Close'], np.memmap)
+    with pytest.raises(KeyError):
+        store.read('X', '1m', columns=['Open'])
+
+
+def test_write_merges_and_replaces_overlap(tmp_path):
+    store = MarketDataStore(tmp_path)
+    df = minute_bars('2021-06-01', 100)
+    store.write('X', '1m', df.iloc[:60])
+    update = df.iloc[50:].copy()
+    update['Close'] *= 2
+    store.write('X', '1m', update)
+    out = store.read('X', '1m')
+    assert len(out) == 100
+    np.testing.assert_array_equal(out['Close'].to_numpy()[:50], df['Close'].to_numpy()[:50])
+    np.testing.assert_array_equal(out['Close'].to_numpy()[50:], update['Close'].to_numpy())
+
+
+def test_added_column_reads_as_nan_in_untouched_partitions(tmp_path):
+    store = MarketDataStore(tmp_path)
+    df = minute_bars('2020-12-31 23:00', 180)
+    store.write('X', '1m', df)
+    later = df.iloc[120:][['Close']].assign(Open=df['Close'].iloc[120:] - 1.0)
+    store.write('X', '1m', later)
+    assert store.columns('X', '1m') == ['Close', 'Volume', 'Open']
+    out = store.read('X', '1m')
+    assert len(out) == 180
+    # 2020 was not rewritten and has no Open file
+    assert out.loc[:'2020-12-31', 'Open'].isna().all()
+    np.testing.assert_array_equal(out['Open'].to_numpy()[120:], later['Open'].to_numpy())
+    assert out['Open'].iloc[60:120].isna().all()
+    assert len(store.read('X', '1m', columns=['Open'], end='2020-12-31 23:30')) == 31
+
+
+def test_timezone_is_preserved(tmp_path):
+    store = MarketDataStore(tmp_path)
+    idx = pd.date_range('2023-03-10 09:30', periods=4, freq='D', tz='America/New_York')
+    store.write('X', '1d', pd.DataFrame({'Close': [1.0, 2.0, 3.0, 4.0]}, index=idx))
+    out = store.read('X', '1d', start='2023-03-12 09:30')
+    assert str(out.index.tz) == 'America/New_York'
+    assert out['Close'].tolist() == [3.0, 4.0]
+
+
+def test_import_screener_csv(tmp_path):
+    idx = pd.date_range('2023-01-01', periods=3, freq='D')
+    df = pd.DataFrame({'Open': [100, 101, 102], 'Close': [100.5, 101.5, 102.5], 'Volume': [1000, 1100, 1200]}, index=idx)
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    df.to_csv(data_dir / 'AAPL.csv')
+    # the two extra header rows newer yfinance versions write
+    (data_dir / 'MSFT.csv').write_text(
+        'Price,Close,Volume\nTicker,MSFT,MSFT\nDate,,\n2023-01-02,10.5,7\n2023-01-03,11.5,8\n'
+    )
+    store = MarketDataStore(tmp_path / 'store')
+    assert import_csv_dir(data_dir, store) == ['AAPL', 'MSFT']
+    aapl = store.read('AAPL', '1d')
+    assert aapl['Close'].tolist() == [100.5, 101.5, 102.5]
+    assert aapl.index.equals(idx.as_unit('ns'))
+    assert store.read('MSFT', '1d', columns=['Close'])['Close'].tolist() == [10.5, 11.5]
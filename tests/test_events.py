@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.events import EventLog
+from scripts.export_events_to_tv_like import convert_events_to_trades
+
+
+def make_log(capacity=2):
+    log = EventLog(capacity=capacity)
+    log.add_open(0, 'long', 100.0, 1.0)
+    log.add_avg(1, 'long', 95.0, 2.0, 1)
+    log.add_close(2, 'long', 100.0, 9.7, 0.3, 'TP')
+    log.add_open(5, 'short', 101.0, 0.5)
+    return log
+
+
+def test_event_log_grows_and_reads_as_dicts():
+    log = make_log()
+    assert len(log) == 4
+    assert log[1] == {'type': 'avg', 'side': 'long', 'price': 95.0, 'new_volume': 2.0, 'avg_count': 1, 'bar': 1}
+    assert log[-2] == {'type': 'close', 'side': 'long', 'price': 100.0, 'profit': 9.7, 'commission': 0.3, 'reason': 'TP', 'bar': 2}
+    assert [e['type'] for e in log] == ['open', 'avg', 'close', 'open']
+    assert log == list(log)
+    assert EventLog.from_dict(log.to_dict()) == log
+    with pytest.raises(IndexError):
+        log[4]
+
+
+def test_event_log_to_pandas_shares_buffers():
+    log = make_log(capacity=16)
+    df = log.to_pandas()
+    assert list(df['type']) == ['open', 'avg', 'close', 'open']
+    assert df['reason'].isna().tolist() == [True, True, False, True]
+    assert np.shares_memory(df['price'].to_numpy(), log.columns()['price'])
+
+
+def test_event_log_csv_feeds_tv_export(tmp_path):
+    log = make_log()
+    events_csv = tmp_path / 'events.csv'
+    log.to_csv(events_csv)
+    price_csv = tmp_path / 'PRICE.csv'
+    pd.DataFrame({'Close': np.arange(6.0)}, index=pd.date_range('2025-01-01', periods=6)).to_csv(price_csv)
+    out = tmp_path / 'trades.csv'
+    convert_events_to_trades(str(events_csv), str(price_csv), str(out))
+    trades = pd.read_csv(out)
+    assert trades.shape[0] == 1
+    assert trades.iloc[0]['Quantity'] == 1.0 and trades.iloc[0]['Reason'] == 'TP'
+
+
+def test_event_log_to_arrow():
+    pa = pytest.importorskip('pyarrow')
+    table = make_log().to_arrow()
+    assert table.num_rows == 4
+    assert table.column('reason').to_pylist() == [None, None, 'TP', None]
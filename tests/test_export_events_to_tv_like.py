@@ -27,3 +27,29 @@ def test_convert_events_to_trades(tmp_path):
     assert df.iloc[0]['Side'] == 'long'
     assert df.iloc[0]['Entry Price'] == 100.0
     assert df.iloc[0]['Exit Price'] == 110.0
+
+
+def test_convert_events_pairs_per_side_and_maps_bars(tmp_path):
+    price_csv = tmp_path / "PRICE.csv"
+    idx = pd.date_range('2025-01-01', periods=5, freq='D')
+    pd.DataFrame({'Close': [1.0] * 5}, index=idx).to_csv(price_csv)
+
+    events_csv = tmp_path / "events.csv"
+    pd.DataFrame([
+        {'type': 'open', 'side': 'long', 'price': 10.0, 'volume': 1.0, 'bar': 0},
+        {'type': 'open', 'side': 'short', 'price': 20.0, 'volume': 2.0, 'bar': 1},
+        {'type': 'avg', 'side': 'long', 'price': 9.0, 'volume': 2.0, 'bar': 2},
+        {'type': 'close', 'side': 'long', 'price': 11.0, 'bar': 3, 'profit': 1.0, 'commission': 0.1, 'reason': 'TP'},
+        {'type': 'close', 'side': 'short', 'price': 19.0, 'bar': 99, 'profit': 2.0, 'commission': 0.2, 'reason': 'SL'},
+        {'type': 'close', 'side': 'long', 'price': 12.0, 'bar': 4, 'profit': 0.5, 'commission': 0.1, 'reason': 'LIQ'},
+    ]).to_csv(events_csv, index=False)
+
+    out = tmp_path / 'tv_trades.csv'
+    convert_events_to_trades(str(events_csv), str(price_csv), str(out))
+    df = pd.read_csv(out)
+    assert list(df['Side']) == ['long', 'short', 'long']
+    assert list(df['Entry Price'].fillna(-1)) == [10.0, 20.0, -1]
+    assert list(df['Quantity'].fillna(-1)) == [1.0, 2.0, -1]
+    assert df.loc[0, 'Entry Time'] == '2025-01-01' and df.loc[0, 'Exit Time'] == '2025-01-04'
+    # out-of-range exit bar and unmatched entry have no timestamp
+    assert pd.isna(df.loc[1, 'Exit Time']) and pd.isna(df.loc[2, 'Entry Time'])
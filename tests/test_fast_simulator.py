@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from scripts.fast_simulator import encode_signals, run_simulation_fast
+from scripts.simulator import run_simulation
+
+
+def random_case(seed, n=2000):
+    rng = np.random.default_rng(seed)
+    prices = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    draw = rng.random(n)
+    signals = [None] * n
+    for i in np.flatnonzero(draw < 0.02):
+        signals[i] = 'long'
+    for i in np.flatnonzero(draw > 0.98):
+        signals[i] = 'short'
+    return prices.tolist(), signals
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('params', [
+    dict(useSL=False, useTP=True, tpPercent=3.0),
+    dict(useSL=True, useTP=True, slPercent=2.0, tpPercent=1.5, avgDistancePercent=1.0),
+    dict(useSL=False, useTP=False, leverage=50.0, avgDistancePercent=0.5, maxAvgCount=6),
+    dict(useSL=True, useTP=False, slPercent=4.0, useAveraging=False, margin_type='Isolated'),
+    dict(useSL=False, useTP=True, tpPercent=0.5, risk_per_trade=50.0, leverage=2.0, avgDistancePercent=0.2),
+])
+def test_fast_matches_loop(seed, params):
+    prices, signals = random_case(seed)
+    ref = run_simulation(prices, signals, record_events=True, **params)
+    fast = run_simulation_fast(np.array(prices), signals, record_events=True, **params)
+    assert fast == ref
+
+
+def test_fast_accepts_signal_codes():
+    prices, signals = random_case(7)
+    codes = encode_signals(signals)
+    assert set(np.unique(codes)) <= {-1, 0, 1}
+    assert run_simulation_fast(prices, codes, useTP=True) == run_simulation(prices, signals, useTP=True)
+
+
+@pytest.mark.parametrize('dtype', [np.int8, np.int64, np.float32, np.float64])
+def test_engines_take_the_same_code_dtypes(dtype):
+    prices, signals = random_case(8)
+    codes = encode_signals(signals).astype(dtype)
+    ref = run_simulation(prices, signals, useTP=True, record_events=True)
+    assert ref.trades > 0
+    assert run_simulation(prices, codes, useTP=True, record_events=True) == ref
+    assert run_simulation_fast(prices, codes, useTP=True, record_events=True) == ref
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from scripts.kernels import bollinger_multi, rsi_bb, rsi_multi
+from scripts.signals import IndicatorCache, bollinger_bands, generate_signal_codes, precompute_indicators, rsi, series_digest
+
+
+def make_prices(n, seed=0, flat=False):
+    rng = np.random.default_rng(seed)
+    s = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    if flat:
+        s[100:140] = s[100]
+    return s
+
+
+@pytest.mark.parametrize('n', [0, 1, 2, 3, 20, 21, 2000])
+def test_kernels_match_pandas(n):
+    close = make_prices(n)
+    lengths = [1, 2, 3, 14, 20, 50]
+    devs = [1.0, 2.0, 2.0, 2.5, 2.0, 3.0]
+    rsis = rsi_multi(close, lengths)
+    bands = bollinger_multi(close, lengths, devs)
+    for k, (length, dev) in enumerate(zip(lengths, devs)):
+        expected_rsi = rsi(pd.Series(close), length).to_numpy()
+        expected_bb = bollinger_bands(pd.Series(close), length, dev).to_numpy()
+        # same NaN warm-up, values within rounding
+        np.testing.assert_allclose(rsis[k], expected_rsi, rtol=0, atol=1e-9)
+        np.testing.assert_allclose(bands[k], expected_bb, rtol=1e-9)
+    r, b = rsi_bb(close, 14, 20, 2.0)
+    np.testing.assert_array_equal(r, rsis[3])
+    np.testing.assert_array_equal(b, bands[4])
+
+
+def test_rsi_bb_fills_preallocated_outputs():
+    close = make_prices(100_000, seed=4, flat=True)
+    out_rsi, out_bands = np.empty(len(close)), np.empty((len(close), 3))
+    r, b = rsi_bb(close, 10, 400, 2.0, out_rsi=out_rsi, out_bands=out_bands)
+    assert r is out_rsi and b is out_bands
+    np.testing.assert_array_equal(r, rsi_multi(close, [10])[0])
+    np.testing.assert_array_equal(b, bollinger_multi(close, [400], 2.0)[0])
+
+
+def test_kernels_run_each_path_of_a_matrix_on_its_own():
+    paths = np.stack([make_prices(3000, seed=k, flat=k == 1) for k in range(4)])
+    paths[2, 500] = np.nan
+    bands = bollinger_multi(paths, [1, 20, 150], 2.0)
+    rsis = rsi_multi(paths[[0, 1, 3]], [1, 14])
+    r, b = rsi_bb(paths[[0, 1, 3]], 14, 20, 2.0)
+    assert bands.shape == (3, 4, 3000, 3) and rsis.shape == (2, 3, 3000)
+    for k, path in enumerate(paths):
+        np.testing.assert_array_equal(bands[:, k], bollinger_multi(path, [1, 20, 150], 2.0))
+    for k, path in enumerate(paths[[0, 1, 3]]):
+        np.testing.assert_array_equal(rsis[:, k], rsi_multi(path, [1, 14]))
+        np.testing.assert_array_equal(r[k], rsis[1, k])
+        np.testing.assert_array_equal(b[k], bands[1, [0, 1, 3][k]])
+
+
+@pytest.mark.parametrize('length', [5, 20, 100])
+def test_band_touches_match_pandas_on_tick_prices(length):
+    # tick prices repeat, so closes land on or next to the bands
+    close = np.round(make_prices(20_000, seed=5, flat=True), 1)
+    bands = bollinger_multi(close, [length], 1.0)[0]
+    expected = bollinger_bands(pd.Series(close), length, 1.0).to_numpy()
+    # windows of equal closes have no width here, rounding noise in pandas
+    equal = np.zeros(len(close), dtype=bool)
+    equal[length - 1:] = (sliding_window_view(close, length) == close[length - 1:, None]).all(axis=1)
+    np.testing.assert_array_equal(bands[equal], np.repeat(close[equal, None], 3, axis=1))
+    np.testing.assert_allclose(bands[~equal], expected[~equal], rtol=1e-9, atol=1e-9)
+    clear = ~equal & (np.abs(close[:, None] - expected[:, 1:]) > 1e-9).all(axis=1)
+    assert (close <= bands[:, 2])[clear].tolist() == (close <= expected[:, 2])[clear].tolist()
+    assert (close >= bands[:, 1])[clear].tolist() == (close >= expected[:, 1])[clear].tolist()
+    assert np.count_nonzero(close <= bands[:, 2]) > 0
+
+
+def test_bollinger_kernel_is_exact_on_long_series():
+    close = make_prices(300_000, seed=1, flat=True)
+    bands = bollinger_multi(close, [20], 1.0)[0]
+    windows = sliding_window_view(close, 20)
+    np.testing.assert_allclose(bands[19:, 0], windows.mean(axis=1), rtol=1e-13)
+    np.testing.assert_allclose(bands[19:, 1] - bands[19:, 0], windows.std(axis=1), rtol=0, atol=1e-9 * close.max())
+    # a window of equal closes has no width (pandas leaves rounding noise there)
+    assert bands[139, 1] == bands[139, 0] == bands[139, 2] == close[139]
+
+
+def test_precompute_fills_the_signal_cache():
+    close = make_prices(3000, seed=2)
+    cache = IndicatorCache()
+    precompute_indicators(close, cache, rsi_lengths=[10, 14], bb_params=[(20, 2.0), (30, 1.5)])
+    digest = series_digest(close)
+    np.testing.assert_array_equal(cache.get(('rsi', digest, 10)), rsi_multi(close, [10])[0])
+    misses = cache.misses
+    codes = generate_signal_codes(close, rsiLength=10, bbLength=30, bbStdDev=1.5, cache=cache)
+    assert cache.misses == misses + 1  # only the signal vector itself
+    np.testing.assert_array_equal(codes, generate_signal_codes(close, rsiLength=10, bbLength=30, bbStdDev=1.5))
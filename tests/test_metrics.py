@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+import pytest
+
+from scripts.fast_simulator import run_simulation_fast
+from scripts.metrics import METRICS, compute_metrics
+from scripts.simulator import Simulator, run_simulation, run_simulation_ohlc
+from scripts.sweep import param_grid, run_sweep
+from tests.test_fast_simulator import random_case
+
+
+def test_equity_marks_open_position_to_market():
+    res = run_simulation([100.0, 95.0, 90.0], ['long', None, None], useTP=True, tpPercent=50.0, maxAvgCount=1, record_equity=True)
+    equity = res.equity.equity
+    assert len(equity) == 3
+    assert equity[0] == 1000.0
+    # 0.1 opened at 100, 0.2 added at 95: average 96.666..., volume 0.3
+    assert equity[1] == pytest.approx(1000.0 + (95.0 - 100.0) * 0.1)
+    assert equity[2] == pytest.approx(1000.0 + (90.0 - 95.0 - 5.0 / 3.0) * 0.3)
+    assert res.equity.margin[2] == pytest.approx(0.3 * 100.0 / 10.0)
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('params', [
+    dict(useSL=False, useTP=True, tpPercent=3.0),
+    dict(useSL=True, useTP=True, slPercent=2.0, tpPercent=1.5, avgDistancePercent=1.0),
+])
+def test_fast_engine_records_the_same_curve(seed, params):
+    prices, signals = random_case(seed)
+    ref = run_simulation(prices, signals, record_equity=True, **params)
+    fast = run_simulation_fast(np.array(prices), signals, record_equity=True, **params)
+    assert len(ref.equity) == len(prices)
+    assert fast.equity == ref.equity
+    assert ref.equity.equity[-1] == ref.final_balance or ref.equity.margin[-1] > 0
+    closes = np.array(prices)
+    assert run_simulation_ohlc(closes, closes, closes, closes, signals, record_equity=True, engine='fast', **params).equity == run_simulation_ohlc(prices, prices, prices, prices, signals, record_equity=True, **params).equity
+
+
+def test_snapshot_keeps_curve():
+    prices, signals = random_case(1, n=600)
+    full = run_simulation(prices, signals, useTP=True, record_equity=True)
+    sim = Simulator(useTP=True, record_equity=True)
+    sim.feed(prices[:300], signals[:300])
+    resumed = Simulator.restore(json.loads(json.dumps(sim.snapshot())))
+    resumed.feed(prices[300:], signals[300:], engine='fast')
+    assert resumed.result() == full
+
+
+def test_compute_metrics():
+    m = compute_metrics(np.array([100.0, 120.0, 90.0, 130.0]), margin=np.array([0.0, 12.0, 9.0, 0.0]))
+    assert set(m) == set(METRICS)
+    assert m['max_drawdown'] == pytest.approx(0.25)
+    assert m['total_return'] == pytest.approx(0.3)
+    assert m['time_in_market'] == 0.5
+    assert m['max_margin_usage'] == pytest.approx(0.1)
+    returns = np.array([0.2, -0.25, 40.0 / 90.0])
+    assert m['sharpe'] == pytest.approx(returns.mean() / returns.std() * np.sqrt(252))
+    assert m['sortino'] == pytest.approx(returns.mean() / np.sqrt((0.25 ** 2) / 3) * np.sqrt(252))
+    flat = compute_metrics(np.full(5, 1000.0))
+    assert flat['max_drawdown'] == 0.0 and np.isnan(flat['sharpe'])
+
+
+def test_metrics_as_sweep_objective():
+    prices, _ = random_case(4, n=3000)
+    sets = param_grid({'tpPercent': [0.5, 1.0, 3.0], 'avgDistancePercent': [1.0, 5.0]})
+    by_dd = run_sweep(prices, sets, processes=1, objective='max_drawdown')
+    assert by_dd['max_drawdown'].is_monotonic_increasing
+    by_sharpe = run_sweep(prices, sets, processes=1, objective='sharpe')
+    assert by_sharpe['sharpe'].dropna().is_monotonic_decreasing
+    assert {'time_in_market', 'avg_margin_usage'} <= set(by_sharpe.columns)
+    # plain objectives do not record the curve
+    assert 'sharpe' not in run_sweep(prices, sets[:2], processes=1).columns
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from scripts import montecarlo
+from scripts.montecarlo import _signal_matrix, block_bootstrap_prices, resample_trades, run_monte_carlo, simulate_paths
+from scripts.signals import generate_signal_codes, generate_signals_from_series
+from scripts.simulator import run_simulation
+
+
+def make_prices(n=1500, seed=1):
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+
+
+def test_block_bootstrap_reuses_returns():
+    prices = make_prices()
+    paths = block_bootstrap_prices(prices, 20, block=30, seed=0)
+    assert paths.shape == (20, len(prices))
+    assert np.all(paths[:, 0] == prices[0])
+    original = np.diff(np.log(prices))
+    drawn = np.diff(np.log(paths), axis=1)
+    assert (np.abs(drawn[..., None] - original).min(axis=-1) < 1e-9).all()
+
+
+@pytest.mark.parametrize('rows_elements', [1 << 20, 4000])
+def test_signal_matrix_matches_generate_signal_codes(monkeypatch, rows_elements):
+    # 4000 elements: two paths per group, the last group shorter
+    monkeypatch.setattr(montecarlo, '_SIGNAL_ROWS', rows_elements)
+    paths = block_bootstrap_prices(make_prices(), 7, seed=5)
+    # tick-rounded paths have flat windows and closes exactly on a band
+    paths = np.round(paths / 0.5) * 0.5
+    for params in ({}, dict(useRSI=False, bbLength=5, bbStdDev=1.0), dict(useBB=False, rsiLength=3), dict(useRSI=False, useBB=False)):
+        codes = _signal_matrix(paths, **params)
+        assert codes.dtype == np.int8 and codes.shape == paths.shape
+        for k in range(len(paths)):
+            np.testing.assert_array_equal(codes[k], generate_signal_codes(paths[k], **params))
+    paths[3, 100] = np.nan
+    with pytest.raises(ValueError):
+        _signal_matrix(paths)
+
+
+@pytest.mark.parametrize('params', [
+    dict(useSL=False, useTP=True, tpPercent=3.0),
+    dict(useSL=True, useTP=True, slPercent=2.0, tpPercent=1.5, avgDistancePercent=1.0),
+    dict(useSL=False, useTP=False, leverage=50.0, avgDistancePercent=0.5, maxAvgCount=6),
+])
+def test_paths_match_run_simulation(params):
+    paths = block_bootstrap_prices(make_prices(), 12, seed=3)
+    codes = _signal_matrix(paths)
+    mc = simulate_paths(paths, codes, **params)
+    for k in range(len(paths)):
+        signals = generate_signals_from_series(paths[k].tolist())
+        ref = run_simulation(paths[k].tolist(), signals, record_events=True, **params)
+        assert mc.final_balance[k] == ref.final_balance
+        assert mc.trades[k] == ref.trades
+        assert mc.liquidated[k] == any(e['type'] == 'close' and e['reason'] == 'LIQ' for e in ref.events)
+
+
+def test_resample_trades():
+    prices = make_prices(3000, seed=4)
+    res = run_simulation(prices.tolist(), generate_signals_from_series(prices.tolist()), useTP=True, tpPercent=1.0, leverage=50.0, record_events=True)
+    shuffled = resample_trades(res, 500, seed=0)
+    # compounding is order independent; the drawdown is not
+    assert shuffled.final_balance == pytest.approx(res.final_balance)
+    assert shuffled.max_drawdown.min() >= 0
+    assert shuffled.max_drawdown.max() > shuffled.max_drawdown.min()
+    boot = resample_trades(res, 500, replace=True, seed=0)
+    assert boot.final_balance.std() > 0
+    with pytest.raises(ValueError):
+        resample_trades(run_simulation([1.0], [None]))
+
+
+def test_run_monte_carlo_is_reproducible():
+    prices = make_prices()
+    a = run_monte_carlo(prices, n_paths=300, seed=7, batch_size=128, useTP=True)
+    b = run_monte_carlo(prices, n_paths=300, seed=7, batch_size=128, useTP=True)
+    assert np.array_equal(a.final_balance, b.final_balance)
+    assert len(a.final_balance) == 300
+    summary = a.summary()
+    assert list(summary.index) == ['final_balance', 'max_drawdown', 'trades']
+    assert 0.0 <= a.liquidation_probability <= 1.0
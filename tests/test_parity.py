@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from scripts.parity import align_trades, load_tv_trades, run_parity, simulate_trades
+
+PARAMS = dict(useSL=False, tpPercent=1.0, avgDistancePercent=1.0, leverage=50.0)
+
+
+def write_prices(path, seed, n=1500):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    df = pd.DataFrame({'Close': close}, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+    df.to_csv(path)
+    return df
+
+
+def tv_export(positions, path, split_first=False):
+    """Write positions in TradingView's two-rows-per-trade layout."""
+    rows = []
+    for number, p in enumerate(positions.itertuples(), 1):
+        side = p.side.capitalize()
+        entries = [(p.entry_time, p.entry_price, p.profit)]
+        if split_first and number == 1:
+            # an averaging entry: its own trade number with the same exit
+            entries = [(p.entry_time, p.entry_price, p.profit - 1.0), (p.entry_time + pd.Timedelta('1h'), p.entry_price * 0.99, 1.0)]
+        for time, price, profit in entries:
+            trade = len(rows) // 2 + 1
+            rows.append({'Trade #': trade, 'Type': f'Exit {side}', 'Date/Time': p.exit_time.strftime('%Y-%m-%d %H:%M'), 'Price USD': p.exit_price, 'Profit USD': profit, 'Profit %': 0.0})
+            rows.append({'Trade #': trade, 'Type': f'Entry {side}', 'Date/Time': time.strftime('%Y-%m-%d %H:%M'), 'Price USD': price, 'Profit USD': profit, 'Profit %': 0.0})
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def test_tv_export_is_read_as_positions(tmp_path):
+    prices = write_prices(tmp_path / 'X.csv', seed=1)
+    py = simulate_trades(prices, **PARAMS)
+    assert len(py) > 3
+    tv_export(py, tmp_path / 'tv.csv', split_first=True)
+    tv = load_tv_trades(tmp_path / 'tv.csv')
+    assert len(tv) == len(py)
+    aligned = align_trades(py, tv)
+    assert (aligned['status'] == 'ok').all()
+    assert aligned['profit_delta'].abs().max() < 0.01
+
+
+def test_run_parity_reports_mismatches(tmp_path):
+    trades_dir, prices_dir = tmp_path / 'tv', tmp_path / 'prices'
+    trades_dir.mkdir()
+    prices_dir.mkdir()
+    expected = {}
+    for seed, symbol in enumerate(['AAA', 'BBB', 'CCC']):
+        prices = write_prices(prices_dir / f'{symbol}.csv', seed)
+        expected[symbol] = simulate_trades(prices, **PARAMS)
+    tv_export(expected['AAA'], trades_dir / 'AAA.csv')
+    drifted = expected['BBB'].copy()
+    drifted.loc[1, 'exit_price'] *= 1.01
+    tv_export(drifted.drop(index=2), trades_dir / 'BBB.csv')
+    tv_export(expected['CCC'], trades_dir / 'CCC.csv')
+    pd.DataFrame({'a': [1]}).to_csv(trades_dir / 'BAD.csv', index=False)
+    (prices_dir / 'BAD.csv').write_text((prices_dir / 'AAA.csv').read_text())
+    tv_export(expected['AAA'], trades_dir / 'NOPRICES.csv')
+
+    report = run_parity(str(trades_dir), str(prices_dir), PARAMS, processes=2)
+    assert not report.ok
+    assert set(report.errors) == {'BAD', 'NOPRICES'}
+    assert list(report.summary.index) == ['AAA', 'BBB', 'CCC']
+    assert report.summary.loc['AAA', 'ok'] == len(expected['AAA'])
+    assert report.summary.loc[['AAA', 'CCC'], ['mismatch', 'missing_py', 'missing_tv']].to_numpy().sum() == 0
+    bad = report.mismatches()
+    assert set(bad['symbol']) == {'BBB'}
+    assert sorted(bad['status']) == ['mismatch', 'missing_tv']
+    assert bad.loc[bad['status'] == 'mismatch', 'exit_price_delta'].iloc[0] < 0
+    pd.testing.assert_frame_equal(run_parity(str(trades_dir), str(prices_dir), PARAMS, processes=1).trades, report.trades)
@@ -0,0 +1,65 @@
+import time
+from pathlib import Path
+
+from scripts.fix_pine_format import fix_file
+from scripts.pine_scan import PineScanner, join_statements
+from tests.check_pine import check
+
+
+def scan(text, **kwargs):
+    scanner = PineScanner(**kwargs)
+    for line in text.splitlines():
+        scanner.feed(line)
+    return scanner.close()
+
+
+def test_strings_and_comments_do_not_count():
+    src = 'a = f("(", \'[\')  // don\'t ( count\nb = "say \\"hi\\" )"\nc = x / 2'
+    assert scan(src) == []
+
+
+def test_diagnostics_have_line_and_column():
+    diags = scan('a = f(1, [2))\nb = 3)\nd = (1\nc = "open')
+    assert [(d.line, d.col) for d in diags] == [(1, 12), (2, 6), (4, 5), (3, 5)]
+    assert "')' does not close '[' opened at 1:10" in diags[0].message
+    assert [d.message for d in diags[1:]] == ["unmatched ')'", 'unterminated string "', "unclosed '('"]
+    long = scan('x = 1\n' + 'y = ' + '1 + ' * 30, max_line_length=80)
+    assert [(d.line, d.severity) for d in long] == [(2, 'warning')]
+
+
+def test_join_statements_merges_broken_lines():
+    lines = ['a = f(1,', '      2)  b = g(3)', 'c = "x', 'y"', '', 'd = 4']
+    assert list(join_statements(lines)) == ['a = f(1, 2)', 'b = g(3)', 'c = "x y"', '', 'd = 4']
+
+
+def test_long_statement_is_linear(tmp_path):
+    # one statement broken over many lines: each line is scanned once
+    src = tmp_path / 'long.pine'
+    src.write_text('x = f(\n' + '1,\n' * 50000 + '2)\ny = 1\n', encoding='utf-8')
+    started = time.perf_counter()
+    assert fix_file(src, tmp_path / 'out.pine') == 0
+    assert time.perf_counter() - started < 5.0
+    lines = (tmp_path / 'out.pine').read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 2 and lines[0].startswith('x = f( 1, 1,') and lines[1] == 'y = 1'
+
+
+def test_check_pine(tmp_path, capsys):
+    good = tmp_path / 'good.pine'
+    good.write_text('//@version=5\nstrategy("t (1)")\nplot(close)\n', encoding='utf-8')
+    assert check(good) == 0
+    bad = tmp_path / 'bad.pine'
+    bad.write_text('plot(close\n', encoding='utf-8')
+    assert check(bad) == 1
+    assert f"{bad}:1:5: error: unclosed '('" in capsys.readouterr().out
+    assert check(Path('pine/backtest_strategy.pine')) == 0
+
+
+def test_fix_pine_format_runs_as_a_script(tmp_path):
+    import subprocess
+    import sys
+
+    script = Path(__file__).resolve().parents[1] / 'scripts' / 'fix_pine_format.py'
+    src = tmp_path / 'in.pine'
+    src.write_text('a = f(1,\n  2)\n', encoding='utf-8')
+    subprocess.run([sys.executable, str(script), str(src), str(tmp_path / 'out.pine')], cwd=tmp_path, check=True, capture_output=True)
+    assert (tmp_path / 'out.pine').read_text(encoding='utf-8') == 'a = f(1, 2)\n'
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from scripts.portfolio import run_portfolio
+from scripts.simulator import run_simulation
+
+
+def make_universe(n_bars=1500, n_symbols=4, seed=2):
+    rng = np.random.default_rng(seed)
+    prices = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, (n_bars, n_symbols)), axis=0))
+    draw = rng.random((n_bars, n_symbols))
+    signals = np.where(draw < 0.02, 1, np.where(draw > 0.98, -1, 0)).astype(np.int8)
+    return prices, signals
+
+
+def test_single_symbol_matches_run_simulation():
+    prices, signals = make_universe(n_symbols=1)
+    labels = [{1: 'long', -1: 'short', 0: None}[int(c)] for c in signals[:, 0]]
+    for params in (dict(useTP=True, tpPercent=2.0), dict(useSL=True, useTP=True, slPercent=2.0, avgDistancePercent=1.0)):
+        res = run_portfolio(prices, signals, **params)
+        ref = run_simulation(prices[:, 0].tolist(), labels, **params)
+        assert (res.final_balance, res.wins, res.losses, res.trades) == (ref.final_balance, ref.wins, ref.losses, ref.trades)
+
+
+def test_portfolio_totals_and_missing_bars():
+    prices, signals = make_universe()
+    prices[:500, 3] = np.nan  # symbol listed later
+    df = pd.DataFrame(prices, columns=['A', 'B', 'C', 'D'])
+    res = run_portfolio(df, signals, useTP=True, useSL=True, slPercent=3.0)
+    assert res.symbols == ['A', 'B', 'C', 'D']
+    assert res.trades == res.symbol_trades.sum() and res.trades > 0
+    assert res.wins + res.losses <= res.trades
+    assert abs(res.final_balance - (1000.0 + res.symbol_profit.sum())) < 1e-9
+
+
+def test_shared_margin_blocks_second_open():
+    prices = np.array([[100.0, 50.0], [100.0, 50.0]])
+    signals = np.array([['long', 'long'], [None, None]], dtype=object)
+    # each open would use the whole balance as margin
+    res = run_portfolio(prices, signals, risk_per_trade=100.0, leverage=1.0)
+    assert res.trades == 1
+    assert list(res.symbol_trades) == [1, 0]
@@ -0,0 +1,88 @@
+import pstats
+
+import numpy as np
+import pytest
+
+from scripts.profiling import SimStats
+from scripts.signals import generate_signals_from_series
+from scripts.simulator import Simulator, run_simulation, run_simulation_from_prices
+from scripts.trade_manager import Position
+
+
+def make_prices(n=3000, seed=2):
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+
+
+@pytest.mark.parametrize('engine', ['loop', 'fast'])
+def test_stats_count_the_run_without_changing_it(engine):
+    prices = make_prices()
+    params = dict(useSL=False, useTP=True, tpPercent=1.0, avgDistancePercent=0.5, leverage=50.0, record_events=True, engine=engine)
+    stats = SimStats()
+    res = run_simulation_from_prices(prices, stats=stats, **params)
+    assert res == run_simulation_from_prices(prices, **params)
+
+    assert stats.counters['bars'] == len(prices)
+    closes = [e['reason'] for e in res.events if e['type'] == 'close']
+    for reason in ('TP', 'SL', 'LIQ'):
+        assert stats.counters.get(f'closes_{reason}', 0) == closes.count(reason)
+    assert stats.calls['record_event'] == len(res.events)
+    assert stats.calls['add_average'] == sum(e['type'] == 'avg' for e in res.events)
+    assert stats.calls['signals'] == stats.calls['simulate'] == 1
+    if engine == 'loop':
+        assert stats.calls['step'] == len(prices)
+    else:
+        assert stats.calls['step'] < len(prices)
+    assert set(stats.summary().index) >= {'signals', 'simulate', 'step', 'check_sufficient_funds', 'rsi'}
+
+    # only the run's own objects were timed
+    assert not hasattr(Simulator.step, '__wrapped__') and not hasattr(Position.avg_price, '__wrapped__')
+
+
+def test_engines_count_the_same_funds_checks():
+    prices = make_prices(20000)
+    params = dict(useSL=False, useTP=True, tpPercent=1.0, avgDistancePercent=0.5, leverage=50.0)
+    calls = []
+    for engine in ('loop', 'fast'):
+        stats = SimStats()
+        run_simulation_from_prices(prices, engine=engine, stats=stats, **params)
+        calls.append(stats.calls['check_sufficient_funds'])
+    # the fast engine's segment scans are not counted, only the checks of its steps
+    assert calls[0] == calls[1] > 0
+
+
+def test_overlapping_phases_leave_nothing_behind():
+    a, b = SimStats(), SimStats()
+    sim = Simulator(record_events=True)
+    a.instrument(sim)
+    a.instrument(sim)
+    phase_a = a.phase('a')
+    phase_b = b.phase('b')
+    phase_a.__enter__()
+    phase_b.__enter__()
+    sim.step(100.0, 'long')
+    other = Simulator()
+    other.step(100.0, 'long')
+    phase_a.__exit__(None, None, None)
+    phase_b.__exit__(None, None, None)
+    assert a.calls['step'] == 1 and 'step' not in b.calls
+    assert a.calls['record_event'] == 1
+    assert type(other) is Simulator and type(other.long_pos) is Position
+    assert isinstance(sim, Simulator) and sim.long_pos.active
+    sim.step(101.0)
+    assert a.calls['step'] == 2
+
+
+def test_stats_accumulate_and_profile(tmp_path):
+    prices = make_prices(500).tolist()
+    signals = generate_signals_from_series(prices)
+    stats = SimStats(profile=True)
+    run_simulation(prices, signals, stats=stats)
+    run_simulation(prices, signals, stats=stats)
+    assert stats.counters['bars'] == 2 * len(prices)
+    assert stats.calls['simulate'] == 2
+    path = tmp_path / 'run.prof'
+    stats.dump_profile(str(path))
+    assert any(func[2] == 'step' for func in pstats.Stats(str(path)).stats)
+    with pytest.raises(ValueError):
+        SimStats().dump_profile(str(path))
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from scripts import run_cache as run_cache_module
+from scripts.run_cache import RunCache
+from scripts.simulator import run_simulation_from_prices
+
+
+def make_prices(n=3000, seed=6):
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+
+
+def test_identical_runs_are_loaded(tmp_path):
+    prices = make_prices()
+    cache = RunCache(tmp_path)
+    params = dict(useSL=False, avgDistancePercent=1.0, record_events=True, record_equity=True)
+    first = run_simulation_from_prices(prices, run_cache=cache, **params)
+    again = run_simulation_from_prices(prices, run_cache=cache, **params)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert again == first == run_simulation_from_prices(prices, **params)
+    assert len(again.events) > 0 and len(again.equity) == len(prices)
+
+    # explicit defaults and another process's instance find the same entry
+    assert RunCache(tmp_path).run(prices, tpPercent=1.5, engine='loop', **params) == first
+    # any other input is another run
+    run_simulation_from_prices(prices, run_cache=cache, tpPercent=2.0, **params)
+    run_simulation_from_prices(prices[:-1], run_cache=cache, **params)
+    run_simulation_from_prices(prices, run_cache=cache, window=(0, 1000), **params)
+    assert cache.misses == 4 and len(cache) == 4
+    with pytest.raises(TypeError):
+        cache.run(prices, bogus=1)
+
+
+def test_engine_change_invalidates(tmp_path, monkeypatch):
+    prices = make_prices(500)
+    cache = RunCache(tmp_path)
+    cache.run(prices)
+    monkeypatch.setattr(run_cache_module, 'engine_version', lambda: 'edited')
+    cache.run(prices)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_damaged_entries_are_recomputed(tmp_path):
+    prices = make_prices(500)
+    cache = RunCache(tmp_path)
+    res = cache.run(prices, record_events=True)
+    (path,) = tmp_path.glob('*.npz')
+    path.write_bytes(path.read_bytes()[:100])
+    assert cache.run(prices, record_events=True) == res
+    assert cache.run(prices, record_events=True) == res
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    prices = make_prices(2000)
+    cache = RunCache(tmp_path, max_bytes=10**9)
+    for tp in (1.0, 2.0, 3.0):
+        cache.run(prices, tpPercent=tp, record_equity=True)
+    sizes = sorted(p.stat().st_size for p in tmp_path.glob('*.npz'))
+    # keeps the two most recently used: 1.0 was read again after 2.0
+    cache.run(prices, tpPercent=1.0, record_equity=True)
+    cache.max_bytes = sizes[-1] + sizes[-2]
+    assert cache.evict() == 1
+    hits = cache.hits
+    cache.run(prices, tpPercent=1.0, record_equity=True)
+    cache.run(prices, tpPercent=3.0, record_equity=True)
+    assert cache.hits == hits + 2 and len(cache) == 2
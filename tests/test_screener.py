@@ -33,3 +33,58 @@ def test_fetch_data_and_save(mock_download, tmp_path):
     df2 = pd.read_csv(path, index_col=0, parse_dates=True)
     assert df2.shape[0] == 3
     assert 'Close' in df2.columns
+
+
+@patch('scripts.screener.yf.download')
+def test_fetch_and_store(mock_download, tmp_path):
+    from scripts.datastore import MarketDataStore
+
+    mock_download.return_value = make_sample_df()
+    store = MarketDataStore(tmp_path)
+    screener.fetch_and_store('AAPL', period='1d', store=store)
+    df = store.read('AAPL', '1d', columns=['Close'])
+    assert df['Close'].tolist() == [100.5, 101.5, 102.5]
+
+
+def test_update_universe_fetches_only_missing_bars(tmp_path):
+    from scripts.datastore import MarketDataStore
+
+    idx = pd.date_range('2023-01-01', periods=10, freq='D')
+    full = {t: pd.DataFrame({'Close': range(k, k + 10)}, index=idx, dtype=float) for k, t in enumerate(['AAA', 'BBB', 'CCC'])}
+    store = MarketDataStore(tmp_path)
+
+    first = screener.FakeProvider({t: df.iloc[:6] for t, df in full.items()})
+    report = screener.update_universe(full, provider=first, store=store, max_workers=2)
+    assert report.rows == {'AAA': 6, 'BBB': 6, 'CCC': 6} and not report.failed
+    assert all(start is None for _, start, _ in first.calls)
+
+    # later run: only the bars from the last stored one on are asked for
+    second = screener.FakeProvider(full, fail_times=1)
+    report = screener.update_universe(full, provider=second, store=store, max_workers=3, backoff=0.0, rate_limit=1000)
+    assert report.rows == {'AAA': 5, 'BBB': 5, 'CCC': 5}
+    assert {start for _, start, _ in second.calls} == {idx[5]}
+    assert len(second.calls) == 6  # one failed attempt per ticker, then the retry
+    for t, df in full.items():
+        assert store.read(t, '1d')['Close'].tolist() == df['Close'].tolist()
+
+
+def test_update_universe_reports_failures(tmp_path):
+    from scripts.datastore import MarketDataStore
+
+    provider = screener.FakeProvider({}, fail_times=5)
+    report = screener.update_universe(['AAA'], provider=provider, store=MarketDataStore(tmp_path), retries=1, backoff=0.0)
+    assert report.rows == {}
+    assert 'ConnectionError' in report.failed['AAA']
+    assert len(provider.calls) == 2
+
+
+def test_import_has_no_side_effects(tmp_path):
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    root = Path(screener.__file__).resolve().parents[1]
+    code = "import sys, scripts.screener; print('yfinance' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env={'PYTHONPATH': str(root)}, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == 'False'
+    assert not (tmp_path / 'pine').exists()
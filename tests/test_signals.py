@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from scripts.signals import rsi, bollinger_bands, generate_signals_from_series
+from scripts.signals import IndicatorCache, rsi, bollinger_bands, generate_signal_codes, generate_signals_from_series, signals_from_codes
+from scripts.simulator import run_simulation
 
 
 def test_rsi_basic():
@@ -24,3 +25,55 @@ def test_generate_signals_simple():
     signals = generate_signals_from_series(s, useRSI=True, rsiLength=14, rsiLongLevel=40, rsiShortLevel=60, useBB=True, bbLength=20, bbStdDev=2.0)
     # After the drop, expect at least one 'long' signal
     assert 'long' in signals
+
+
+def test_signal_codes_match_string_signals():
+    rng = np.random.default_rng(3)
+    s = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, 3000)))
+    for flags in ({}, {'useRSI': False}, {'useBB': False}, {'useRSI': False, 'useBB': False}):
+        codes = generate_signal_codes(s, rsiLongLevel=40, rsiShortLevel=60, **flags)
+        assert codes.dtype == np.int8
+        signals = generate_signals_from_series(s.tolist(), rsiLongLevel=40, rsiShortLevel=60, **flags)
+        assert signals_from_codes(codes) == signals
+        assert [c for c, sig in zip(codes.tolist(), signals) if sig is not None] == [1 if sig == 'long' else -1 for sig in signals if sig is not None]
+    codes = generate_signal_codes(s, rsiLongLevel=40, rsiShortLevel=60)
+    assert np.count_nonzero(codes) > 0
+    # the simulator takes the codes directly
+    assert run_simulation(s.tolist(), codes, useTP=True, record_events=True) == run_simulation(s.tolist(), signals_from_codes(codes), useTP=True, record_events=True)
+
+
+def test_generate_signals_cache_reuses_columns(tmp_path):
+    s = [100.0]*30 + [50.0]*25 + [100.0]*10 + [150.0]*10
+    cache = IndicatorCache()
+    expected = generate_signals_from_series(s, rsiLongLevel=40, rsiShortLevel=60)
+    assert generate_signals_from_series(s, rsiLongLevel=40, rsiShortLevel=60, cache=cache) == expected
+    misses = cache.misses
+    assert generate_signals_from_series(s, rsiLongLevel=40, rsiShortLevel=60, cache=cache) == expected
+    assert cache.misses == misses
+    # new thresholds reuse the RSI and BB columns, only the signal vector is recomputed
+    generate_signals_from_series(s, rsiLongLevel=35, rsiShortLevel=65, cache=cache)
+    assert cache.misses == misses + 1
+
+
+def test_indicator_cache_lru_budget_and_disk_tier(tmp_path):
+    cache = IndicatorCache(max_bytes=2 * 800, disk_dir=tmp_path)
+    for k in range(3):
+        cache.put(('x', k), np.full(100, float(k)))
+    assert len(cache) == 2 and cache.nbytes <= cache.max_bytes
+    # evicted from memory but still on disk
+    assert cache.get(('x', 0))[0] == 0.0
+    fresh = IndicatorCache(disk_dir=tmp_path)
+    assert fresh.get(('x', 2))[0] == 2.0
+    assert fresh.get(('x', 3)) is None
+
+
+def test_indicator_cache_disk_tier_treats_short_files_as_misses(tmp_path):
+    cache = IndicatorCache(disk_dir=tmp_path)
+    cache.put(('x', 0), np.arange(100.0))
+    path = cache._disk_path(('x', 0))
+    path.write_bytes(path.read_bytes()[:200])
+    fresh = IndicatorCache(disk_dir=tmp_path)
+    assert fresh.get(('x', 0)) is None and fresh.misses == 1
+    np.testing.assert_array_equal(fresh.get_or_compute(('x', 0), lambda: np.arange(100.0)), np.arange(100.0))
+    assert IndicatorCache(disk_dir=tmp_path).get(('x', 0))[-1] == 99.0
+    assert not list(tmp_path.glob('*.tmp'))
@@ -37,3 +37,32 @@ def test_simulator_prevent_open_on_insufficient_funds():
     res = run_simulation(prices, signals, initial_balance=1.0, risk_per_trade=1.0, leverage=1.0)
     assert res.trades == 0
     assert res.final_balance == 1.0
+
+
+def test_simulator_resume_from_snapshot_matches_full_run():
+    import json
+    import numpy as np
+    from scripts.simulator import Simulator
+
+    rng = np.random.default_rng(11)
+    prices = (100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, 3000)))).tolist()
+    signals = [('long' if d < 0.02 else 'short' if d > 0.98 else None) for d in rng.random(3000)]
+    params = dict(useTP=True, tpPercent=2.0, avgDistancePercent=1.0, record_events=True)
+    full = run_simulation(prices, signals, **params)
+
+    sim = Simulator(**params)
+    for close, sig in zip(prices[:1000], signals[:1000]):
+        sim.step(close, sig)
+    sim.feed(prices[1000:1671], signals[1000:1671])
+    # the snapshot survives a JSON round trip, open positions included
+    state = json.loads(json.dumps(sim.snapshot()))
+    resumed = Simulator.restore(state)
+    resumed.feed(prices[1671:], signals[1671:])
+    assert resumed.result() == full
+
+    fast = Simulator.restore(state)
+    fast.feed(prices[1671:], signals[1671:], engine='fast')
+    assert fast.result() == full
+    # the original keeps going independently of the restored copies
+    sim.feed(prices[1671:], signals[1671:])
+    assert sim.result() == full
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from scripts.simulator import run_simulation, run_simulation_ohlc
+from tests.test_fast_simulator import random_case
+
+
+def random_ohlc(seed):
+    prices, signals = random_case(seed)
+    rng = np.random.default_rng(seed)
+    closes = np.array(prices)
+    opens = np.r_[closes[0], closes[:-1]]
+    highs = np.maximum(opens, closes) * (1 + 0.01 * rng.random(len(closes)))
+    lows = np.minimum(opens, closes) * (1 - 0.01 * rng.random(len(closes)))
+    return opens, highs, lows, closes, signals
+
+
+def test_flat_bars_match_close_only_run():
+    prices, signals = random_case(3)
+    params = dict(useSL=True, useTP=True, slPercent=2.0, tpPercent=1.5, useAveraging=False, record_events=True)
+    ref = run_simulation(prices, signals, **params)
+    assert run_simulation_ohlc(prices, prices, prices, prices, signals, **params) == ref
+
+
+def test_take_profit_on_high_fills_at_target():
+    # the close never reaches +2%, the high of the second bar does
+    bars = dict(opens=[100.0, 100.0, 100.5], highs=[100.0, 103.0, 101.0], lows=[100.0, 99.5, 100.0], closes=[100.0, 100.5, 100.5])
+    signals = ['long', None, None]
+    res = run_simulation_ohlc(*bars.values(), signals, useTP=True, tpPercent=2.0, record_events=True)
+    assert run_simulation(bars['closes'], signals, useTP=True, tpPercent=2.0).wins == 0
+    close = res.events[-1]
+    assert (close['type'], close['reason'], close['bar']) == ('close', 'TP', 1)
+    assert close['price'] == pytest.approx(102.0)
+    assert res.wins == 1
+
+
+@pytest.mark.parametrize('path, reason', [
+    ('high_first', 'TP'),
+    ('low_first', 'SL'),
+    ('worst', 'SL'),
+    ('auto', 'TP'),  # the open is nearer the high
+])
+def test_path_assumption_decides_between_tp_and_sl(path, reason):
+    opens, highs, lows, closes = [100.0, 101.0], [100.0, 103.0], [100.0, 98.0], [100.0, 100.0]
+    res = run_simulation_ohlc(opens, highs, lows, closes, ['long', None], useTP=True, useSL=True, tpPercent=2.0, slPercent=1.0, record_events=True, intrabar_path=path)
+    assert res.events[-1]['reason'] == reason
+    assert res.events[-1]['price'] == pytest.approx(102.0 if reason == 'TP' else 99.0)
+
+
+def test_gap_through_stop_fills_at_open():
+    res = run_simulation_ohlc([100.0, 95.0], [100.0, 96.0], [100.0, 94.0], [100.0, 95.5], ['long', None], useSL=True, slPercent=1.0, useAveraging=False, record_events=True)
+    assert res.events[-1]['reason'] == 'SL'
+    assert res.events[-1]['price'] == 95.0
+
+
+def test_unknown_path_rejected():
+    with pytest.raises(ValueError):
+        run_simulation_ohlc([1.0], [1.0], [1.0], [1.0], [None], intrabar_path='random')
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('path', ['auto', 'worst'])
+@pytest.mark.parametrize('params', [
+    dict(useSL=False, useTP=True, tpPercent=3.0),
+    dict(useSL=True, useTP=True, slPercent=2.0, tpPercent=1.5, avgDistancePercent=1.0),
+    dict(useSL=False, useTP=False, leverage=50.0, avgDistancePercent=0.5, maxAvgCount=6),
+])
+def test_fast_engine_matches_loop(seed, path, params):
+    opens, highs, lows, closes, signals = random_ohlc(seed)
+    ref = run_simulation_ohlc(opens.tolist(), highs.tolist(), lows.tolist(), closes.tolist(), signals, record_events=True, intrabar_path=path, **params)
+    fast = run_simulation_ohlc(opens, highs, lows, closes, signals, record_events=True, intrabar_path=path, engine='fast', **params)
+    assert fast == ref
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from scripts import kernels
+from scripts.kernels import bollinger_multi
+from scripts.signals import bollinger_bands, generate_signals_from_series, rsi
+from scripts.stream_signals import StreamingBollinger, StreamingRSI, StreamingSignals
+
+
+def make_series(seed, n=600):
+    rng = np.random.default_rng(seed)
+    s = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, n)))
+    # flat stretches exercise pandas' constant-window shortcuts
+    s[100:140] = s[100]
+    s[300:310] = 1e6
+    return s
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('length', [1, 2, 5, 14])
+def test_streaming_rsi_matches_batch(seed, length):
+    s = make_series(seed)
+    stream = StreamingRSI(length)
+    got = np.array([stream.push(float(x)) for x in s])
+    np.testing.assert_array_equal(got, rsi(pd.Series(s), length).to_numpy())
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('length', [1, 2, 20])
+def test_streaming_bollinger_matches_batch(seed, length):
+    s = make_series(seed)
+    s[450] = np.nan
+    s[500] = np.inf
+    stream = StreamingBollinger(length, 2.0)
+    got = np.array([stream.push(float(x)) for x in s])
+    np.testing.assert_array_equal(got, bollinger_multi(s, [length], 2.0)[0])
+    # pandas has the same NaN bars; its rolling sums lag behind after the 1e6 stretch
+    expected = bollinger_bands(pd.Series(s).replace(np.inf, np.nan), length, 2.0)[['basis', 'upper', 'lower']].to_numpy()
+    np.testing.assert_array_equal(np.isnan(got), np.isnan(expected))
+    windows = sliding_window_view(s, length)
+    full = np.isfinite(windows).all(axis=1)
+    mean, dev = windows[full].mean(axis=1), windows[full].std(axis=1)
+    np.testing.assert_allclose(got[length - 1:][full], np.c_[mean, mean + 2 * dev, mean - 2 * dev], rtol=1e-12, atol=1e-6)
+
+
+@pytest.mark.parametrize('length', [20, 400])
+def test_streaming_bollinger_work_does_not_grow_with_length(monkeypatch, length):
+    rng = np.random.default_rng(7)
+    s = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, 20_000)))
+    summed = []
+    band_sums = kernels._band_sums
+    monkeypatch.setattr(kernels, '_band_sums', lambda d: summed.append(d.size) or band_sums(d))
+    stream = StreamingBollinger(length, 2.0)
+    got = np.array([stream.push(float(x)) for x in s])
+    # one window re-summed every `_bb_block(length)` bars
+    assert sum(summed) <= len(s) // 4 + length
+    np.testing.assert_array_equal(got, bollinger_multi(s, [length], 2.0)[0])
+    # spikes leaving the window are summed directly, in both
+    s[5000:5003] = [1e9, np.nan, 1e9]
+    stream = StreamingBollinger(length, 2.0)
+    np.testing.assert_array_equal([stream.push(float(x)) for x in s], bollinger_multi(s, [length], 2.0)[0])
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(rsiLongLevel=45, rsiShortLevel=55),
+    dict(useBB=False, rsiLength=7),
+    dict(useRSI=False, bbLength=10, bbStdDev=1.0),
+])
+def test_streaming_signals_match_batch(kwargs):
+    s = make_series(5).tolist()
+    stream = StreamingSignals(**kwargs)
+    got = [stream.push(x) for x in s]
+    assert got == generate_signals_from_series(s, **kwargs)
+    assert 'long' in got or 'short' in got
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('tick', [0.05, 0.01])
+def test_streaming_signals_match_batch_on_tick_prices(seed, tick):
+    # closes on a tick grid land exactly on a band now and then
+    rng = np.random.default_rng(seed)
+    s = np.round(100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.003, 100_000))) / tick) * tick
+    for kwargs in ({}, dict(useRSI=False, bbLength=10, bbStdDev=1.0)):
+        stream = StreamingSignals(**kwargs)
+        assert [stream.push(x) for x in s.tolist()] == generate_signals_from_series(s, **kwargs)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from scripts.simulator import run_simulation_from_prices
+from scripts.sweep import _parse_spec, param_grid, random_search, run_sweep
+
+
+def make_prices(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, n)))
+
+
+def test_param_grid_and_random_search():
+    grid = param_grid({'slPercent': [1.0, 2.0], 'maxAvgCount': [1, 2, 3]})
+    assert len(grid) == 6
+    assert {'slPercent': 2.0, 'maxAvgCount': 3} in grid
+
+    draws = random_search({'tpPercent': (0.5, 3.0), 'rsiLength': (5, 20), 'bbStdDev': [1.5, 2.0]}, n=50, seed=1)
+    assert draws == random_search({'tpPercent': (0.5, 3.0), 'rsiLength': (5, 20), 'bbStdDev': [1.5, 2.0]}, n=50, seed=1)
+    assert all(0.5 <= d['tpPercent'] <= 3.0 for d in draws)
+    assert all(isinstance(d['rsiLength'], int) and 5 <= d['rsiLength'] <= 20 for d in draws)
+    assert all(d['bbStdDev'] in (1.5, 2.0) for d in draws)
+
+
+def test_run_sweep_pool_matches_sequential_runs():
+    prices = make_prices()
+    sets = param_grid({'slPercent': [1.0, 3.0], 'tpPercent': [1.0, 2.0], 'rsiLength': [7, 14]})
+    seen = []
+    table = run_sweep(prices, sets, processes=2, on_result=lambda idx, row: seen.append(idx))
+
+    assert sorted(seen) == list(range(len(sets)))
+    assert list(table['final_balance']) == sorted(table['final_balance'], reverse=True)
+    for _, row in table.iterrows():
+        params = {k: row[k] for k in ('slPercent', 'tpPercent', 'rsiLength')}
+        params['rsiLength'] = int(params['rsiLength'])
+        expected = run_simulation_from_prices(prices.tolist(), **params)
+        assert row['final_balance'] == expected.final_balance
+        assert row['trades'] == expected.trades
+
+
+def test_grid_rejects_fractional_ints():
+    assert _parse_spec(['maxAvgCount=2,3.0', 'tpPercent=1.5'], allow_ranges=False) == {'maxAvgCount': [2, 3], 'tpPercent': [1.5]}
+    with pytest.raises(ValueError, match='maxAvgCount'):
+        _parse_spec(['maxAvgCount=2.9'], allow_ranges=False)
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.signals import filter_signal_codes, generate_signal_codes
+from scripts.simulator import run_simulation_from_prices
+from scripts.timeframes import TimeframeCache, parse_interval, resample_ohlcv
+
+
+def make_bars(n=3000, freq='1min', start='2024-03-04 09:30', seed=4, tz=None):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.002, n)))
+    spread = np.abs(rng.normal(0.0, 0.001, n)) * close
+    return pd.DataFrame({
+        'Open': np.roll(close, 1),
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(1, 1000, n).astype(float),
+    }, index=pd.date_range(start, periods=n, freq=freq, tz=tz))
+
+
+@pytest.mark.parametrize('interval, rule, tz', [('1h', '1h', None), ('15m', '15min', 'America/New_York'), ('1d', '1D', None)])
+def test_resample_matches_pandas(interval, rule, tz):
+    bars = make_bars(tz=tz)
+    res = resample_ohlcv(bars, interval)
+    expected = bars.resample(rule).agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}).dropna()
+    pd.testing.assert_frame_equal(res.bars, expected, check_freq=False)
+
+
+def test_weeks_start_on_monday_and_offset_shifts_periods():
+    daily = make_bars(40, freq='1D', start='2024-01-03')
+    weeks = resample_ohlcv(daily, '1wk').bars
+    assert (weeks.index[1:].dayofweek == 0).all()
+    months = resample_ohlcv(daily, '1mo').bars
+    assert list(months.index) == [pd.Timestamp('2024-01-01'), pd.Timestamp('2024-02-01')]
+    hourly = resample_ohlcv(make_bars(300), '1h', offset='30min').bars
+    assert (hourly.index.minute == 30).all()
+    with pytest.raises(ValueError):
+        parse_interval('2y')
+
+
+def test_aligned_values_have_no_lookahead():
+    bars = make_bars(2000)
+    full = TimeframeCache().indicators('X', bars, '1h', rsiLength=5, bbLength=4)
+    # every bar only sees what a run stopped at that bar would see
+    for stop in (1, 29, 30, 31, 89, 90, 1000, 1999):
+        part = TimeframeCache().indicators('X', bars.iloc[:stop], '1h', rsiLength=5, bbLength=4)
+        np.testing.assert_array_equal(part.to_numpy()[-1], full.to_numpy()[stop - 1])
+    # the hourly close shows up on the last minute of the hour, not before
+    res = resample_ohlcv(bars, '1h')
+    assert res.visible[29] == 0 and res.visible[28] == -1
+    assert full['close'].iloc[29] == bars['Close'].iloc[29]
+    # the last bar only completes its hour at the end of the hour
+    assert resample_ohlcv(bars.iloc[:31], '1h').visible[-1] == 0
+    assert resample_ohlcv(bars.iloc[:90], '1h').visible[-1] == 1
+
+
+def test_gaps_do_not_complete_a_period_early():
+    bars = make_bars(600)
+    # the last 10 minutes of the 10:00 hour and the whole 12:00 hour are missing
+    gappy = bars.drop(bars.index[50:60].append(bars.index[150:210]))
+    res = resample_ohlcv(gappy, '1h', base_interval='1min')
+    times = gappy.index
+    at = {t: v for t, v in zip(times, res.visible)}
+    # 10:49 is the last bar of its hour but closes at 10:50: the hour is still running
+    assert at[pd.Timestamp('2024-03-04 10:49')] == at[pd.Timestamp('2024-03-04 10:48')] == 0
+    assert at[pd.Timestamp('2024-03-04 11:00')] == 1
+    assert at[pd.Timestamp('2024-03-04 11:59')] == 2
+    assert at[pd.Timestamp('2024-03-04 13:00')] == 2
+    # every bar sees what a run stopped at that bar would see
+    for stop in range(1, len(gappy), 7):
+        part = resample_ohlcv(gappy.iloc[:stop], '1h', base_interval='1min')
+        assert part.visible[-1] == res.visible[stop - 1]
+
+
+def test_cache_resamples_once():
+    bars = make_bars()
+    tf = TimeframeCache()
+    codes = tf.signal_codes('X', bars, '1h', useBB=False, rsiLength=4, rsiLongLevel=40, rsiShortLevel=60)
+    again = tf.signal_codes('X', bars, '1h', useBB=False, rsiLength=4, rsiLongLevel=40, rsiShortLevel=60)
+    assert (tf.misses, tf.hits) == (1, 1)
+    np.testing.assert_array_equal(codes, again)
+    assert codes.dtype == np.int8 and len(codes) == len(bars) and codes.any()
+    tf.get('X', bars.iloc[:-1], '1h')
+    assert tf.misses == 2 and len(tf) == 1
+    # a revised bar in the middle keeps length and ends but changes the content
+    revised = bars.copy()
+    revised.iloc[89, revised.columns.get_loc('Close')] *= 1.01
+    tf.get('X', bars, '1h')
+    res = tf.get('X', revised, '1h')
+    assert tf.misses == 4
+    assert res.bars['Close'].iloc[1] == revised['Close'].iloc[89]
+
+
+def test_cache_hashes_each_frame_once(monkeypatch):
+    import scripts.timeframes as timeframes
+
+    hashed = []
+    digest = timeframes._base_digest
+    monkeypatch.setattr(timeframes, '_base_digest', lambda base: hashed.append(len(base)) or digest(base))
+    bars = make_bars()
+    tf = TimeframeCache()
+    for interval in ('1h', '15m', '1h', '1d'):
+        tf.get('X', bars, interval)
+    assert hashed == [len(bars)]
+    # a new frame is hashed again, an in-place append changes the stamp
+    tf.get('X', bars.copy(), '1h')
+    longer = bars.iloc[:100].copy()
+    tf.get('X', longer, '1h')
+    longer.loc[longer.index[-1] + pd.Timedelta('1min')] = longer.iloc[-1]
+    tf.get('X', longer, '1h')
+    assert hashed == [len(bars), len(bars), 100, 101]
+    assert (tf.hits, tf.misses) == (2, 5)
+
+
+def test_signal_filter_keeps_agreeing_entries():
+    codes = np.array([1, -1, 1, 0, -1], dtype=np.int8)
+    allowed = np.array([1, 1, 0, -1, -1], dtype=np.int8)
+    np.testing.assert_array_equal(filter_signal_codes(codes, allowed), [1, 0, 0, 0, -1])
+
+    bars = make_bars()
+    daily = TimeframeCache().signal_codes('X', bars, '1h', useBB=False, rsiLength=4, rsiLongLevel=40, rsiShortLevel=60)
+    closes = bars['Close'].to_numpy()
+    filtered = run_simulation_from_prices(closes, signal_filter=daily, record_events=True)
+    opens = [e['bar'] for e in filtered.events if e['type'] == 'open']
+    assert opens and all(daily[i] != 0 for i in opens)
+    assert filtered != run_simulation_from_prices(closes, record_events=True)
+    assert generate_signal_codes(closes).any()
@@ -45,3 +45,46 @@ def test_short_avg_and_next_level():
     nap = p.next_avg_price(5.0)
     assert nap == 210.0
     assert p.should_average(210.0, 5.0)
+
+
+def test_avg_price_matches_fill_lists():
+    from scripts import pine_calc
+
+    p = Position(is_long=True)
+    p.open(entry_price=100.0, pos_vol=0.3, useSL=False, useTP=False, slPercent=0.0, tpPercent=0.0)
+    fills = [(100.0, 0.3)]
+    for price in (97.1, 93.3, 88.7):
+        fills.append((price, p.add_average(price, 1.7)))
+    expected = pine_calc.calculate_average_price([f[0] for f in fills], [f[1] for f in fills])
+    assert p.avg_price() == expected
+    assert not hasattr(p, '__dict__')
+
+
+def test_position_batch_matches_position():
+    import numpy as np
+    from scripts.trade_manager import PositionBatch
+
+    batch = PositionBatch(3, is_long=np.array([True, False, True]))
+    singles = [Position(is_long=bool(s)) for s in batch.is_long]
+    entries = np.array([100.0, 200.0, 50.0])
+    vols = np.array([1.0, 2.0, 0.5])
+    batch.open(np.arange(3), entries, vols, True, True, 1.0, 2.0)
+    for pos, e, v in zip(singles, entries, vols):
+        pos.open(e, v, True, True, 1.0, 2.0)
+
+    closes = np.array([94.0, 211.0, 49.0])
+    due = batch.should_average(closes, 5.0)
+    assert list(due) == [pos.should_average(c, 5.0) for pos, c in zip(singles, closes)] == [True, True, False]
+    idx = np.flatnonzero(due)
+    batch.add_average(idx, closes[idx], 2.0)
+    batch.update_targets(idx, True, True, 1.0, 2.0)
+    for k in idx:
+        singles[k].add_average(closes[k], 2.0)
+        singles[k].update_targets(True, True, 1.0, 2.0)
+    assert list(batch.avg_price()) == [pos.avg_price() for pos in singles]
+    assert list(batch.take_profit_price) == [pos.take_profit_price for pos in singles]
+
+    profit, commission = batch.close(np.arange(3), closes, 0.1)
+    for k, pos in enumerate(singles):
+        assert (profit[k], commission[k]) == pos.close(closes[k], 0.1)
+    assert not batch.active.any()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from scripts.simulator import run_simulation_from_prices
+from scripts.sweep import param_grid, run_sweep
+from scripts.walkforward import walk_forward, walk_forward_windows
+
+
+def make_prices(n=6000, seed=5):
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.004, n)))
+
+
+def test_windows():
+    assert walk_forward_windows(10, 4, 3) == [(0, 4, 4, 7), (3, 7, 7, 10)]
+    assert walk_forward_windows(11, 4, 3, anchored=True) == [(0, 4, 4, 7), (0, 7, 7, 10), (0, 10, 10, 11)]
+    assert walk_forward_windows(4, 4, 3) == []
+
+
+def test_picks_in_sample_best_and_trades_it_out_of_sample():
+    prices = make_prices()
+    sets = param_grid({'tpPercent': [0.5, 1.0, 2.0], 'rsiLength': [10, 14]})
+    wf = walk_forward(prices, sets, 2000, 1000, processes=1)
+    assert list(wf.windows['oos_start']) == [2000, 3000, 4000, 5000]
+
+    for w in wf.windows.itertuples():
+        ranked = run_sweep(prices, [{**s, 'window': (w.is_start, w.is_stop)} for s in sets], processes=1)
+        assert ranked.loc[0, 'final_balance'] == w.is_final_balance
+        assert (ranked.loc[0, 'tpPercent'], ranked.loc[0, 'rsiLength']) == (w.tpPercent, w.rsiLength)
+
+    assert wf.equity.index[0] == 2000 and len(wf.equity) == 4000
+    assert np.array_equal(wf.equity.to_numpy(), wf.result.equity.equity)
+    assert wf.windows['oos_trades'].sum() == wf.result.trades
+
+
+def test_single_window_matches_direct_run():
+    prices = pd.Series(make_prices(3000), index=pd.date_range('2021-01-01', periods=3000, freq='h'))
+    sets = [{'tpPercent': 1.0, 'slPercent': 2.0}]
+    wf = walk_forward(prices, sets, 2000, 1000, processes=1)
+    direct = run_simulation_from_prices(prices.to_numpy(), window=(2000, 3000), engine='fast', **sets[0])
+    assert wf.result.final_balance == direct.final_balance
+    assert wf.result.trades == direct.trades
+    assert wf.equity.index.equals(prices.index[2000:])
+
+
+def test_parallel_matches_in_process():
+    prices = make_prices(4000, seed=9)
+    sets = param_grid({'tpPercent': [0.5, 1.5], 'bbStdDev': [1.5, 2.0]})
+    one = walk_forward(prices, sets, 1500, 500, anchored=True, processes=1)
+    two = walk_forward(prices, sets, 1500, 500, anchored=True, processes=2)
+    assert one.result == two.result
+    pd.testing.assert_frame_equal(one.windows, two.windows)
+
+
+def test_metric_objective():
+    prices = make_prices(4000, seed=2)
+    sets = param_grid({'tpPercent': [0.5, 2.0], 'avgDistancePercent': [1.0, 5.0]})
+    wf = walk_forward(prices, sets, 2000, 1000, processes=1, objective='max_drawdown')
+    for w in wf.windows.itertuples():
+        ranked = run_sweep(prices, [{**s, 'window': (w.is_start, w.is_stop)} for s in sets], processes=1, objective='max_drawdown')
+        assert ranked.loc[0, 'max_drawdown'] == w.is_max_drawdown